@@ -122,7 +122,7 @@ CREATE TABLE IF NOT EXISTS "Chats" (
     "receiverId" UUID NOT NULL REFERENCES "Users"("id") ON DELETE CASCADE,
     "carId" UUID REFERENCES "Cars"("id") ON DELETE SET NULL,
     "message" TEXT NOT NULL,
-    "messageType" VARCHAR(50) DEFAULT 'text' CHECK (messageType IN ('text', 'image', 'file')),
+    "messageType" VARCHAR(50) DEFAULT 'text' CHECK ("messageType" IN ('text', 'image', 'file')),
     "attachmentUrl" VARCHAR(255),
     "isRead" BOOLEAN DEFAULT false,
     "readAt" TIMESTAMP WITH TIME ZONE,
@@ -1,5 +1,6 @@
 import asyncio
 from playwright import async_api
+from harness import waits
 
 async def run_test():
     pw = None
@@ -48,60 +49,60 @@ async def run_test():
         # Click on the 'Daftar' button to go to the registration page.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/nav/div/div/div[2]/div/a[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Fill in the registration form with valid data and select role, then agree to terms.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Andre Mobilindo')
+        await waits.before_action(frame, elem); await elem.fill('Andre Mobilindo')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('mobilindoandre')
+        await waits.before_action(frame, elem); await elem.fill('mobilindoandre')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('mobilindoandre@example.com')
+        await waits.before_action(frame, elem); await elem.fill('mobilindoandre@example.com')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[4]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('08123456789')
+        await waits.before_action(frame, elem); await elem.fill('08123456789')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[5]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Try to input password confirmation by focusing on the visible input field and then input text. Then click the checkbox for terms agreement and finally click 'Daftar Sekarang' button to submit.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div[2]/div').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Click the checkbox to agree to terms and privacy policy, then click 'Daftar Sekarang' button to submit the registration form.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[8]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Click the 'Daftar Sekarang' button (index 13) to submit the registration form and verify successful registration.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[8]/label/a[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         assert False, 'Test plan execution failed: registration success could not be verified.'
-        await asyncio.sleep(5)
+        await waits.settle(page)
     
     finally:
         if context:
@@ -1,5 +1,6 @@
 import asyncio
 from playwright import async_api
+from harness import waits
 
 async def run_test():
     pw = None
@@ -48,91 +49,91 @@ async def run_test():
         # Click on the 'Daftar' (Register) button to go to the registration page
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/nav/div/div/div[2]/div/a[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Click 'Daftar Sekarang' button to submit the form with empty fields and check for validation errors.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[7]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Fill the form with invalid email and weak password to test validation errors for these fields.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('mobilindoandre')
+        await waits.before_action(frame, elem); await elem.fill('mobilindoandre')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('mobilindoandre')
+        await waits.before_action(frame, elem); await elem.fill('mobilindoandre')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('invalid-email-format')
+        await waits.before_action(frame, elem); await elem.fill('invalid-email-format')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[6]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('1234567')
+        await waits.before_action(frame, elem); await elem.fill('1234567')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[7]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('1234567')
+        await waits.before_action(frame, elem); await elem.fill('1234567')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[8]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Clear email and password fields and submit empty form to check for validation error messages for empty required fields.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('')
+        await waits.before_action(frame, elem); await elem.fill('')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[6]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('')
+        await waits.before_action(frame, elem); await elem.fill('')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[7]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('')
+        await waits.before_action(frame, elem); await elem.fill('')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Click the correct 'Daftar Sekarang' button (index 10) to submit the form with empty fields and check for validation error messages.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[7]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Input invalid email format and weak password again, then submit to check for visible validation error messages.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('invalid-email')
+        await waits.before_action(frame, elem); await elem.fill('invalid-email')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[6]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123')
+        await waits.before_action(frame, elem); await elem.fill('123')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[7]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123')
+        await waits.before_action(frame, elem); await elem.fill('123')
         
 
         assert False, 'Test failed: Expected validation errors did not appear or test plan execution failed.'
-        await asyncio.sleep(5)
+        await waits.settle(page)
     
     finally:
         if context:
@@ -1,5 +1,6 @@
 import asyncio
 from playwright import async_api
+from harness import locators, waits
 
 async def run_test():
     pw = None
@@ -47,95 +48,95 @@ async def run_test():
         # Interact with the page elements to simulate user flow
         # Click the 'Masuk' button to go to the login page
         frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/nav/div/div/div[2]/div/a/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.find(frame, "navigation.masuk")
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Input username/email and password for buyer role
         frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('mobilindoandre')
+        elem = await locators.find(frame, "login.email")
+        await waits.before_action(frame, elem); await elem.fill('mobilindoandre')
         
 
         frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('1234567')
+        elem = await locators.find(frame, "login.password")
+        await waits.before_action(frame, elem); await elem.fill('1234567')
         
 
         # Click the correct 'Masuk' submit button (index 7) to attempt login for buyer role
         frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.find(frame, "login.submit")
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Log out from buyer account to prepare for seller role login test.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/nav/div/div/div[2]/a[5]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Log out from buyer account to prepare for seller role login test.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/nav/div/div/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Navigate to login page to start seller role login test.
         frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/nav/div/div/div[2]/div/a/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.find(frame, "navigation.masuk")
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Input valid username/email and password for seller role and click login button.
         frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('seller_username')
+        elem = await locators.find(frame, "login.email")
+        await waits.before_action(frame, elem); await elem.fill('seller_username')
         
 
         frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('seller_password')
+        elem = await locators.find(frame, "login.password")
+        await waits.before_action(frame, elem); await elem.fill('seller_password')
         
 
         # Click the 'Masuk' button (index 7) to submit seller login form and verify successful login.
         frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.find(frame, "login.submit")
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Log out from seller account to prepare for admin role login test.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/nav/div/div/div[2]/a[5]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Log out from seller account to prepare for admin role login test.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/nav/div/div/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Navigate to login page to start admin role login test.
         frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/nav/div/div/div[2]/div/a/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.find(frame, "navigation.masuk")
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Input valid admin username/email and password, then click the login button to test admin role login.
         frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin_username')
+        elem = await locators.find(frame, "login.email")
+        await waits.before_action(frame, elem); await elem.fill('admin_username')
         
 
         frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin_password')
+        elem = await locators.find(frame, "login.password")
+        await waits.before_action(frame, elem); await elem.fill('admin_password')
         
 
         # Click the 'Masuk' button (index 7) to submit admin login form and verify successful login.
         frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.find(frame, "login.submit")
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Assert that the user is logged in by checking the welcome message contains the user's name
@@ -151,7 +152,7 @@ async def run_test():
         assert 'transaksi' in dashboard_stats_text or 'Transaksi' in dashboard_stats_text
         assert 'test_drive' in dashboard_stats_text or 'Test Drive' in dashboard_stats_text
         assert 'ulasan' in dashboard_stats_text or 'Ulasan' in dashboard_stats_text
-        await asyncio.sleep(5)
+        await waits.settle(page)
     
     finally:
         if context:
@@ -1,5 +1,6 @@
 import asyncio
 from playwright import async_api
+from harness import locators, waits
 
 async def run_test():
     pw = None
@@ -47,19 +48,19 @@ async def run_test():
         # Interact with the page elements to simulate user flow
         # Click the 'Masuk' button to go to the login page.
         frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/nav/div/div/div[2]/div/a/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.find(frame, "navigation.masuk")
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Input invalid username/email and password into the login form.
         frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('mobilindoandre')
+        elem = await locators.find(frame, "login.email")
+        await waits.before_action(frame, elem); await elem.fill('mobilindoandre')
         
 
         frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('1234567')
+        elem = await locators.find(frame, "login.password")
+        await waits.before_action(frame, elem); await elem.fill('1234567')
         
 
         # Manually inspect the page for any hidden or styled error messages or validation messages near the input fields or elsewhere on the page.
@@ -67,7 +68,7 @@ async def run_test():
         
 
         assert False, 'Test failed: Expected login failure with error message, but actual result is unknown.'
-        await asyncio.sleep(5)
+        await waits.settle(page)
     
     finally:
         if context:
@@ -1,5 +1,6 @@
 import asyncio
 from playwright import async_api
+from harness import locators, waits
 
 async def run_test():
     pw = None
@@ -47,54 +48,54 @@ async def run_test():
         # Interact with the page elements to simulate user flow
         # Click on 'Katalog Mobil' button to go to the car catalog page
         frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/nav/div/div/div[2]/a/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.find(frame, "navigation.katalog")
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Input 'Toyota' in the search box to test search by brand
         frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div[2]/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Toyota')
+        elem = await locators.find(frame, "katalog.search")
+        await waits.before_action(frame, elem); await elem.fill('Toyota')
         
 
         frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div[2]/div/div/div[3]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.find(frame, "katalog.apply_filters")
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Apply filters: Set price range, year, and type filters and apply them
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div[2]/div/div/div[2]/div[2]/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Select '200 - 300 Juta' price range filter and apply the filter
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div[2]/div/div/div[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Set year filter to 2023 and apply filters
         frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div[2]/div/div/div[2]/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('2023')
+        elem = await locators.find(frame, "katalog.year_min")
+        await waits.before_action(frame, elem); await elem.fill('2023')
         
 
         frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div[2]/div/div/div[3]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.find(frame, "katalog.apply_filters")
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Apply type filter (e.g., 'Manual' or 'Automatic') and apply filters
         frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div[2]/div/div/div[2]/div[2]/div/button[4]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.find(frame, "katalog.transmission")
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Select 'Manual' transmission filter and apply filters
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div[2]/div/div/div').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Assertion: Verify that search results include matching vehicles with 'Toyota' in the name or brand
@@ -110,7 +111,7 @@ async def run_test():
             assert car['year'] == 2023, f"Car year {car['year']} does not match filter year 2023."
             # Check transmission filter: Manual
             assert car['transmission'].lower() == 'manual', f"Car transmission {car['transmission']} does not match filter 'Manual'."
-        await asyncio.sleep(5)
+        await waits.settle(page)
     
     finally:
         if context:
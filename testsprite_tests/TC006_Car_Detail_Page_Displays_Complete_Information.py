@@ -1,5 +1,6 @@
 import asyncio
 from playwright import async_api
+from harness import waits
 
 async def run_test():
     pw = None
@@ -48,19 +49,19 @@ async def run_test():
         # Click on 'Katalog Mobil' button to open vehicle catalog.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/nav/div/div/div[2]/a/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Click 'Lihat Detail' button on the first vehicle listing (Toyota Avanza) to open its detail page.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div[3]/div/div/div[2]/div[7]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Try clicking 'Lihat Detail' button on the fourth vehicle listing (Suzuki Ertiga) to see if it navigates to the detail page.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div[3]/div[4]/div/div[2]/div[7]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Try to manually navigate to a vehicle detail page URL if a pattern is known or predictable, or report the website issue and stop.
@@ -68,7 +69,7 @@ async def run_test():
         
 
         assert False, 'Test failed: Expected result unknown, forcing failure.'
-        await asyncio.sleep(5)
+        await waits.settle(page)
     
     finally:
         if context:
@@ -1,5 +1,6 @@
 import asyncio
 from playwright import async_api
+from harness import waits
 
 async def run_test():
     pw = None
@@ -48,40 +49,40 @@ async def run_test():
         # Click on 'Masuk' button to start login process.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/nav/div/div/div[2]/div/a/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Input username and password, then click 'Masuk' button to login.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('mobilindoandre')
+        await waits.before_action(frame, elem); await elem.fill('mobilindoandre')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('1234567')
+        await waits.before_action(frame, elem); await elem.fill('1234567')
         
 
         # Click 'Masuk' button again to retry login or check for error messages.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Navigate to a vehicle detail page to add a car to wishlist.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/nav/div/div/div[2]/a[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Click 'Lihat Detail' button on the first car (Toyota Avanza) to go to vehicle detail page.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div[3]/div/div/div[2]/div[7]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         assert False, 'Test plan execution failed: generic failure assertion.'
-        await asyncio.sleep(5)
+        await waits.settle(page)
     
     finally:
         if context:
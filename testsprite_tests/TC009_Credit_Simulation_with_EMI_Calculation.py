@@ -1,5 +1,6 @@
 import asyncio
 from playwright import async_api
+from harness import waits
 
 async def run_test():
     pw = None
@@ -48,51 +49,51 @@ async def run_test():
         # Click on 'Simulasi Kredit' button to go to credit simulation page.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/nav/div/div/div[2]/a[4]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Click 'Input Manual' to enable manual input fields for simulation.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div[3]/div/div/div').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Input car brand, model, and price first, then locate and input down payment, interest rate, and loan tenure.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div[3]/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Toyota')
+        await waits.before_action(frame, elem); await elem.fill('Toyota')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div[3]/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Avanza 1.3 G MT')
+        await waits.before_action(frame, elem); await elem.fill('Avanza 1.3 G MT')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div[3]/div/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('235000000')
+        await waits.before_action(frame, elem); await elem.fill('235000000')
         
 
         # Click 'Lanjutkan' button to proceed to the next step for entering down payment, interest rate, and loan tenure.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div[3]/div/form/div[3]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Input down payment, interest rate, and tenure if needed, then click 'Hitung Simulasi' to calculate EMI and budget recommendations.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div[3]/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('35000000')
+        await waits.before_action(frame, elem); await elem.fill('35000000')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div[3]/div/form/div/div[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('9.5')
+        await waits.before_action(frame, elem); await elem.fill('9.5')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div[3]/div/form/div[3]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Assert the simulation result car name and brand
@@ -112,7 +113,7 @@ async def run_test():
         # Assert the loan tenor
         tenor_text = await frame.locator('xpath=html/body/div/div/div/div/div/div[3]/div/div/div[2]/div[4]/p').inner_text()
         assert '48 Bulan' in tenor_text
-        await asyncio.sleep(5)
+        await waits.settle(page)
     
     finally:
         if context:
@@ -1,5 +1,6 @@
 import asyncio
 from playwright import async_api
+from harness import session, waits
 
 async def run_test():
     pw = None
@@ -21,8 +22,9 @@ async def run_test():
             ],
         )
         
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        # Create a new browser context (like an incognito window) already logged in
+        # as the buyer, using the cached Supabase session instead of the login form
+        context = await browser.new_context(storage_state=await session.case_storage_state(browser, "buyer"))
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
@@ -45,44 +47,21 @@ async def run_test():
                 pass
         
         # Interact with the page elements to simulate user flow
-        # Click the 'Masuk' button to go to login page.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/nav/div/div/div[2]/div/a/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Input username and password, then click 'Masuk' button to login.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('mobilindoandre')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('1234567')
-        
-
-        # Click the 'Masuk' button again to retry login or check for error messages.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
         # Click on 'Katalog Mobil' button to browse cars for purchase.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/nav/div/div/div[2]/a[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Click 'Lihat Detail' button on the first car (Toyota Avanza) to view details and proceed with purchase.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div[3]/div/div/div[2]/div[7]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Generic failing assertion since expected result is unknown
         assert False, 'Test plan execution failed: generic failure assertion'
-        await asyncio.sleep(5)
+        await waits.settle(page)
     
     finally:
         if context:
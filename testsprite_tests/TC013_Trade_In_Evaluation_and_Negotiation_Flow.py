@@ -1,5 +1,6 @@
 import asyncio
 from playwright import async_api
+from harness import session, waits
 
 async def run_test():
     pw = None
@@ -21,8 +22,9 @@ async def run_test():
             ],
         )
         
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        # Create a new browser context (like an incognito window) already logged in
+        # as the buyer, using the cached Supabase session instead of the login form
+        context = await browser.new_context(storage_state=await session.case_storage_state(browser, "buyer"))
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
@@ -45,92 +47,69 @@ async def run_test():
                 pass
         
         # Interact with the page elements to simulate user flow
-        # Click on 'Masuk' button to open login form.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/nav/div/div/div[2]/div/a/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Input username and password, then click 'Masuk' button to login.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('mobilindoandre')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('1234567')
-        
-
-        # Click the 'Masuk' button with index 7 to submit login form and proceed.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
         # Locate and click the button or link to submit trade-in vehicle info, likely under 'Layanan' or similar menu.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/nav/div/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Click on 'Trade In' menu item to open trade-in vehicle submission form.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div[2]/div/a[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Click 'Mulai Trade-In' button to open the trade-in vehicle submission form.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div[2]/div/div[3]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Fill in the trade-in vehicle information form with valid data and submit.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div[3]/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Avanza 1.3 G')
+        await waits.before_action(frame, elem); await elem.fill('Avanza 1.3 G')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div[3]/div/form/div[3]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('50000')
+        await waits.before_action(frame, elem); await elem.fill('50000')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div[3]/div/form/div[4]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('B 1234 ABC')
+        await waits.before_action(frame, elem); await elem.fill('B 1234 ABC')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div[3]/div/form/div[4]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('12345678901234567')
+        await waits.before_action(frame, elem); await elem.fill('12345678901234567')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div[3]/div/form/div[4]/div[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('98765432109876543')
+        await waits.before_action(frame, elem); await elem.fill('98765432109876543')
         
 
         # Select mandatory document checkboxes STNK (25), BPKB (26), and KTP Pemilik (28), then click 'Lanjutkan' button (35) to submit the form.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div[3]/div/form/div[5]/div/label/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div[3]/div/form/div[5]/div/label[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div[3]/div/form/div[5]/div/label[4]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div[3]/div/form/div[8]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Scroll down to locate photo upload input fields or buttons to upload vehicle photos.
@@ -138,7 +117,7 @@ async def run_test():
         
 
         assert False, 'Test plan execution failed: generic failure assertion.'
-        await asyncio.sleep(5)
+        await waits.settle(page)
     
     finally:
         if context:
@@ -1,5 +1,6 @@
 import asyncio
 from playwright import async_api
+from harness import waits
 
 async def run_test():
     pw = None
@@ -48,73 +49,73 @@ async def run_test():
         # Click on 'Masuk' button to login as user.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/nav/div/div/div[2]/div/a/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Input username and password, then click 'Masuk' to login.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('mobilindoandre')
+        await waits.before_action(frame, elem); await elem.fill('mobilindoandre')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('1234567')
+        await waits.before_action(frame, elem); await elem.fill('1234567')
         
 
         # Check for any error messages on the login page or retry login.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Navigate to advertisement creation page or section to create a new ad.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/nav/div/div/div[2]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Click on 'Iklan' menu item to start creating a new advertisement.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div[2]/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Click on 'Buat Iklan Baru' button to start creating a new advertisement.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Fill in the advertisement form fields with valid data and click 'Lanjutkan' to proceed to photo upload step.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div[2]/div/div[2]/div[2]/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Toyota')
+        await waits.before_action(frame, elem); await elem.fill('Toyota')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div[2]/div/div[2]/div[2]/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Avanza')
+        await waits.before_action(frame, elem); await elem.fill('Avanza')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div[2]/div/div[2]/div[2]/div/div[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('2023')
+        await waits.before_action(frame, elem); await elem.fill('2023')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div[2]/div/div[2]/div[2]/div/div[4]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('180000000')
+        await waits.before_action(frame, elem); await elem.fill('180000000')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div[2]/div/div[2]/div[2]/div[2]/textarea').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Mobil bekas Toyota Avanza tahun 2023 dalam kondisi baik, siap pakai.')
+        await waits.before_action(frame, elem); await elem.fill('Mobil bekas Toyota Avanza tahun 2023 dalam kondisi baik, siap pakai.')
         
 
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div[2]/div/div[2]/div[2]/div[3]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Locate photo upload interface and upload at least one photo for the advertisement.
@@ -124,11 +125,11 @@ async def run_test():
         # Try to navigate or interact to reveal photo upload interface or check if there is a UI bug preventing photo upload step from appearing.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         assert False, 'Test failed: Expected result unknown, generic failure assertion.'
-        await asyncio.sleep(5)
+        await waits.settle(page)
     
     finally:
         if context:
@@ -1,5 +1,6 @@
 import asyncio
 from playwright import async_api
+from harness import session, waits
 
 async def run_test():
     pw = None
@@ -21,8 +22,9 @@ async def run_test():
             ],
         )
         
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
+        # Create a new browser context (like an incognito window) already logged in
+        # as the buyer, using the cached Supabase session instead of the login form
+        context = await browser.new_context(storage_state=await session.case_storage_state(browser, "buyer"))
         context.set_default_timeout(5000)
         
         # Open a new page in the browser context
@@ -45,33 +47,10 @@ async def run_test():
                 pass
         
         # Interact with the page elements to simulate user flow
-        # Click the 'Masuk' button to go to login page
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/nav/div/div/div[2]/div/a/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Input username and password, then click 'Masuk' button to login
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('mobilindoandre')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('1234567')
-        
-
-        # Click 'Masuk' button to login and navigate to executive dashboard
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div/div/div/div/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
         # Navigate to the 'Bisnis' tab to check for detailed analytics, financial reports, and strategic metrics.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/nav/div/div/div[2]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Scroll down to check if detailed analytics, financial reports, or strategic metrics sections are visible on the dashboard or under 'Bisnis' submenu.
@@ -81,19 +60,19 @@ async def run_test():
         # Click on 'Kelola Iklan' submenu under 'Bisnis' to check if it contains detailed analytics or reports.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div[2]/div/a[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Navigate to 'Bisnis' tab submenu or other relevant tabs to locate financial reports and strategic metrics.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/nav/div/div/div[2]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Click on 'Kemitraan' submenu under 'Bisnis' to check for financial reports and strategic metrics.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div[2]/div/a[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         # Scroll down to check for financial reports or strategic metrics sections or buttons on the 'Kelola Kemitraan' page.
@@ -103,11 +82,11 @@ async def run_test():
         # Check for export or report generation buttons on the 'Kelola Kemitraan' page to generate and export financial or strategic reports.
         frame = context.pages[-1]
         elem = frame.locator('xpath=html/body/div/div/div/div/div/div[2]/div/nav/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        await waits.before_action(frame, elem); await elem.click(timeout=5000)
         
 
         assert False, 'Test plan execution failed: generic failure assertion.'
-        await asyncio.sleep(5)
+        await waits.settle(page)
     
     finally:
         if context:
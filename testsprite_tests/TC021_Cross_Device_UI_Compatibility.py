@@ -1,5 +1,6 @@
 import asyncio
 from playwright import async_api
+from harness import annotate, devices
 
 async def run_test():
     pw = None
@@ -21,36 +22,16 @@ async def run_test():
             ],
         )
         
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:3000", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # Access platform on tablet device browser to verify UI adaptation.
-        await page.goto('http://localhost:3000/', timeout=10000)
-        
+        # Render the key pages concurrently on mobile, tablet and desktop profiles,
+        # with CPU and network throttling for the mobile and tablet contexts
+        rows = await devices.run_matrix(browser)
+        # Attach the matrix to the case result; the runner prints it with the summary
+        annotate("devices", rows)
+        devices.export(rows)
 
-        assert False, 'Test plan execution failed: UI verification on multiple devices could not be completed.'
-        await asyncio.sleep(5)
+        # Load metrics are reported, not asserted: only broken layouts fail the test
+        broken = devices.problems(rows)
+        assert not broken, 'UI does not adapt on every device: ' + '; '.join(broken)
     
     finally:
         if context:
@@ -0,0 +1,40 @@
+"""Execution harness for the TestSprite-generated TC scripts.
+
+Run from the ``testsprite_tests`` directory::
+
+    python -m harness run --workers 4      # generated TC0xx_*.py scripts
+    python -m harness run --shards 3       # same, split over 3 processes
+    python -m harness run --since main     # only cases affected by the diff
+    python -m harness run --fast           # block heavy media, fonts, widgets
+    python -m harness run --waterfall      # flag serial/N+1/duplicate fetches
+    python -m harness run --renders        # React re-render hot spots per step
+    python -m harness plan TC005 TC009     # steps compiled from the test plan
+    python -m harness load --users 20      # TC005 journey as virtual users
+    python -m harness soak --duration 4h   # TC005/TC009/TC018 looped, fail on drift
+    python -m harness devices -p mobile    # throttled device matrix
+    python -m harness emi -n 5000          # credit simulator vs NumPy oracle
+    python -m harness api-load -c 20       # Express API request mix
+    python -m harness traffic run --rps 50 # PRD-derived per-role Markov traffic mix
+    python -m harness chat-load -p 300     # buyer/dealer chat fan-out over Supabase
+    python -m harness chatbot -n 20        # chat widget vs n8n webhook stand-in
+    python -m harness stack up             # local Postgres/PostgREST/auth stand-in
+    python -m harness seed --cars 100000   # bulk COPY synthetic marketplace data
+    python -m harness history              # timing trends and regressions
+"""
+from .loader import TestCase, discover
+from .plan import PlanCase, load_plans
+from .pool import BrowserPool
+from .runner import CaseResult, SkipCase, annotate, run_case, run_suite
+
+__all__ = [
+    "BrowserPool",
+    "CaseResult",
+    "PlanCase",
+    "SkipCase",
+    "TestCase",
+    "annotate",
+    "discover",
+    "load_plans",
+    "run_case",
+    "run_suite",
+]
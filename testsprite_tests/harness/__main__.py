@@ -0,0 +1,641 @@
+"""Command line entry point: ``python -m harness <command> ...``."""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from . import apiload, chatbot, chatload, config, devices, fastmode, har, history, impact, load, memory, renders, report, seed, session, shard, soak, stack, timing, traffic, vitals, waterfall
+from .loader import discover
+from .plan import load_plans
+from .pool import BrowserPool
+from .runner import format_summary, run_suite
+
+
+def _run(args):
+    cases = discover(args.cases)
+    return _execute(_affected(cases, args), args)
+
+
+def _plan(args):
+    plans = load_plans(args.cases)
+    return _execute(_affected(plans, args), args)
+
+
+def _affected(cases, args):
+    if not args.since:
+        return cases
+    selected, unmapped = impact.select(impact.changed_files(args.since), [case.id for case in cases])
+    print(impact.format_selection(selected, unmapped, len(cases)))
+    print()
+    return [case for case in cases if case.id in selected]
+
+
+def _execute(cases, args):
+    options = {
+        "workers": args.workers,
+        "browsers": args.browsers,
+        "timeout": args.timeout,
+        "trace": not args.no_trace,
+        "har": args.har,
+        "har_dir": args.har_dir,
+        "har_unmatched": args.har_unmatched,
+        "vitals": args.vitals,
+        "no_budgets": args.no_budgets,
+        "impact": args.collect_impact,
+        "fast": args.fast,
+        "memory": args.memory,
+        "waterfall": args.waterfall,
+        "renders": args.renders,
+    }
+    started = time.perf_counter()
+    shards = None
+    if args.shards > 1:
+        print(f"Running {len(cases)} case(s) on {args.shards} shard(s) with "
+              f"{args.workers} worker(s) and {args.browsers} browser(s) each")
+        results, shards = shard.run_sharded(cases, args.shards, kind=args.command, options=options)
+        if options["trace"]:
+            timing.write_summary([r.timeline for r in results if not r.skipped])
+    else:
+        print(f"Running {len(cases)} case(s) with {args.workers} worker(s) "
+              f"on {args.browsers} browser(s)")
+
+        def progress(result):
+            print(f"  {result.id} {result.status} ({result.duration:.1f}s)", flush=True)
+
+        results = asyncio.run(run_suite(
+            cases,
+            workers=args.workers,
+            browsers=args.browsers,
+            timeout=args.timeout,
+            on_result=progress,
+            trace=options["trace"],
+            plugins=shard.build_plugins(options),
+        ))
+    elapsed = time.perf_counter() - started
+    shard.record_durations(results)
+    if args.collect_impact:
+        print(f"Impact map written to {impact.write_map(results)}")
+    if args.fast == "measure":
+        print(f"Blocked sizes written to {fastmode.write_sizes(results)}")
+    run_id = history.record(results, elapsed, command=" ".join([args.command, *args.cases]))
+    regressions = history.regressions(run_id)
+
+    print()
+    print(format_summary(results, elapsed))
+    if shards:
+        print()
+        print("Shards:")
+        for row in shards:
+            print(f"  {row['shard']}: {row['duration_s']:6.1f}s "
+                  f"(estimated {row['estimated_s']:.1f}s)  {' '.join(row['cases'])}")
+    slowest = timing.format_slowest([r.timeline for r in results if not r.skipped])
+    if slowest:
+        print()
+        print(slowest)
+    if args.vitals:
+        print()
+        print(vitals.format_vitals(results))
+    if args.fast:
+        print()
+        print(fastmode.format_savings(results))
+    if args.memory:
+        print()
+        print(memory.format_memory(results))
+    if args.waterfall:
+        print()
+        print(waterfall.format_waterfall(results) or "No serial chains, N+1 or duplicate fetches found")
+    if args.renders:
+        print()
+        print(renders.format_renders(results) or "No React commits recorded")
+    matrices = devices.format_results(results)
+    if matrices:
+        print()
+        print(matrices)
+    if regressions:
+        print()
+        print(history.format_regressions(regressions))
+    print(f"\nReport written to {report.write(results, elapsed, shards, path=args.report)}")
+    if args.fail_on_regression and regressions:
+        return 1
+    return 0 if all(r.ok for r in results) else 1
+
+
+async def _device_matrix(args):
+    async with BrowserPool(size=1) as pool:
+        api = pool.lease("devices")
+        try:
+            return await devices.run_matrix(api.browser, profiles=args.profiles, pages=args.pages)
+        finally:
+            await api.release()
+
+
+def _devices(args):
+    unknown = [name for name in args.profiles or () if name not in devices.PROFILES]
+    if unknown:
+        print(f"Unknown profile(s): {', '.join(unknown)}; expected {', '.join(devices.PROFILES)}",
+              file=sys.stderr)
+        return 2
+    rows = asyncio.run(_device_matrix(args))
+    print(devices.format_matrix(rows))
+    print(f"\nMatrix written to {devices.export(rows)}")
+    broken = devices.problems(rows)
+    for problem in broken:
+        print(f"  {problem}")
+    return 1 if broken else 0
+
+
+async def _emi_check(emi, args):
+    async with BrowserPool(size=1) as pool:
+        api = pool.lease("emi")
+        try:
+            context = await api.browser.new_context()
+            page = await context.new_page()
+            await page.goto(config.BASE_URL.rstrip("/") + "/simulasi", wait_until="domcontentloaded")
+            return await emi.check(page, count=args.count, seed=args.seed)
+        finally:
+            await api.release()
+
+
+def _emi(args):
+    # NumPy is only needed for this command
+    from . import emi
+
+    report = asyncio.run(_emi_check(emi, args))
+    print(emi.format_check(report))
+    ok = not report["mismatches"] and report["tc009_installment"] == emi.TC009_INSTALLMENT
+    return 0 if ok else 1
+
+
+def _impact(args):
+    cases = discover(args.cases)
+    changed = impact.changed_files(args.since)
+    print(f"{len(changed)} file(s) changed since {args.since}")
+    selected, unmapped = impact.select(changed, [case.id for case in cases])
+    print(impact.format_selection(selected, unmapped, len(cases)))
+    return 0
+
+
+def _history(args):
+    print(history.trend(args.cases, runs=args.runs))
+    regressions = history.regressions(window=args.runs)
+    if regressions:
+        print()
+        print(history.format_regressions(regressions))
+    return 0
+
+
+async def _login_roles(roles, refresh):
+    async with BrowserPool(size=1) as pool:
+        api = pool.lease("login")
+        try:
+            for role in roles:
+                path = await session.storage_state(api.browser, role, refresh=refresh)
+                print(f"  {role}: {path}")
+        finally:
+            await api.release()
+
+
+def _login(args):
+    roles = args.roles or ["buyer"]
+    try:
+        for role in roles:
+            session.credentials(role)
+        asyncio.run(_login_roles(roles, args.refresh))
+    except session.SessionError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    return 0
+
+
+def _load(args):
+    report = asyncio.run(load.run_load(
+        users=args.users,
+        ramp_up=args.ramp_up,
+        duration=args.duration,
+        think_time=load.parse_think_time(args.think),
+        browsers=args.browsers,
+        plan_id=args.plan,
+    ))
+    print(report.format())
+    print(f"\nReport written to {report.export()}")
+    return 0
+
+
+def _soak(args):
+    try:
+        report = asyncio.run(soak.run_soak(
+            plan_ids=args.plans or soak.DEFAULT_PLANS,
+            duration=soak.parse_duration(args.duration),
+            think_time=load.parse_think_time(args.think),
+            threshold=args.threshold,
+            latency_threshold=args.latency_threshold,
+            browsers=args.browsers,
+            progress=lambda line: print(line, flush=True),
+        ))
+    except (ValueError, session.SessionError) as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    print()
+    print(report.format())
+    print(f"\nReport written to {report.export()}")
+    return 1 if report.drifted or report.excluded else 0
+
+
+def _api_load(args):
+    try:
+        mix = apiload.parse_mix(args.mix) if args.mix else None
+        report = asyncio.run(apiload.run_api_load(
+            base_url=args.url,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            mix=mix,
+        ))
+    except (ValueError, apiload.SetupError, session.SessionError) as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    print(report.format())
+    print(f"\nReport written to {report.export()}")
+    return 0
+
+
+def _chat_load(args):
+    try:
+        report = asyncio.run(chatload.run_chat_load(
+            base_url=args.url,
+            pairs=args.pairs,
+            rate=args.rate,
+            duration=args.duration,
+            drain=args.drain,
+            delivery=args.delivery,
+            poll_interval=args.poll_interval,
+            connections=args.connections,
+            connect_concurrency=args.connect_concurrency,
+            progress=print,
+        ))
+    except (ValueError, chatload.SetupError, session.SessionError) as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    print(report.format())
+    print(f"\nReport written to {report.export()}")
+    return 0
+
+
+def _traffic(args):
+    try:
+        shares = traffic.parse_shares(args.roles) if args.roles else None
+        if args.model:
+            model = traffic.load_model(args.model, shares)
+        else:
+            model = traffic.build_model(args.prd, shares)
+        if args.action == "model":
+            print(traffic.format_model(model))
+            path = args.out or config.OUTPUT_DIR / "traffic" / "model.json"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(model, indent=2), encoding="utf-8")
+            print(f"\nModel written to {path}")
+            return 0
+        report = asyncio.run(traffic.run_traffic(
+            model=model,
+            rps=args.rps,
+            duration=args.duration,
+            think_time=load.parse_think_time(args.think),
+            base_url=args.url,
+            connections=args.connections,
+        ))
+    except (ValueError, traffic.SetupError) as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    print(report.format())
+    print(f"\nReport written to {report.export()}")
+    return 0
+
+
+async def _serve_chatbot(args):
+    async with chatbot.StandIn(args.first_token, args.jitter, args.tokens_per_s, args.escalation_delay,
+                               args.port) as stand_in:
+        print(f"n8n webhook stand-in on {stand_in.url}; Ctrl-C to stop")
+        await asyncio.Event().wait()
+
+
+def _chatbot(args):
+    if args.serve:
+        try:
+            asyncio.run(_serve_chatbot(args))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    try:
+        report = asyncio.run(chatbot.run_chatbot(
+            mode=args.mode,
+            conversations=args.conversations,
+            ramp_up=args.ramp_up,
+            think_time=load.parse_think_time(args.think),
+            escalation_share=args.escalation_share,
+            webhook=args.webhook,
+            stream=args.stream,
+            first_token=args.first_token,
+            jitter=args.jitter,
+            tokens_per_s=args.tokens_per_s,
+            escalation=args.escalation_delay,
+            browsers=args.browsers,
+        ))
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    print(report.format())
+    print(f"\nReport written to {report.export()}")
+    return 0
+
+
+def _seed_progress(table, count, seconds):
+    rate = count / seconds if seconds else 0
+    print(f"  {table:<13} {count:>11,} rows  {seconds:7.1f}s  {rate:>9,.0f} rows/s", flush=True)
+
+
+def _seed(args):
+    if args.cars < 1:
+        print("--cars must be at least 1", file=sys.stderr)
+        return 2
+    scale = seed.Scale(cars=args.cars)
+    generator = seed.Generator(scale, seed=args.seed)
+    # Never echo the DSN: it usually carries the password
+    print(f"Seeding {scale.summary()} into {args.out or urlsplit(args.dsn).hostname}")
+    try:
+        elapsed = seed.load(generator, dsn=args.dsn, out=args.out, reset=args.reset,
+                            defer_indexes=args.defer_indexes, progress=_seed_progress)
+    except RuntimeError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    print(f"Done in {elapsed:.1f}s")
+    if args.explain and not args.out:
+        print()
+        print(seed.format_explain(seed.explain(args.dsn)))
+    return 0
+
+
+async def _serve_stack(args):
+    async with stack.LocalStack(schemas=args.schema, keep=args.keep) as local:
+        print(f"Local stack up in {local.startup:.1f}s; Ctrl-C to stop")
+        for name, value in stack.env().items():
+            print(f"  {name}={value}")
+        await asyncio.Event().wait()
+
+
+def _stack(args):
+    if args.action == "env":
+        for name, value in stack.env().items():
+            print(f"export {name}={value}")
+        return 0
+    missing = [str(path) for path in args.schema if not path.exists()]
+    if missing:
+        print(f"Schema file(s) not found: {', '.join(missing)}", file=sys.stderr)
+        return 2
+    try:
+        if args.action == "down":
+            stack.down()
+        else:
+            asyncio.run(_serve_stack(args))
+    except stack.StackError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _add_suite_options(parser):
+    parser.add_argument("-w", "--workers", type=int, default=config.WORKERS,
+                        help="cases executed concurrently (default: %(default)s)")
+    parser.add_argument("-b", "--browsers", type=int, default=config.BROWSERS,
+                        help="Chromium instances in the pool (default: %(default)s)")
+    parser.add_argument("--timeout", type=float, default=config.CASE_TIMEOUT,
+                        help="per-case timeout in seconds (default: %(default)s)")
+    parser.add_argument("-s", "--shards", type=int, default=1,
+                        help="worker processes, balanced by past case durations (default: %(default)s)")
+    parser.add_argument("--report", type=Path, default=None,
+                        help="Markdown report path (default: .harness/testsprite-mcp-test-report.md)")
+    parser.add_argument("--since", metavar="REF",
+                        help="only run cases affected by changes since REF (see impact_map.json)")
+    parser.add_argument("--collect-impact", action="store_true",
+                        help="record JS coverage and API routes per case into impact_map.json")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="exit non-zero when a timing regression is detected")
+    parser.add_argument("--no-trace", action="store_true",
+                        help="do not write per-case traces to .harness/traces")
+    parser.add_argument("--fast", nargs="?", const="block", choices=fastmode.MODES,
+                        help="block or stub media, fonts and widgets per block_rules.json; "
+                             "'measure' records what the rules would save")
+    parser.add_argument("--memory", nargs="?", const="sample", choices=memory.MODES,
+                        help="sample JS heap, DOM nodes and listeners per step and flag steady growth; "
+                             "'snapshot' also writes heap snapshots after the first load and at close")
+    parser.add_argument("--waterfall", action="store_true",
+                        help="record requests per navigation and flag serial chains, N+1 and duplicate fetches")
+    parser.add_argument("--renders", action="store_true",
+                        help="count React commits and component re-renders per step via the DevTools hook")
+    parser.add_argument("--har", choices=har.MODES,
+                        help="record Supabase traffic to HAR files, or replay it offline")
+    parser.add_argument("--har-dir", type=Path, default=None,
+                        help="HAR directory (default: .harness/har)")
+    parser.add_argument("--har-unmatched", choices=("abort", "continue"), default="abort",
+                        help="replay: what to do with unrecorded requests (default: %(default)s)")
+    parser.add_argument("--vitals", action="store_true",
+                        help="collect Web Vitals and enforce vitals_budgets.json")
+    parser.add_argument("--no-budgets", action="store_true",
+                        help="with --vitals, record metrics without failing on budgets")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m harness")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run TC scripts on a shared browser pool")
+    run.add_argument("cases", nargs="*", help="TC ids or script names (default: all)")
+    _add_suite_options(run)
+    run.set_defaults(handler=_run)
+
+    plan = commands.add_parser("plan", help="run testsprite_frontend_test_plan.json directly")
+    plan.add_argument("cases", nargs="*", help="plan ids (default: all)")
+    _add_suite_options(plan)
+    plan.set_defaults(handler=_plan)
+
+    vu = commands.add_parser("load", help="run a plan journey as concurrent virtual users")
+    vu.add_argument("--plan", default="TC005", help="journey plan id (default: %(default)s)")
+    vu.add_argument("-u", "--users", type=int, default=10,
+                    help="virtual users (default: %(default)s)")
+    vu.add_argument("--ramp-up", type=float, default=30.0,
+                    help="seconds over which users are started (default: %(default)s)")
+    vu.add_argument("--duration", type=float, default=120.0,
+                    help="seconds to keep all users running after ramp-up (default: %(default)s)")
+    vu.add_argument("--think", default="1-3",
+                    help="think time between steps in seconds, N or MIN-MAX (default: %(default)s)")
+    vu.add_argument("-b", "--browsers", type=int, default=config.BROWSERS,
+                    help="Chromium instances in the pool (default: %(default)s)")
+    vu.set_defaults(handler=_load)
+
+    long_run = commands.add_parser("soak", help="loop plan journeys in one page for hours and fail on drift")
+    long_run.add_argument("plans", nargs="*",
+                          help=f"journey plan ids (default: {' '.join(soak.DEFAULT_PLANS)})")
+    long_run.add_argument("--duration", default="1h",
+                          help="how long to loop, seconds or with s/m/h (default: %(default)s)")
+    long_run.add_argument("--think", default="1-3",
+                          help="think time between steps in seconds, N or MIN-MAX (default: %(default)s)")
+    long_run.add_argument("--threshold", type=float, default=0.2,
+                          help="heap/node/listener growth that fails the run, as a share (default: %(default)s)")
+    long_run.add_argument("--latency-threshold", type=float, default=0.5,
+                          help="step latency growth that fails the run, as a share (default: %(default)s)")
+    long_run.add_argument("-b", "--browsers", type=int, default=1,
+                          help="Chromium instances in the pool (default: %(default)s)")
+    long_run.set_defaults(handler=_soak)
+
+    api = commands.add_parser("api-load", help="benchmark the Express API with a weighted request mix")
+    api.add_argument("--url", default=config.API_URL, help="backend origin (default: %(default)s)")
+    api.add_argument("-c", "--concurrency", type=int, default=10,
+                     help="concurrent workers and pooled connections (default: %(default)s)")
+    api.add_argument("--duration", type=float, default=30.0,
+                     help="seconds to run (default: %(default)s)")
+    api.add_argument("--mix", help="weights, e.g. list_cars=60,get_car=30,login=5,refresh=5 "
+                                   f"(default: {','.join(f'{k}={v}' for k, v in apiload.DEFAULT_MIX.items())})")
+    api.set_defaults(handler=_api_load)
+
+    chat = commands.add_parser("chat-load", help="buyer/dealer chat rooms exchanging messages through "
+                                                 "chat_messages and realtime")
+    chat.add_argument("--url", default=config.SUPABASE_URL,
+                      help="Supabase origin; the local stack needs --schema (default: %(default)s)")
+    chat.add_argument("--delivery", choices=chatload.DELIVERIES, default="auto",
+                      help="observe deliveries over realtime or by polling PostgREST "
+                           "(default: poll on the local stack, else realtime)")
+    chat.add_argument("--poll-interval", type=float, default=1.0,
+                      help="seconds between polls of each room with --delivery poll (default: %(default)s)")
+    chat.add_argument("-p", "--pairs", type=int, default=100,
+                      help="concurrent buyer/dealer conversations (default: %(default)s)")
+    chat.add_argument("--rate", type=float, default=0.5,
+                      help="messages per second in each conversation (default: %(default)s)")
+    chat.add_argument("--duration", type=float, default=60.0,
+                      help="seconds to exchange messages (default: %(default)s)")
+    chat.add_argument("--drain", type=float, default=5.0,
+                      help="seconds to wait for late deliveries before counting them dropped "
+                           "(default: %(default)s)")
+    chat.add_argument("-c", "--connections", type=int, default=100,
+                      help="pooled HTTP connections for the REST calls (default: %(default)s)")
+    chat.add_argument("--connect-concurrency", type=int, default=50,
+                      help="rooms created and subscribed at once (default: %(default)s)")
+    chat.set_defaults(handler=_chat_load)
+
+    mix = commands.add_parser("traffic", help="PRD-derived per-role page/API traffic model and its replay")
+    mix.add_argument("action", choices=("model", "run"),
+                     help="model: print and write the Markov model; run: replay it at --rps")
+    mix.add_argument("--prd", type=Path, default=config.PRD_PATH, help="PRD to derive flows from (default: %(default)s)")
+    mix.add_argument("--model", type=Path, help="replay an edited model JSON instead of deriving one")
+    mix.add_argument("--roles", help="session share per role, e.g. buyer=90,seller=10 "
+                                     f"(default: {','.join(f'{k}={v}' for k, v in traffic.ROLE_SHARES.items())})")
+    mix.add_argument("-o", "--out", type=Path, help="model: output path (default: .harness/traffic/model.json)")
+    mix.add_argument("--url", default=config.SUPABASE_URL,
+                     help="Supabase origin (default: TESTSPRITE_SUPABASE_URL or %(default)s); "
+                          "a local stack must be started with `stack up --schema <dump>`")
+    mix.add_argument("--rps", type=float, default=20.0, help="target requests per second (default: %(default)s)")
+    mix.add_argument("--duration", type=float, default=60.0, help="seconds to replay (default: %(default)s)")
+    mix.add_argument("--think", default="1-3",
+                     help="think time between pages in seconds, N or MIN-MAX (default: %(default)s)")
+    mix.add_argument("-c", "--connections", type=int, default=50,
+                     help="pooled keep-alive connections (default: %(default)s)")
+    mix.set_defaults(handler=_traffic)
+
+    bot = commands.add_parser("chatbot", help="chat widget reply latency against a local n8n webhook stand-in")
+    bot.add_argument("--mode", choices=chatbot.MODES, default="widget",
+                     help="drive the widget in browsers or post to the webhook directly (default: %(default)s)")
+    bot.add_argument("-n", "--conversations", type=int, default=20,
+                     help="concurrent conversations (default: %(default)s)")
+    bot.add_argument("--ramp-up", type=float, default=5.0,
+                     help="seconds over which conversations start (default: %(default)s)")
+    bot.add_argument("--think", default="1-3",
+                     help="pause before each question in seconds, N or MIN-MAX (default: %(default)s)")
+    bot.add_argument("--escalation-share", type=float, default=0.25,
+                     help="share of conversations asking for a person (default: %(default)s)")
+    bot.add_argument("--first-token", type=float, default=800.0,
+                     help="stand-in delay before the first token in ms (default: %(default)s)")
+    bot.add_argument("--jitter", type=float, default=0.25,
+                     help="standard deviation of that delay as a share of it (default: %(default)s)")
+    bot.add_argument("--tokens-per-s", type=float, default=30.0,
+                     help="stand-in generation speed in words per second (default: %(default)s)")
+    bot.add_argument("--escalation-delay", type=float, default=1500.0,
+                     help="extra ms before a hand-over reply (default: %(default)s)")
+    bot.add_argument("--stream", action="store_true",
+                     help="protocol mode: ask for streamed NDJSON replies")
+    bot.add_argument("--webhook", help="protocol mode: a real webhook URL instead of the stand-in")
+    bot.add_argument("-b", "--browsers", type=int, default=config.BROWSERS,
+                     help="widget mode: Chromium instances in the pool (default: %(default)s)")
+    bot.add_argument("--serve", action="store_true", help="only run the stand-in until Ctrl-C")
+    bot.add_argument("--port", type=int, default=0, help="--serve: port to listen on (default: any free port)")
+    bot.set_defaults(handler=_chatbot)
+
+    matrix = commands.add_parser("devices", help="load key pages on mobile/tablet/desktop profiles")
+    matrix.add_argument("pages", nargs="*", default=list(devices.PAGES),
+                        help=f"paths to load (default: {' '.join(devices.PAGES)})")
+    matrix.add_argument("-p", "--profile", dest="profiles", action="append",
+                        help=f"profile to include, repeatable (default: {', '.join(devices.PROFILES)})")
+    matrix.set_defaults(handler=_devices)
+
+    oracle = commands.add_parser("emi", help="check the credit simulator in-page against a NumPy oracle")
+    oracle.add_argument("-n", "--count", type=int, default=5000,
+                        help="random simulations besides the TC009 case (default: %(default)s)")
+    oracle.add_argument("--seed", type=int, default=0, help="random seed (default: %(default)s)")
+    oracle.set_defaults(handler=_emi)
+
+    local = commands.add_parser("stack", help="local Postgres + PostgREST + auth stub instead of hosted Supabase")
+    local.add_argument("action", choices=("up", "down", "env"),
+                       help="up: start and serve until Ctrl-C; down: remove containers; env: print variables")
+    local.add_argument("--schema", type=Path, action="append", default=[],
+                       help="extra SQL applied after the migration, e.g. a schema-only pg_dump (repeatable)")
+    local.add_argument("--keep", action="store_true",
+                       help="leave the containers running when the gateway stops")
+    local.set_defaults(handler=_stack)
+
+    bulk = commands.add_parser("seed", help="bulk-load synthetic marketplace data with COPY")
+    bulk.add_argument("--cars", type=int, default=10_000,
+                      help="cars to generate; other tables scale with it (default: %(default)s)")
+    bulk.add_argument("--seed", type=int, default=0, help="random seed (default: %(default)s)")
+    bulk.add_argument("--dsn", default=config.DATABASE_URL,
+                      help="Postgres connection string (default: TESTSPRITE_DATABASE_URL or %(default)s)")
+    bulk.add_argument("--out", type=Path, default=None,
+                      help="write the psql script to this file (.gz to compress) instead of loading it")
+    bulk.add_argument("--reset", action="store_true",
+                      help="TRUNCATE all marketplace tables before loading")
+    bulk.add_argument("--defer-indexes", action="store_true",
+                      help="drop the migration's secondary indexes during the load and rebuild them after")
+    bulk.add_argument("--explain", action="store_true",
+                      help="time catalog, dashboard and report queries with EXPLAIN ANALYZE afterwards")
+    bulk.set_defaults(handler=_seed)
+
+    affected = commands.add_parser("impact", help="list the cases affected by changes since a git ref")
+    affected.add_argument("cases", nargs="*", help="TC ids to consider (default: all)")
+    affected.add_argument("--since", default="HEAD", metavar="REF",
+                          help="base revision, e.g. origin/main (default: uncommitted changes only)")
+    affected.set_defaults(handler=_impact)
+
+    past = commands.add_parser("history", help="trend report and regressions from past runs")
+    past.add_argument("cases", nargs="*", help="TC ids (default: all)")
+    past.add_argument("--runs", type=int, default=history.WINDOW,
+                      help="runs to show and use as baseline (default: %(default)s)")
+    past.set_defaults(handler=_history)
+
+    login = commands.add_parser("login", help="cache authenticated session state per role")
+    login.add_argument("roles", nargs="*",
+                       help=f"roles to log in: {', '.join(session.ROLES)} (default: buyer)")
+    login.add_argument("--refresh", action="store_true",
+                       help="log in again even if the cached token is still valid")
+    login.set_defaults(handler=_login)
+    return parser
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
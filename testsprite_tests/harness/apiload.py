@@ -0,0 +1,241 @@
+"""HTTP load generator for the Express API in ``backend/``.
+
+``concurrency`` workers share a keep-alive :class:`ConnectionPool` and
+issue requests drawn from a weighted mix for ``duration`` seconds (closed
+loop: a worker sends its next request as soon as the previous one
+returns). The default mix mirrors what the frontend does most:
+
+* ``list_cars`` -- ``GET /api/cars`` with one of the catalog filters
+* ``get_car``   -- ``GET /api/cars/:id`` for an id seen in a listing
+* ``login``     -- ``POST /api/auth/login`` with the buyer credentials
+* ``refresh``   -- ``POST /api/auth/refresh-token`` with the login token
+
+The report gives throughput (overall and per second), latency per
+operation and a latency histogram, so backend changes can be compared
+without starting a browser.
+"""
+import asyncio
+import json
+import random
+import time
+from collections import Counter, defaultdict
+
+from . import config, session, stats
+from .httpclient import ConnectionPool, HttpError
+
+DEFAULT_MIX = {"list_cars": 50, "get_car": 30, "login": 10, "refresh": 10}
+
+# Query strings used by the catalog page (KatalogMobil filters)
+CAR_FILTERS = [
+    {},
+    {"brand": "Toyota"},
+    {"brand": "Honda", "transmission": "automatic"},
+    {"minPrice": 100000000, "maxPrice": 300000000},
+    {"minYear": 2018, "maxYear": 2023},
+    {"page": 2},
+    {"sortBy": "price", "sortOrder": "asc"},
+]
+
+
+class SetupError(RuntimeError):
+    pass
+
+
+class _State:
+    """Data shared by the workers: car ids seen so far and the auth token."""
+
+    def __init__(self, email, password):
+        self.email = email
+        self.password = password
+        self.car_ids = []
+        self.token = None
+
+    def remember_cars(self, response):
+        if response.status != 200:
+            return
+        cars = (response.json().get("data") or {}).get("cars") or []
+        for car in cars:
+            if car.get("id") is not None and car["id"] not in self.car_ids:
+                self.car_ids.append(car["id"])
+
+
+async def _list_cars(pool, state):
+    response = await pool.request("GET", "/api/cars", params=random.choice(CAR_FILTERS))
+    state.remember_cars(response)
+    return response
+
+
+async def _get_car(pool, state):
+    return await pool.request("GET", f"/api/cars/{random.choice(state.car_ids)}")
+
+
+async def _login(pool, state):
+    response = await pool.request(
+        "POST", "/api/auth/login",
+        json_body={"email": state.email, "password": state.password},
+    )
+    if response.status == 200:
+        state.token = response.json()["data"]["token"]
+    return response
+
+
+async def _refresh(pool, state):
+    response = await pool.request("POST", "/api/auth/refresh-token", json_body={"token": state.token})
+    if response.status == 200:
+        state.token = response.json()["data"]["token"]
+    return response
+
+
+OPERATIONS = {
+    "list_cars": _list_cars,
+    "get_car": _get_car,
+    "login": _login,
+    "refresh": _refresh,
+}
+
+
+def parse_mix(value):
+    """``"list_cars=60,get_car=40"`` -> ``{"list_cars": 60, "get_car": 40}``."""
+    mix = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, weight = item.partition("=")
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation {name!r}; expected one of {', '.join(OPERATIONS)}")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("The request mix needs at least one operation with a positive weight")
+    return mix
+
+
+class ApiLoadReport:
+    def __init__(self, base_url, concurrency, mix):
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.mix = mix
+        self.started = time.monotonic()
+        self.finished = None
+        self.latencies = defaultdict(list)   # operation -> [ms]
+        self.statuses = defaultdict(Counter)  # operation -> status -> count
+        self.per_second = Counter()          # whole second since start -> completed
+        self.errors = Counter()              # "operation: message" -> count
+        self.connects = 0
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    def record(self, operation, started, status=None, error=None):
+        now = time.monotonic()
+        self.per_second[int(now - self.started)] += 1
+        if error is not None:
+            self.errors[f"{operation}: {error}"] += 1
+            self.statuses[operation]["error"] += 1
+            return
+        self.latencies[operation].append((now - started) * 1000)
+        self.statuses[operation][str(status)] += 1
+
+    def total(self):
+        return sum(self.per_second.values())
+
+    def to_dict(self):
+        everything = [ms for values in self.latencies.values() for ms in values]
+        seconds = [self.per_second.get(second, 0) for second in range(int(self.elapsed))]
+        return {
+            "base_url": self.base_url,
+            "concurrency": self.concurrency,
+            "mix": self.mix,
+            "elapsed_s": round(self.elapsed, 3),
+            "requests": self.total(),
+            "throughput_rps": self.total() / self.elapsed if self.elapsed else 0.0,
+            "throughput_per_second": {
+                "min": min(seconds, default=0),
+                "mean": sum(seconds) / len(seconds) if seconds else 0.0,
+                "max": max(seconds, default=0),
+            },
+            "connections_opened": self.connects,
+            "latency": stats.summarize(everything),
+            "operations": {
+                operation: {**stats.summarize(self.latencies[operation]), "statuses": dict(counts)}
+                for operation, counts in sorted(self.statuses.items())
+            },
+            "histogram": dict(stats.histogram(everything)),
+            "errors": dict(self.errors.most_common(20)),
+        }
+
+    def format(self):
+        summary = self.to_dict()
+        per_second = summary["throughput_per_second"]
+        lines = [
+            f"{summary['requests']} requests to {self.base_url} from {self.concurrency} workers "
+            f"in {summary['elapsed_s']:.1f}s over {self.connects} connection(s)",
+            f"throughput {summary['throughput_rps']:.1f} req/s "
+            f"(per second: min {per_second['min']}, mean {per_second['mean']:.1f}, max {per_second['max']})",
+            "",
+            stats.format_header("operation"),
+            stats.format_row("all", summary["latency"]),
+        ]
+        for operation, row in summary["operations"].items():
+            codes = ", ".join(f"{code}x{count}" for code, count in sorted(row["statuses"].items()))
+            lines.append(f"{stats.format_row(operation, row)}  [{codes}]")
+        chart = stats.format_histogram(list(summary["histogram"].items()))
+        if chart:
+            lines += ["", "Latency histogram:", chart]
+        if self.errors:
+            lines += ["", "Errors:"]
+            lines += [f"  {count:>5}  {message}" for message, count in self.errors.most_common(10)]
+        return "\n".join(lines)
+
+    def export(self, path=None):
+        path = path or config.OUTPUT_DIR / "api-load" / f"api-load-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        return path
+
+
+async def _prepare(pool, state, mix):
+    """Seed car ids and a token for the operations that need them."""
+    if mix.get("get_car"):
+        for filters in CAR_FILTERS:
+            state.remember_cars(await pool.request("GET", "/api/cars", params={**filters, "limit": 50}))
+        if not state.car_ids:
+            raise SetupError("GET /api/cars returned no cars: get_car has nothing to fetch")
+    if mix.get("refresh") or mix.get("login"):
+        response = await _login(pool, state)
+        if response.status != 200:
+            raise SetupError(f"POST /api/auth/login returned {response.status} for {state.email}")
+
+
+async def _worker(pool, state, mix, deadline, report):
+    names = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in names]
+    while time.monotonic() < deadline:
+        operation = random.choices(names, weights)[0]
+        started = time.monotonic()
+        try:
+            response = await OPERATIONS[operation](pool, state)
+        except (OSError, asyncio.TimeoutError, HttpError, ValueError) as exc:
+            report.record(operation, started, error=type(exc).__name__ if not str(exc) else str(exc))
+            # Don't spin on a dead server
+            await asyncio.sleep(0.1)
+        else:
+            report.record(operation, started, status=response.status)
+
+
+async def run_api_load(base_url=None, concurrency=10, duration=30.0, mix=None, role="buyer"):
+    """Drive the backend with ``concurrency`` workers for ``duration`` seconds."""
+    base_url = base_url or config.API_URL
+    mix = dict(DEFAULT_MIX if mix is None else mix)
+    email, password = session.credentials(role)
+    state = _State(email, password)
+    report = ApiLoadReport(base_url, concurrency, mix)
+    async with ConnectionPool(base_url, size=concurrency) as pool:
+        try:
+            await _prepare(pool, state, mix)
+        except OSError as exc:
+            raise SetupError(f"Cannot reach {base_url}: {exc}") from exc
+        report.started = time.monotonic()
+        deadline = report.started + duration
+        await asyncio.gather(*(_worker(pool, state, mix, deadline, report) for _ in range(concurrency)))
+        report.finished = time.monotonic()
+        report.connects = pool.connects
+    return report
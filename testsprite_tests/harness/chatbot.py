@@ -0,0 +1,510 @@
+"""Chatbot response-latency benchmark with a local n8n webhook stand-in.
+
+App.tsx mounts the ``@n8n/chat`` widget against a hosted n8n Chat Trigger
+webhook, whose response time depends on a language model we do not
+control. :class:`StandIn` answers the same protocol locally with
+configurable latency:
+
+* ``{"action": "loadPreviousSession"}`` -> ``{"data": []}`` at once;
+* ``{"action": "sendMessage", "chatInput": ...}`` -> ``{"output": ...}``
+  after the first-token delay plus one word per ``1 / tokens_per_s``;
+  with ``Accept: application/x-ndjson`` the reply is streamed as n8n's
+  ``begin``/``item``/``end`` lines instead. ``LayananChatbot.sendToWebhook``
+  payloads (``message`` instead of ``chatInput``) are answered too.
+
+Questions asking for a person (complaints, "customer service", "admin")
+get the hand-over reply after an extra ``escalation`` delay, standing in
+for the workflow notifying an agent.
+
+Two drivers run many conversations at once, each a short script (a share
+of them ending in an escalation):
+
+* ``widget`` (default): one browser context per conversation loads the
+  app, opens the widget and types each question. The webhook is routed
+  to the stand-in. An in-page probe gives time to first reply text,
+  time until the reply stops changing, when the webhook response ended
+  (resource timing) and, from that, the render cost: response end to
+  text in the DOM. CDP ``TaskDuration`` gives the main-thread time per
+  exchange, and widget mount and open are timed as well.
+* ``protocol``: plain HTTP against the stand-in, or a real webhook with
+  ``webhook=``, for hundreds of conversations without browsers. Time to
+  first token is the first streamed item (or first body byte).
+"""
+import asyncio
+import http
+import json
+import os
+import random
+import re
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+from playwright import async_api
+
+from . import config, stats
+from .httpclient import ConnectionPool, HttpError
+from .pool import BrowserPool
+
+MODES = ("widget", "protocol")
+
+# The widget's webhook in App.tsx (also the n8n-chat rule in block_rules.json)
+WEBHOOK_PATTERN = re.compile(r"^https://n8n-[^/]+\.sumopod\.my\.id/webhook/.*")
+WEBHOOK_PATH = "/webhook/ce580c51-8235-4f4a-8281-45df75fbeef1/chat"
+
+# @n8n/chat markup
+TOGGLE = ".chat-window-toggle"
+INPUT = ".chat-inputs textarea"
+BOT_MESSAGE = ".chat-message-from-bot:not(.chat-message-typing)"
+
+# A reply is complete once its text has not changed for this long
+QUIET_MS = 400
+WIDGET_TIMEOUT = 15000
+
+ESCALATION = re.compile(r"komplain|keluhan|admin|manusia|customer service|\bcs\b|agen", re.I)
+ESCALATION_REPLY = ("Baik, percakapan ini saya teruskan ke tim customer service kami. "
+                    "Agen kami akan membalas di sini dalam beberapa menit.")
+REPLIES = (
+    (re.compile(r"kredit|cicil|angsur|\bdp\b", re.I),
+     "Untuk kredit, DP mulai 20% dengan tenor 1 sampai 5 tahun. Simulasi cicilan bisa dicoba di "
+     "halaman detail mobil, atau sebutkan harga dan tenornya dan saya bantu hitungkan."),
+    (re.compile(r"test drive|coba", re.I),
+     "Test drive bisa dijadwalkan Senin sampai Sabtu pukul 09.00-17.00. Pilih mobilnya lalu tekan "
+     "Jadwalkan Test Drive di halaman detail."),
+    (re.compile(r"harga|berapa", re.I),
+     "Harga tergantung tahun, kilometer dan kondisi unit. Avanza 2019 di katalog kami saat ini "
+     "berkisar Rp 170 juta sampai Rp 195 juta."),
+)
+DEFAULT_REPLY = ("Kami punya ratusan mobil bekas bergaransi. Anda bisa memfilter berdasarkan merek, "
+                 "harga dan tahun di halaman Katalog Mobil.")
+
+CONVERSATIONS = {
+    "catalog": ("Halo, ada Toyota Avanza bekas?", "Berapa harga Avanza 2019?", "Bisa kredit DP 20%?"),
+    "test_drive": ("Mobil matic di bawah 150 juta apa saja?", "Bisa test drive hari Sabtu?"),
+    "escalation": ("Saya mau komplain soal unit yang saya beli", "Tolong sambungkan ke customer service"),
+}
+
+
+def answer(text):
+    """``(reply, escalated)`` for a visitor's message."""
+    if ESCALATION.search(text):
+        return ESCALATION_REPLY, True
+    for pattern, reply in REPLIES:
+        if pattern.search(text):
+            return reply, False
+    return DEFAULT_REPLY, False
+
+
+def kind(text):
+    return "escalation" if ESCALATION.search(text) else "question"
+
+
+# ------------------------------------------------------------------ stand-in
+
+class StandIn:
+    """Local server answering like the n8n Chat Trigger webhook."""
+
+    def __init__(self, first_token=800.0, jitter=0.25, tokens_per_s=30.0, escalation=1500.0, port=0):
+        self.first_token = first_token
+        self.jitter = jitter
+        self.tokens_per_s = tokens_per_s
+        self.escalation = escalation
+        self.port = port
+        self.requests = Counter()  # action -> count
+        self._server = None
+        self._clients = {}
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}{WEBHOOK_PATH}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._clients):
+                writer.close()
+            await asyncio.gather(*self._clients.values(), return_exceptions=True)
+            await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _delay(self, escalated):
+        # Seconds before the first token
+        delay = random.gauss(self.first_token, self.first_token * self.jitter)
+        return max(0.0, delay + (self.escalation if escalated else 0.0)) / 1000
+
+    async def _serve(self, reader, writer):
+        self._clients[writer] = asyncio.current_task()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                method, target, _ = line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    raw = await reader.readline()
+                    if raw in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = raw.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length") or 0))
+                await self._respond(writer, method, headers, body)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._clients.pop(writer, None)
+            writer.close()
+
+    def _head(self, writer, status, request_headers, headers):
+        headers = {
+            **headers,
+            "access-control-allow-origin": request_headers.get("origin", "*"),
+            "access-control-allow-credentials": "true",
+        }
+        head = [f"HTTP/1.1 {status} {http.HTTPStatus(status).phrase}"]
+        head += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+
+    def _json(self, writer, status, request_headers, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self._head(writer, status, request_headers,
+                   {"content-type": "application/json", "content-length": str(len(data))})
+        writer.write(data)
+
+    async def _respond(self, writer, method, headers, body):
+        if method == "OPTIONS":
+            self._head(writer, 204, headers, {
+                "access-control-allow-methods": "POST, OPTIONS",
+                "access-control-allow-headers": headers.get("access-control-request-headers", "*"),
+                "access-control-max-age": "86400",
+                "content-length": "0",
+            })
+            return
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            request = None
+        if method != "POST" or not isinstance(request, dict):
+            self._json(writer, 400, headers, {"message": "Expected a JSON POST"})
+            return
+        action = request.get("action", "sendMessage")
+        self.requests[action] += 1
+        if action == "loadPreviousSession":
+            self._json(writer, 200, headers, {"data": []})
+            return
+        reply, escalated = answer(str(request.get("chatInput") or request.get("message") or ""))
+        words = reply.split(" ")
+        await asyncio.sleep(self._delay(escalated))
+        if "application/x-ndjson" not in headers.get("accept", ""):
+            await asyncio.sleep(len(words) / self.tokens_per_s)
+            self._json(writer, 200, headers, {"output": reply, "escalated": escalated})
+            return
+        self._head(writer, 200, headers, {"content-type": "application/x-ndjson",
+                                          "transfer-encoding": "chunked"})
+        metadata = {"nodeId": "harness-stand-in", "escalated": escalated}
+        lines = [{"type": "begin", "metadata": metadata}]
+        lines += [{"type": "item", "content": word if not index else " " + word, "metadata": metadata}
+                  for index, word in enumerate(words)]
+        lines += [{"type": "end", "metadata": metadata}]
+        for index, item in enumerate(lines):
+            if 1 < index < len(lines) - 1:
+                await asyncio.sleep(1 / self.tokens_per_s)
+            data = (json.dumps(item) + "\n").encode("utf-8")
+            writer.write(f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n")
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+
+
+# -------------------------------------------------------------------- report
+
+class ChatbotReport:
+    def __init__(self, mode, target, conversations, stand_in=None):
+        self.mode = mode
+        self.target = target
+        self.conversations = conversations
+        self.stand_in = stand_in
+        self.run = os.urandom(3).hex()
+        self.started = time.monotonic()
+        self.finished = None
+        self.completed = 0
+        self.latencies = defaultdict(list)  # metric -> [ms]
+        self.errors = Counter()
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    def add(self, metric, ms):
+        if ms is not None:
+            self.latencies[metric].append(ms)
+
+    def error(self, where, exc):
+        message = f"{type(exc).__name__}: {exc}".splitlines()[0]
+        self.errors[f"{where}: {message}"] += 1
+
+    def to_dict(self):
+        stand_in = None
+        if self.stand_in is not None:
+            stand_in = {"first_token_ms": self.stand_in.first_token, "jitter": self.stand_in.jitter,
+                        "tokens_per_s": self.stand_in.tokens_per_s,
+                        "escalation_ms": self.stand_in.escalation, "requests": dict(self.stand_in.requests)}
+        return {
+            "mode": self.mode,
+            "target": self.target,
+            "stand_in": stand_in,
+            "conversations": self.conversations,
+            "completed": self.completed,
+            "elapsed_s": round(self.elapsed, 3),
+            "metrics": {metric: stats.summarize(values) for metric, values in self.latencies.items()},
+            "errors": dict(self.errors.most_common(20)),
+        }
+
+    def format(self):
+        summary = self.to_dict()
+        lines = [f"{self.completed}/{self.conversations} chatbot conversations ({self.mode}) against "
+                 f"{self.target} in {summary['elapsed_s']:.1f}s"]
+        if summary["stand_in"]:
+            stand_in = summary["stand_in"]
+            lines.append(f"stand-in: first token {stand_in['first_token_ms']:g} ms "
+                         f"+/- {100 * stand_in['jitter']:g}%, {stand_in['tokens_per_s']:g} tokens/s, "
+                         f"escalation +{stand_in['escalation_ms']:g} ms")
+        lines += ["", stats.format_header("metric")]
+        lines += [stats.format_row(metric, row) for metric, row in summary["metrics"].items()]
+        if self.errors:
+            lines += ["", "Errors:"]
+            lines += [f"  {count:>5}  {message}" for message, count in self.errors.most_common(10)]
+        return "\n".join(lines)
+
+    def export(self, path=None):
+        path = path or config.OUTPUT_DIR / "chatbot" / f"chatbot-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        return path
+
+
+# ------------------------------------------------------------ protocol driver
+
+async def _exchange(pool, path, session_id, text, stream, report):
+    label = kind(text)
+    first = None
+    buffer = b""
+
+    def on_data(piece):
+        nonlocal first, buffer
+        if first is not None:
+            return
+        if not stream:
+            first = time.monotonic()
+            return
+        buffer += piece
+        *complete, buffer = buffer.split(b"\n")
+        for line in complete:
+            try:
+                item = json.loads(line)
+            except ValueError:
+                continue
+            if item.get("type") == "item" and item.get("content"):
+                first = time.monotonic()
+                return
+
+    started = time.monotonic()
+    response = await pool.request(
+        "POST", path, json_body={"action": "sendMessage", "sessionId": session_id, "chatInput": text},
+        headers={"Accept": "application/x-ndjson"} if stream else None, on_data=on_data,
+    )
+    if not response.ok:
+        raise HttpError(f"webhook returned {response.status}")
+    report.add(f"{label} first token", (first - started) * 1000 if first else None)
+    report.add(f"{label} full reply", (time.monotonic() - started) * 1000)
+
+
+async def _protocol_conversation(pool, path, number, script, think_time, stream, report):
+    session_id = f"harness-{report.run}-{number}"
+    try:
+        started = time.monotonic()
+        await pool.request("POST", path, json_body={"action": "loadPreviousSession", "sessionId": session_id})
+        report.add("load session", (time.monotonic() - started) * 1000)
+        for text in script:
+            await asyncio.sleep(random.uniform(*think_time))
+            await _exchange(pool, path, session_id, text, stream, report)
+    except (OSError, asyncio.TimeoutError, HttpError, ValueError) as exc:
+        report.error("webhook", exc)
+        return
+    report.completed += 1
+
+
+# -------------------------------------------------------------- widget driver
+
+PROBE_SCRIPT = """
+({ bot, quiet, urlPart }) => {
+  const start = document.querySelectorAll(bot).length;
+  const probe = window.__harnessChatbot = {};
+  let sent = null, first = null, last = null, text = '', responseEnd = null, timer = null;
+  const onKey = (e) => { if (e.key === 'Enter' && sent === null) sent = performance.now(); };
+  document.addEventListener('keydown', onKey, true);
+  const resources = new PerformanceObserver((list) => {
+    for (const entry of list.getEntries()) {
+      if (entry.name.includes(urlPart) && sent !== null && entry.startTime >= sent - 5) {
+        responseEnd = entry.responseEnd;
+      }
+    }
+  });
+  resources.observe({ type: 'resource' });
+  probe.done = new Promise((resolve) => {
+    const finish = () => {
+      observer.disconnect();
+      resources.disconnect();
+      document.removeEventListener('keydown', onKey, true);
+      resolve({ sent, first, last, responseEnd, text });
+    };
+    const observer = new MutationObserver(() => {
+      const replies = Array.from(document.querySelectorAll(bot)).slice(start);
+      const current = replies.map((reply) => reply.textContent.trim()).join('\\n');
+      if (!current || sent === null) return;
+      const now = performance.now();
+      if (first === null) first = now;
+      if (current !== text) { text = current; last = now; }
+      clearTimeout(timer);
+      timer = setTimeout(finish, quiet);
+    });
+    observer.observe(document.body, { childList: true, subtree: true, characterData: true });
+  });
+}
+"""
+
+
+async def _task_ms(session):
+    result = await session.send("Performance.getMetrics")
+    values = {metric["name"]: metric["value"] for metric in result["metrics"]}
+    return values.get("TaskDuration", 0.0) * 1000
+
+
+async def _forward(stand_in, route):
+    request = route.request
+    if request.method == "OPTIONS":
+        await route.fulfill(status=204, headers={
+            "access-control-allow-origin": request.headers.get("origin", "*"),
+            "access-control-allow-methods": "POST, OPTIONS",
+            "access-control-allow-headers": "*",
+        })
+        return
+    response = await route.fetch(url=f"http://127.0.0.1:{stand_in.port}{urlsplit(request.url).path}")
+    await route.fulfill(response=response)
+
+
+async def _widget_exchange(page, session, text, report):
+    label = kind(text)
+    await page.evaluate(PROBE_SCRIPT, {"bot": BOT_MESSAGE, "quiet": QUIET_MS, "urlPart": "/webhook/"})
+    before = await _task_ms(session)
+    field = page.locator(INPUT)
+    await field.fill(text)
+    await field.press("Enter")
+    timing = await asyncio.wait_for(page.evaluate("window.__harnessChatbot.done"),
+                                    WIDGET_TIMEOUT / 1000 + QUIET_MS / 1000)
+    report.add("main thread per reply", await _task_ms(session) - before)
+    sent = timing["sent"]
+    report.add(f"{label} first token", timing["first"] - sent)
+    report.add(f"{label} full reply", timing["last"] - sent)
+    if timing["responseEnd"] is not None:
+        report.add("webhook response", timing["responseEnd"] - sent)
+        report.add("render (response -> text)", max(0.0, timing["first"] - timing["responseEnd"]))
+
+
+async def _widget_conversation(pool, stand_in, number, script, delay, think_time, report):
+    await asyncio.sleep(delay)
+    api = pool.lease(f"chatbot-{number}")
+    try:
+        context = await api.browser.new_context()
+        context.set_default_timeout(WIDGET_TIMEOUT)
+        await context.route(WEBHOOK_PATTERN, lambda route: _forward(stand_in, route))
+        page = await context.new_page()
+        session = await context.new_cdp_session(page)
+        await session.send("Performance.enable")
+
+        started = time.monotonic()
+        await page.goto(config.BASE_URL, wait_until="domcontentloaded")
+        toggle = page.locator(TOGGLE)
+        await toggle.wait_for(state="visible")
+        report.add("widget mounted", (time.monotonic() - started) * 1000)
+
+        started = time.monotonic()
+        await toggle.click()
+        await page.locator(INPUT).wait_for(state="visible")
+        report.add("widget open", (time.monotonic() - started) * 1000)
+
+        for text in script:
+            await asyncio.sleep(random.uniform(*think_time))
+            await _widget_exchange(page, session, text, report)
+    except (async_api.Error, asyncio.TimeoutError) as exc:
+        report.error("widget", exc)
+        return
+    finally:
+        await api.release()
+    report.completed += 1
+
+
+# ---------------------------------------------------------------------- run
+
+def scripts(conversations, escalation_share):
+    """Conversation scripts, the first ``escalation_share`` of them escalating."""
+    escalating = round(conversations * escalation_share)
+    others = [name for name in CONVERSATIONS if name != "escalation"]
+    return [CONVERSATIONS["escalation"] if number < escalating else CONVERSATIONS[others[number % len(others)]]
+            for number in range(conversations)]
+
+
+async def run_chatbot(mode="widget", conversations=20, ramp_up=5.0, think_time=(1.0, 3.0),
+                      escalation_share=0.25, webhook=None, stream=False, first_token=800.0, jitter=0.25,
+                      tokens_per_s=30.0, escalation=1500.0, browsers=None):
+    """Run ``conversations`` concurrent chatbot conversations and time every reply."""
+    if mode not in MODES:
+        raise ValueError(f"Chatbot mode must be one of {', '.join(MODES)}")
+    if webhook and mode != "protocol":
+        raise ValueError("--webhook only applies to --mode protocol: the widget always uses the stand-in")
+    conversation_scripts = scripts(conversations, escalation_share)
+    delays = [ramp_up * number / conversations for number in range(conversations)]
+    stand_in = None if webhook else StandIn(first_token, jitter, tokens_per_s, escalation)
+    if stand_in is not None:
+        await stand_in.start()
+    try:
+        target = webhook or stand_in.url
+        report = ChatbotReport(mode, target if mode == "protocol" else f"{config.BASE_URL} -> {target}",
+                               conversations, stand_in)
+        if mode == "protocol":
+            parts = urlsplit(target)
+            async with ConnectionPool(f"{parts.scheme}://{parts.netloc}", size=conversations,
+                                      timeout=60.0) as http_pool:
+                report.started = time.monotonic()
+
+                async def converse(number, script, delay):
+                    await asyncio.sleep(delay)
+                    await _protocol_conversation(http_pool, parts.path, number, script, think_time, stream, report)
+
+                await asyncio.gather(*(converse(number, script, delay) for number, (script, delay)
+                                       in enumerate(zip(conversation_scripts, delays))))
+        else:
+            async with BrowserPool(size=browsers) as browser_pool:
+                report.started = time.monotonic()
+                await asyncio.gather(*(
+                    _widget_conversation(browser_pool, stand_in, number, script, delay, think_time, report)
+                    for number, (script, delay) in enumerate(zip(conversation_scripts, delays))
+                ))
+        report.finished = time.monotonic()
+    finally:
+        if stand_in is not None:
+            await stand_in.close()
+    return report
+
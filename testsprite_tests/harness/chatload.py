@@ -0,0 +1,485 @@
+"""Realtime chat fan-out benchmark over the path HalamanChat uses.
+
+TC018 sends one message from a buyer to a dealer. This opens ``pairs``
+buyer/dealer conversations through the Supabase calls of
+``services/chatService.ts`` and keeps them all talking at once, against
+the local stack by default (see :mod:`harness.stack`) or the project
+given with ``--url``:
+
+1. both roles sign in (``POST /auth/v1/token?grant_type=password``);
+2. the buyer opens a room per pair, each on its own listing, with the
+   insert ``createChatRoom`` makes (``POST /rest/v1/chat_rooms``);
+3. buyer and dealer each subscribe to the room as
+   ``subscribeRoomMessages`` does: a realtime channel ``room:<id>``
+   with a ``postgres_changes`` filter for INSERTs into ``chat_messages``
+   of that room. The local stack has no realtime server, so against it
+   each side polls the room's messages through PostgREST instead
+   (``--delivery poll``, the default for the local stack);
+4. every pair sends ``rate`` messages per second, alternating buyer and
+   dealer, with ``sendTextMessage``'s insert into ``chat_messages``.
+
+Sending is open loop: a slow insert does not delay the next message, so
+queueing in PostgREST, the ``chat_messages`` triggers or the realtime
+fan-out shows up as latency instead of lower load. Every message carries
+a marker with the run, pair, sender and sequence number, which the peer
+matches to give send-to-receive latency, dropped messages (accepted but
+never delivered before the drain period ends), duplicates and
+out-of-order deliveries. The rooms and messages of the run are deleted
+at the end.
+"""
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlencode, urlsplit
+
+from . import config, session, stack, stats, websocket
+from .httpclient import ConnectionPool, HttpError
+from .seed import CHAT_LINES
+
+ROLES = ("buyer", "seller")
+DELIVERIES = ("auto", "realtime", "poll")
+TABLES = ("chat_rooms", "chat_messages")
+
+# supabase-js sends a heartbeat this often; the server drops silent sockets
+HEARTBEAT_S = 25.0
+
+_MARKER = re.compile(r"#(?P<run>[0-9a-f]{6}):(?P<pair>\d+):(?P<sender>[bs])(?P<seq>\d+)$")
+
+_ERRORS = (OSError, asyncio.TimeoutError, HttpError, websocket.WebSocketError, ValueError)
+
+
+class SetupError(RuntimeError):
+    pass
+
+
+def _reason(exc):
+    return str(exc) or type(exc).__name__
+
+
+def realtime_url(base_url, anon_key):
+    """The realtime socket supabase-js opens for ``base_url``."""
+    parts = urlsplit(base_url)
+    scheme = "wss" if parts.scheme == "https" else "ws"
+    return f"{scheme}://{parts.netloc}/realtime/v1/websocket?" + urlencode({"apikey": anon_key, "vsn": "1.0.0"})
+
+
+class _Account:
+    def __init__(self, role, user_id, token):
+        self.role = role
+        self.user_id = user_id
+        self.token = token
+
+    @property
+    def headers(self):
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+class _Pair:
+    def __init__(self, number, car_id):
+        self.number = number
+        self.car_id = car_id
+        self.room = None
+        self.opened_at = None
+        self.sockets = {}
+        self.listeners = []
+
+
+class ChatLoadReport:
+    def __init__(self, base_url, delivery, pairs, rate):
+        self.base_url = base_url
+        self.delivery = delivery
+        self.pairs = pairs
+        self.rate = rate
+        self.run = os.urandom(3).hex()
+        self.connected = 0
+        self.rooms = {}  # pair -> room id
+        self.started = time.monotonic()
+        self.finished = None
+        self.latencies = defaultdict(list)  # operation -> [ms]
+        self.statuses = defaultdict(Counter)  # operation -> status -> count
+        self.errors = Counter()  # "operation: message" -> count
+        self.sent = {}  # (pair, sender, seq) -> monotonic send time
+        self.accepted = set()
+        self.delivered = Counter()  # (pair, sender, seq) -> deliveries to the peer
+        self.latest = {}  # (pair, sender) -> highest seq delivered so far
+        self.out_of_order = 0
+        self.misrouted = 0
+        self.closed_sockets = 0
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    def record(self, operation, started, status=None, error=None):
+        if error is not None:
+            self.errors[f"{operation}: {error}"] += 1
+            self.statuses[operation]["error"] += 1
+            return
+        self.latencies[operation].append((time.monotonic() - started) * 1000)
+        self.statuses[operation][str(status)] += 1
+
+    def received(self, listener_pair, listener_role, text):
+        match = _MARKER.search(text or "")
+        if match is None or match["run"] != self.run:
+            return  # history from earlier runs, or someone else's message
+        pair, sender, seq = int(match["pair"]), match["sender"], int(match["seq"])
+        if sender == listener_role[0]:
+            return  # the sender's own insert
+        if pair != listener_pair:
+            self.misrouted += 1  # every pair has a room of its own
+            return
+        key = (pair, sender, seq)
+        if key not in self.sent:
+            return
+        self.delivered[key] += 1
+        if self.delivered[key] == 1:
+            self.latencies["delivery"].append((time.monotonic() - self.sent[key]) * 1000)
+        if seq < self.latest.get((pair, sender), -1):
+            self.out_of_order += 1
+        self.latest[(pair, sender)] = max(seq, self.latest.get((pair, sender), -1))
+
+    def pending(self):
+        return sum(1 for key in self.accepted if not self.delivered[key])
+
+    def to_dict(self):
+        dropped = self.pending()
+        delivery = self.latencies["delivery"]
+        return {
+            "base_url": self.base_url,
+            "delivery_mode": self.delivery,
+            "run": self.run,
+            "pairs": self.pairs,
+            "pairs_connected": self.connected,
+            "rate_per_pair": self.rate,
+            "elapsed_s": round(self.elapsed, 3),
+            "messages": {
+                "sent": len(self.sent),
+                "accepted": len(self.accepted),
+                "delivered": sum(1 for count in self.delivered.values() if count),
+                "dropped": dropped,
+                "drop_rate": dropped / len(self.accepted) if self.accepted else 0.0,
+                "duplicates": sum(count - 1 for count in self.delivered.values() if count > 1),
+                "out_of_order": self.out_of_order,
+                "misrouted": self.misrouted,
+            },
+            "sockets_closed_early": self.closed_sockets,
+            "throughput_mps": len(delivery) / self.elapsed if self.elapsed else 0.0,
+            "operations": {
+                operation: {**stats.summarize(self.latencies[operation]), "statuses": dict(counts)}
+                for operation, counts in sorted(self.statuses.items())
+            },
+            "delivery": stats.summarize(delivery),
+            "histogram": dict(stats.histogram(delivery)),
+            "errors": dict(self.errors.most_common(20)),
+        }
+
+    def format(self):
+        summary = self.to_dict()
+        messages = summary["messages"]
+        lines = [
+            f"{self.connected}/{self.pairs} chat pairs on {self.base_url} ({self.delivery} delivery) "
+            f"at {self.rate:g} msg/s per pair for {summary['elapsed_s']:.1f}s",
+            f"messages: {messages['sent']} sent, {messages['accepted']} accepted, "
+            f"{messages['delivered']} delivered ({summary['throughput_mps']:.1f}/s)",
+            f"dropped {messages['dropped']} ({100 * messages['drop_rate']:.2f}%), "
+            f"duplicates {messages['duplicates']}, out of order {messages['out_of_order']}, "
+            f"misrouted {messages['misrouted']}, sockets closed early {self.closed_sockets}",
+            "",
+            stats.format_header("operation"),
+            stats.format_row("delivery (insert -> peer)", summary["delivery"]),
+        ]
+        for operation, row in summary["operations"].items():
+            codes = ", ".join(f"{code}x{count}" for code, count in sorted(row["statuses"].items()))
+            lines.append(f"{stats.format_row(operation, row)}  [{codes}]")
+        chart = stats.format_histogram(list(summary["histogram"].items()))
+        if chart:
+            lines += ["", "Delivery latency histogram:", chart]
+        if self.errors:
+            lines += ["", "Errors:"]
+            lines += [f"  {count:>5}  {message}" for message, count in self.errors.most_common(10)]
+        return "\n".join(lines)
+
+    def export(self, path=None):
+        path = path or config.OUTPUT_DIR / "chat-load" / f"chat-load-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        return path
+
+
+# --------------------------------------------------------------------- setup
+
+async def _sign_in(pool, role):
+    email, password = session.credentials(role)
+    response = await pool.request("POST", "/auth/v1/token?grant_type=password",
+                                  json_body={"email": email, "password": password})
+    if response.status != 200:
+        raise SetupError(f"POST /auth/v1/token returned {response.status} for {email}")
+    data = response.json()
+    return _Account(role, data["user"]["id"], data["access_token"])
+
+
+async def _car_ids(pool, account, wanted):
+    """Up to ``wanted`` listing ids, so each room is about its own car."""
+    response = await pool.request("GET", "/rest/v1/cars", params={
+        "select": "id", "status": "eq.available", "limit": wanted,
+    }, headers=account.headers)
+    if response.status != 200:
+        return []
+    return [row["id"] for row in response.json() if row.get("id") is not None]
+
+
+async def _subscribe(url, pair, account, timeout=10.0):
+    """Join ``room:<id>`` as ``subscribeRoomMessages`` does (Phoenix protocol v1)."""
+    socket = await websocket.connect(url, timeout=timeout)
+    topic = f"realtime:room:{pair.room}"
+    await socket.send(json.dumps({
+        "topic": topic,
+        "event": "phx_join",
+        "ref": "1",
+        "join_ref": "1",
+        "payload": {
+            "config": {
+                "broadcast": {"ack": False, "self": False},
+                "presence": {"key": ""},
+                "postgres_changes": [{"event": "INSERT", "schema": "public", "table": "chat_messages",
+                                      "filter": f"room_id=eq.{pair.room}"}],
+                "private": False,
+            },
+            "access_token": account.token,
+        },
+    }))
+    try:
+        while True:
+            reply = json.loads(await asyncio.wait_for(socket.recv(), timeout))
+            if reply.get("topic") == topic and reply.get("event") == "phx_reply" and reply.get("ref") == "1":
+                break
+    except BaseException:
+        await socket.close()
+        raise
+    if reply["payload"].get("status") != "ok":
+        await socket.close()
+        raise websocket.WebSocketError(f"join refused: {reply['payload'].get('response')}")
+    return socket
+
+
+async def _open(pool, url, pair, accounts, delivery, report):
+    buyer, seller = accounts["buyer"], accounts["seller"]
+    started = time.monotonic()
+    try:
+        response = await pool.request("POST", "/rest/v1/chat_rooms", json_body=[{
+            "user1_id": buyer.user_id,
+            "user2_id": seller.user_id,
+            "car_id": pair.car_id,
+            "room_type": "user_to_user",
+            "status": "active",
+        }], headers={**buyer.headers, "Prefer": "return=representation"})
+    except _ERRORS as exc:
+        report.record("create room", started, error=_reason(exc))
+        return False
+    report.record("create room", started, status=response.status)
+    if response.status != 201:
+        return False
+    row = response.json()[0]
+    pair.room = report.rooms[pair.number] = row["id"]
+    pair.opened_at = row.get("created_at")
+    if delivery == "poll":
+        return True
+
+    for role, account in accounts.items():
+        started = time.monotonic()
+        try:
+            pair.sockets[role] = await _subscribe(url, pair, account)
+        except _ERRORS as exc:
+            report.record("subscribe", started, error=_reason(exc))
+            return False
+        report.record("subscribe", started, status="ok")
+    return True
+
+
+async def _clean_up(pool, account, rooms, report, chunk=50):
+    """Delete the run's messages, then its rooms."""
+    rooms = list(rooms)
+    for table, column in (("chat_messages", "room_id"), ("chat_rooms", "id")):
+        for start in range(0, len(rooms), chunk):
+            ids = ",".join(rooms[start:start + chunk])
+            try:
+                response = await pool.request("DELETE", f"/rest/v1/{table}",
+                                              params={column: f"in.({ids})"}, headers=account.headers)
+            except _ERRORS as exc:
+                report.errors[f"clean up {table}: {_reason(exc)}"] += 1
+                continue
+            if not response.ok:
+                report.errors[f"clean up {table}: DELETE returned {response.status}"] += 1
+
+
+# ------------------------------------------------------------------- traffic
+
+async def _heartbeat(socket):
+    for ref in itertools.count(2):
+        await asyncio.sleep(HEARTBEAT_S)
+        await socket.send(json.dumps({"topic": "phoenix", "event": "heartbeat", "payload": {}, "ref": str(ref)}))
+
+
+async def _listen_realtime(pair, role, report, stopping):
+    socket = pair.sockets[role]
+    heartbeat = asyncio.ensure_future(_heartbeat(socket))
+    try:
+        while True:
+            try:
+                raw = await socket.recv()
+            except websocket.ConnectionClosed as exc:
+                if not stopping.is_set():
+                    report.closed_sockets += 1
+                    report.errors[f"socket: {_reason(exc)}"] += 1
+                return
+            try:
+                message = json.loads(raw)
+            except (TypeError, ValueError):
+                continue
+            payload = message.get("payload") or {}
+            if message.get("event") == "postgres_changes":
+                record = (payload.get("data") or {}).get("record") or {}
+                report.received(pair.number, role, record.get("message_text"))
+            elif message.get("event") == "system" and payload.get("status") == "error":
+                report.errors[f"realtime: {payload.get('message')}"] += 1
+    finally:
+        heartbeat.cancel()
+
+
+async def _listen_poll(pool, pair, account, interval, report, stopping):
+    """Read the room's new messages every ``interval`` seconds (no realtime)."""
+    seen = set()
+    since = pair.opened_at
+    while not stopping.is_set():
+        params = {"select": "id,message_text,created_at", "room_id": f"eq.{pair.room}",
+                  "order": "created_at.asc"}
+        if since:
+            params["created_at"] = f"gte.{since}"
+        started = time.monotonic()
+        try:
+            response = await pool.request("GET", "/rest/v1/chat_messages", params=params, headers=account.headers)
+            rows = response.json() if response.ok else []
+        except _ERRORS as exc:
+            report.record("poll", started, error=_reason(exc))
+        else:
+            report.record("poll", started, status=response.status)
+            for row in rows:
+                if row["id"] in seen:
+                    continue
+                seen.add(row["id"])
+                since = row.get("created_at") or since
+                report.received(pair.number, account.role, row.get("message_text"))
+        await asyncio.sleep(interval)
+
+
+async def _send(pool, pair, account, peer, seq, report):
+    key = (pair.number, account.role[0], seq)
+    # Buyer asks, dealer answers, as TC018 and the seeded Chats rows do
+    question, answer = CHAT_LINES[(seq // 2) % len(CHAT_LINES)]
+    text = f"{question if account.role == 'buyer' else answer} #{report.run}:{pair.number}:{key[1]}{seq}"
+    started = report.sent[key] = time.monotonic()
+    try:
+        response = await pool.request("POST", "/rest/v1/chat_messages", json_body=[{
+            "room_id": pair.room,
+            "sender_id": account.user_id,
+            "receiver_id": peer.user_id,
+            "message_text": text,
+            "message_type": "text",
+            "chat_type": "user",
+        }], headers={**account.headers, "Prefer": "return=representation"})
+    except _ERRORS as exc:
+        report.record("send", started, error=_reason(exc))
+        return
+    report.record("send", started, status=response.status)
+    if response.status == 201:
+        report.accepted.add(key)
+
+
+async def _converse(pool, pair, accounts, rate, deadline, report, tasks):
+    # Random phase so the pairs do not send in lockstep
+    await asyncio.sleep(random.random() / rate)
+    seq = 0
+    next_at = time.monotonic()
+    while next_at < deadline:
+        sender, receiver = ROLES if seq % 2 == 0 else ROLES[::-1]
+        tasks.add(asyncio.ensure_future(_send(pool, pair, accounts[sender], accounts[receiver], seq, report)))
+        seq += 1
+        next_at += 1 / rate
+        await asyncio.sleep(max(0.0, next_at - time.monotonic()))
+
+
+async def run_chat_load(base_url=None, pairs=100, rate=0.5, duration=60.0, drain=5.0, delivery="auto",
+                        poll_interval=1.0, connections=100, connect_concurrency=50, progress=None):
+    """Open ``pairs`` buyer/dealer rooms and exchange ``rate`` messages/s in each for ``duration`` seconds."""
+    base_url = (base_url or config.SUPABASE_URL).rstrip("/")
+    if pairs < 1 or rate <= 0 or poll_interval <= 0:
+        raise ValueError("--pairs must be at least 1, --rate and --poll-interval positive")
+    if delivery not in DELIVERIES:
+        raise ValueError(f"Delivery must be one of {', '.join(DELIVERIES)}")
+    if delivery == "auto":
+        delivery = "poll" if stack.is_local(base_url) else "realtime"
+    anon_key = config.SUPABASE_ANON_KEY or stack.api_key("anon")
+    url = realtime_url(base_url, anon_key)
+    report = ChatLoadReport(base_url, delivery, pairs, rate)
+    stopping = asyncio.Event()
+    async with ConnectionPool(base_url, size=connections, headers={"apikey": anon_key}) as pool:
+        try:
+            accounts = {role: await _sign_in(pool, role) for role in ROLES}
+            missing = await stack.missing_tables(pool, TABLES, headers=accounts["buyer"].headers)
+        except OSError as exc:
+            raise SetupError(f"Cannot reach {base_url}: {exc}") from exc
+        if accounts["buyer"].user_id == accounts["seller"].user_id:
+            raise SetupError("Buyer and seller log in as the same user; set TESTSPRITE_SELLER_EMAIL")
+        if missing:
+            raise SetupError(f"{base_url} does not expose {', '.join(missing)}: the local stack needs "
+                             "`stack up --schema <dump>` with the hosted project's schema")
+        car_ids = await _car_ids(pool, accounts["buyer"], pairs)
+        chats = [_Pair(number, car_ids[number] if number < len(car_ids) else None) for number in range(pairs)]
+
+        slots = asyncio.Semaphore(connect_concurrency)
+
+        async def open_pair(pair):
+            async with slots:
+                return await _open(pool, url, pair, accounts, delivery, report)
+
+        try:
+            opened = await asyncio.gather(*(open_pair(pair) for pair in chats))
+            live = [pair for pair, ok in zip(chats, opened) if ok]
+            report.connected = len(live)
+            if progress:
+                progress(f"{len(live)}/{pairs} rooms open ({delivery} delivery); "
+                         f"exchanging messages for {duration:g}s")
+            for pair in live:
+                if delivery == "poll":
+                    pair.listeners = [asyncio.ensure_future(
+                        _listen_poll(pool, pair, accounts[role], poll_interval, report, stopping)) for role in ROLES]
+                else:
+                    pair.listeners = [asyncio.ensure_future(
+                        _listen_realtime(pair, role, report, stopping)) for role in ROLES]
+            sends = set()
+            report.started = time.monotonic()
+            deadline = report.started + duration
+            await asyncio.gather(*(_converse(pool, pair, accounts, rate, deadline, report, sends) for pair in live))
+            await asyncio.gather(*sends)
+            report.finished = time.monotonic()
+            # Give deliveries still in flight a chance before counting them dropped
+            drain_until = time.monotonic() + drain
+            while report.pending() and time.monotonic() < drain_until:
+                await asyncio.sleep(0.05)
+        finally:
+            stopping.set()
+            for pair in chats:
+                for socket in pair.sockets.values():
+                    await socket.close()
+                for listener in pair.listeners:
+                    listener.cancel()
+            await asyncio.gather(*(listener for pair in chats for listener in pair.listeners),
+                                 return_exceptions=True)
+            if report.rooms:
+                await _clean_up(pool, accounts["buyer"], report.rooms.values(), report)
+    return report
@@ -0,0 +1,201 @@
+"""Viewport matrix: key pages on mobile, tablet and desktop profiles.
+
+Every (profile, page) pair is rendered concurrently in its own browser
+context with the profile's viewport, touch/mobile flags and user agent.
+CPU and network throttling are applied through CDP
+(``Emulation.setCPUThrottlingRate`` and
+``Network.emulateNetworkConditions``), so the mobile numbers reflect a
+mid-range phone on a 4G connection rather than the CI host.
+
+Per row the matrix records navigation timings (TTFB, DOMContentLoaded,
+load), the Web Vitals from :mod:`harness.vitals` (FCP, LCP, CLS, long
+tasks), transferred kilobytes and whether the page scrolls horizontally.
+Slow numbers are reported, not failed on: only broken layouts
+(horizontal overflow) and pages that fail to load count as problems.
+"""
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+
+from playwright import async_api
+
+from . import config, timing, vitals, waits
+
+_CHROME_VERSION = "124.0.0.0"
+
+
+@dataclass
+class Profile:
+    name: str
+    viewport: dict
+    device_scale_factor: float = 1
+    is_mobile: bool = False
+    has_touch: bool = False
+    user_agent: str = None
+    cpu_slowdown: float = 1
+    # Network conditions as DevTools defines them: ms and bytes per second
+    network: dict = field(default_factory=dict)
+
+    def context_options(self):
+        options = {
+            "viewport": self.viewport,
+            "device_scale_factor": self.device_scale_factor,
+            "is_mobile": self.is_mobile,
+            "has_touch": self.has_touch,
+        }
+        if self.user_agent:
+            options["user_agent"] = self.user_agent
+        return options
+
+
+PROFILES = {
+    "mobile": Profile(
+        "mobile",
+        viewport={"width": 393, "height": 851},
+        device_scale_factor=2.75,
+        is_mobile=True,
+        has_touch=True,
+        user_agent=(f"Mozilla/5.0 (Linux; Android 13; Pixel 7) AppleWebKit/537.36 "
+                    f"(KHTML, like Gecko) Chrome/{_CHROME_VERSION} Mobile Safari/537.36"),
+        cpu_slowdown=4,
+        network={"latency": 150, "downloadThroughput": 1_600_000 / 8, "uploadThroughput": 750_000 / 8},
+    ),
+    "tablet": Profile(
+        "tablet",
+        viewport={"width": 800, "height": 1280},
+        device_scale_factor=2,
+        is_mobile=True,
+        has_touch=True,
+        user_agent=(f"Mozilla/5.0 (Linux; Android 13; SM-X200) AppleWebKit/537.36 "
+                    f"(KHTML, like Gecko) Chrome/{_CHROME_VERSION} Safari/537.36"),
+        cpu_slowdown=2,
+        network={"latency": 60, "downloadThroughput": 9_000_000 / 8, "uploadThroughput": 3_000_000 / 8},
+    ),
+    "desktop": Profile("desktop", viewport={"width": 1280, "height": 720}),
+}
+
+# Public pages every visitor reaches (see the routes in frontend/src/App.tsx)
+PAGES = ("/", "/katalog", "/simulasi", "/login")
+
+# Throttled mobile loads are slow by design; don't reuse the 5s action timeout
+NAVIGATION_TIMEOUT = 60_000
+
+_PAGE_METRICS = """
+() => {
+  const nav = performance.getEntriesByType('navigation')[0];
+  const resources = performance.getEntriesByType('resource');
+  const vitals = window.__harnessVitals ? window.__harnessVitals() : {};
+  return {
+    ttfb: nav ? nav.responseStart : null,
+    dom_content_loaded: nav ? nav.domContentLoadedEventEnd : null,
+    load: nav ? nav.loadEventEnd : null,
+    fcp: vitals.fcp ?? null,
+    lcp: vitals.lcp ?? null,
+    cls: vitals.cls ?? 0,
+    long_task_ms: vitals.long_task_ms ?? 0,
+    transfer_kb: ((nav ? nav.transferSize : 0)
+                  + resources.reduce((sum, entry) => sum + (entry.transferSize || 0), 0)) / 1024,
+    overflow_px: Math.max(0, document.documentElement.scrollWidth - window.innerWidth),
+  };
+}
+"""
+
+COLUMNS = (
+    ("ttfb", "TTFB", "{:.0f}"),
+    ("fcp", "FCP", "{:.0f}"),
+    ("lcp", "LCP", "{:.0f}"),
+    ("load", "load", "{:.0f}"),
+    ("cls", "CLS", "{:.3f}"),
+    ("long_task_ms", "long", "{:.0f}"),
+    ("transfer_kb", "KB", "{:.0f}"),
+)
+
+
+async def _throttle(context, page, profile):
+    if profile.cpu_slowdown == 1 and not profile.network:
+        return
+    session = await context.new_cdp_session(page)
+    if profile.cpu_slowdown != 1:
+        await session.send("Emulation.setCPUThrottlingRate", {"rate": profile.cpu_slowdown})
+    if profile.network:
+        await session.send("Network.enable")
+        await session.send("Network.emulateNetworkConditions", {"offline": False, **profile.network})
+
+
+async def measure(browser, profile, path, base_url=None):
+    """Load ``path`` under ``profile`` in a fresh context; return one matrix row."""
+    row = {"profile": profile.name, "path": path, "error": None}
+    context = await browser.new_context(**profile.context_options())
+    context.set_default_timeout(config.DEFAULT_TIMEOUT)
+    try:
+        await context.add_init_script(vitals.INIT_SCRIPT)
+        page = await context.new_page()
+        await _throttle(context, page, profile)
+        with timing.span("navigation", f"{profile.name} {path}"):
+            await page.goto((base_url or config.BASE_URL).rstrip("/") + path,
+                            wait_until="load", timeout=NAVIGATION_TIMEOUT)
+            await waits.settle(page)
+        row.update(await page.evaluate(_PAGE_METRICS))
+    except async_api.Error as exc:
+        row["error"] = str(exc).splitlines()[0]
+    finally:
+        await context.close()
+    return row
+
+
+async def run_matrix(browser, profiles=None, pages=PAGES, base_url=None, concurrency=6):
+    """Measure every (profile, page) pair concurrently on ``browser``."""
+    profiles = [PROFILES[name] for name in (profiles or PROFILES)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(profile, path):
+        async with semaphore:
+            return await measure(browser, profile, path, base_url)
+
+    return list(await asyncio.gather(*(
+        bounded(profile, path) for profile in profiles for path in pages
+    )))
+
+
+def problems(rows):
+    """Rows whose page did not load or does not fit its viewport."""
+    found = []
+    for row in rows:
+        if row["error"]:
+            found.append(f"{row['profile']} {row['path']}: {row['error']}")
+        elif row.get("overflow_px", 0) > 1:
+            found.append(f"{row['profile']} {row['path']}: scrolls horizontally by {row['overflow_px']}px")
+    return found
+
+
+def format_matrix(rows):
+    header = f"  {'profile':<8} {'page':<12}" + "".join(f" {title:>7}" for _, title, _ in COLUMNS)
+    lines = ["Device matrix (ms unless noted):", header]
+    for row in rows:
+        if row["error"]:
+            lines.append(f"  {row['profile']:<8} {row['path']:<12} error: {row['error']}")
+            continue
+        cells = "".join(
+            f" {fmt.format(row[key]) if row.get(key) is not None else '-':>7}"
+            for key, _, fmt in COLUMNS
+        )
+        overflow = f"  overflow {row['overflow_px']}px" if row.get("overflow_px", 0) > 1 else ""
+        lines.append(f"  {row['profile']:<8} {row['path']:<12}{cells}{overflow}")
+    return "\n".join(lines)
+
+
+def format_results(results):
+    """The matrices cases attached to their results, for the run summary."""
+    return "\n\n".join(f"{result.id} {format_matrix(result.details['devices'])}"
+                       for result in results if "devices" in result.details)
+
+
+def export(rows, path=None):
+    directory = config.OUTPUT_DIR / "devices"
+    path = path or directory / f"matrix-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = json.dumps(rows, indent=2)
+    path.write_text(payload, encoding="utf-8")
+    (path.parent / "latest.json").write_text(payload, encoding="utf-8")
+    return path
@@ -0,0 +1,207 @@
+"""Vectorized reference oracle for the credit-simulation calculator.
+
+:func:`oracle` is a NumPy port of ``KontrollerSimulasi.hitungSimulasiLokal``
+(the annuity fallback ``hitungSimulasiKredit`` returns when
+``/api/simulasi/hitung`` is not available). It computes thousands of
+price / down payment / rate / tenor combinations in one batch, including
+the month-by-month amortization schedule.
+
+:func:`check` runs the same batch *inside the app's page*. The controller
+is taken from the webpack module registry when the bundle contains it.
+Otherwise ``frontend/src/controllers/KontrollerSimulasi.ts`` is
+transpiled in the page with the frontend's own TypeScript compiler. Each
+simulation is reduced to a row of summary numbers and schedule checksums
+and compared with the oracle. JS ``Math.round`` (half up) is reproduced
+exactly, so any rounding drift in the calculator shows up as a mismatch.
+The in-page batch is timed, so a slower calculator shows up as a timeline
+span in the run history.
+"""
+import time
+
+import numpy as np
+
+from . import config, timing
+
+CONTROLLER_PATH = config.TESTS_DIR.parent / "frontend" / "src" / "controllers" / "KontrollerSimulasi.ts"
+TYPESCRIPT_JS = config.TESTS_DIR.parent / "frontend" / "node_modules" / "typescript" / "lib" / "typescript.js"
+
+# Flat insurance fee added by the controller when ``asuransi`` is set
+INSURANCE_FEE = 2_000_000
+
+# Columns of an input row and of a result row
+INPUTS = ("hargaMobil", "uangMuka", "tenorKredit", "sukuBunga", "asuransi", "biayaAdmin", "biayaProvisi")
+OUTPUTS = ("cicilanPerBulan", "totalBayar", "totalBunga", "biayaTambahan",
+           "bulan", "totalPokok", "totalBungaJadwal", "sisaAkhir")
+
+# The case TC009 checks through the form: Rp 5.024.627 per month
+TC009_CASE = (235_000_000, 35_000_000, 48, 9.5, 0, 0, 0)
+TC009_INSTALLMENT = 5_024_627
+
+
+def js_round(values):
+    """``Math.round``: halves round up, unlike NumPy's round-half-even."""
+    return np.floor(values + 0.5)
+
+
+def generate(count, seed=0):
+    """``count`` valid inputs (see ``validasiDataSimulasi``) plus the TC009 case."""
+    rng = np.random.default_rng(seed)
+    price = rng.integers(50, 2_000, count) * 1_000_000.0
+    down_payment = np.round(price * rng.uniform(0.2, 0.9, count), -5)
+    tenor = rng.integers(12, 85, count).astype(float)
+    rate = np.round(rng.uniform(5, 20, count), 2)
+    insurance = rng.integers(0, 2, count).astype(float)
+    admin = rng.integers(0, 11, count) * 100_000.0
+    provision = np.round(rng.uniform(0, 3, count), 1)
+    batch = np.column_stack([price, down_payment, tenor, rate, insurance, admin, provision])
+    return np.vstack([np.array(TC009_CASE, dtype=float), batch])
+
+
+def oracle(inputs):
+    """Expected result rows (see ``OUTPUTS``) for an ``(n, 7)`` input array."""
+    price, down_payment, tenor, rate, insurance, admin, provision = inputs.T
+    principal = price - down_payment
+    monthly_rate = rate / 100 / 12
+    growth = np.power(1 + monthly_rate, tenor)
+    installment = principal * (monthly_rate * growth) / (growth - 1)
+    total = installment * tenor
+    fees = admin + (provision / 100) * price + np.where(insurance > 0, INSURANCE_FEE, 0)
+
+    # Amortization schedule, one month at a time across the whole batch,
+    # with the same operation order as the controller's loop
+    remaining = principal.copy()
+    principal_paid = np.zeros_like(principal)
+    interest_paid = np.zeros_like(principal)
+    last_remaining = np.zeros_like(principal)
+    for month in range(1, int(tenor.max()) + 1):
+        active = month <= tenor
+        interest = remaining * monthly_rate
+        repaid = installment - interest
+        remaining = np.where(active, remaining - repaid, remaining)
+        principal_paid += np.where(active, js_round(repaid), 0)
+        interest_paid += np.where(active, js_round(interest), 0)
+        last_remaining = np.where(month == tenor, js_round(np.maximum(0, remaining)), last_remaining)
+
+    return np.column_stack([
+        js_round(installment), js_round(total), js_round(total - principal), js_round(fees),
+        tenor, principal_paid, interest_paid, last_remaining,
+    ])
+
+
+_RESOLVE_FROM_BUNDLE = """
+() => {
+  let require;
+  for (const key of Object.keys(window).filter((name) => name.startsWith('webpackChunk'))) {
+    window[key].push([[Symbol('harness')], {}, (runtime) => { require = runtime; }]);
+  }
+  if (!require) return false;
+  for (const id of Object.keys(require.m)) {
+    if (!String(require.m[id]).includes('hitungSimulasiLokal')) continue;
+    const exported = require(id);
+    if (exported && exported.KontrollerSimulasi) {
+      window.__harnessKontrollerSimulasi = exported.KontrollerSimulasi;
+      return true;
+    }
+  }
+  return false;
+}
+"""
+
+_RESOLVE_FROM_SOURCE = """
+(source) => {
+  const { outputText } = window.ts.transpileModule(source, {
+    compilerOptions: { module: window.ts.ModuleKind.CommonJS, target: window.ts.ScriptTarget.ES2019 },
+  });
+  const exported = {};
+  new Function('exports', 'process', outputText)(exported, { env: {} });
+  window.__harnessKontrollerSimulasi = exported.KontrollerSimulasi;
+  return true;
+}
+"""
+
+_RUN_BATCH = """
+(rows) => {
+  const controller = new window.__harnessKontrollerSimulasi();
+  const started = performance.now();
+  const results = rows.map(([hargaMobil, uangMuka, tenorKredit, sukuBunga, asuransi, biayaAdmin, biayaProvisi]) => {
+    const hasil = controller.hitungSimulasiLokal({
+      hargaMobil, uangMuka, tenorKredit, sukuBunga, asuransi: asuransi > 0, biayaAdmin, biayaProvisi,
+    });
+    let pokok = 0;
+    let bunga = 0;
+    for (const row of hasil.detailCicilan) {
+      pokok += row.cicilanPokok;
+      bunga += row.cicilanBunga;
+    }
+    const last = hasil.detailCicilan[hasil.detailCicilan.length - 1];
+    return [hasil.cicilanPerBulan, hasil.totalBayar, hasil.totalBunga, hasil.biayaTambahan,
+            hasil.detailCicilan.length, pokok, bunga, last ? last.sisaHutang : 0];
+  });
+  return { results, elapsed: performance.now() - started };
+}
+"""
+
+
+async def load_controller(page):
+    """Make ``KontrollerSimulasi`` available in ``page``; returns where it came from."""
+    if await page.evaluate(_RESOLVE_FROM_BUNDLE):
+        return "bundle"
+    if not TYPESCRIPT_JS.exists():
+        raise RuntimeError(
+            "KontrollerSimulasi is not part of the bundle and frontend/node_modules/typescript "
+            "is missing: run npm install in frontend/"
+        )
+    await page.add_script_tag(path=str(TYPESCRIPT_JS))
+    await page.evaluate(_RESOLVE_FROM_SOURCE, CONTROLLER_PATH.read_text(encoding="utf-8"))
+    return "source"
+
+
+def compare(inputs, actual, expected, tolerance=0.5):
+    """Rows where any output differs by more than ``tolerance`` rupiah."""
+    wrong = np.flatnonzero((np.abs(actual - expected) > tolerance).any(axis=1))
+    return [
+        {
+            "inputs": dict(zip(INPUTS, inputs[index].tolist())),
+            "app": dict(zip(OUTPUTS, actual[index].tolist())),
+            "oracle": dict(zip(OUTPUTS, expected[index].tolist())),
+        }
+        for index in wrong
+    ]
+
+
+async def check(page, count=5000, seed=0, tolerance=0.5):
+    """Run ``count`` simulations in ``page`` and compare them with :func:`oracle`."""
+    inputs = generate(count, seed)
+    source = await load_controller(page)
+
+    started = time.perf_counter()
+    expected = oracle(inputs)
+    oracle_ms = (time.perf_counter() - started) * 1000
+
+    with timing.span("action", f"KontrollerSimulasi x{len(inputs)}", source=source):
+        batch = await page.evaluate(_RUN_BATCH, inputs.tolist())
+    actual = np.array(batch["results"], dtype=float)
+    mismatches = compare(inputs, actual, expected, tolerance)
+    return {
+        "source": source,
+        "simulations": len(inputs),
+        "app_ms": batch["elapsed"],
+        "oracle_ms": oracle_ms,
+        "tc009_installment": actual[0][0],
+        "mismatches": len(mismatches),
+        "examples": mismatches[:10],
+    }
+
+
+def format_check(report):
+    lines = [
+        f"{report['simulations']} simulations ({report['source']} controller): "
+        f"app {report['app_ms']:.1f} ms, oracle {report['oracle_ms']:.1f} ms, "
+        f"{report['mismatches']} mismatch(es)",
+        f"TC009 case: Rp {report['tc009_installment']:,.0f} per month".replace(",", "."),
+    ]
+    for example in report["examples"]:
+        diff = {key: example["app"][key] - example["oracle"][key]
+                for key in OUTPUTS if example["app"][key] != example["oracle"][key]}
+        lines.append(f"  {example['inputs']} -> {diff}")
+    return "\n".join(lines)
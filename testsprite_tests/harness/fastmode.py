@@ -0,0 +1,215 @@
+"""Resource-blocking fast mode for functional runs.
+
+Functional cases do not need car photos from Supabase storage or Google
+Drive, web fonts or the n8n chat widget's webhook. :class:`BlockPlugin`
+routes the URLs matched by ``block_rules.json`` and either aborts them
+(``block``) or answers them locally (``stub``: a 1x1 GIF for images, an
+empty stylesheet or script, ``{}`` for API calls) so layouts and
+``onload`` handlers behave. A rule may be limited to resource ``types``
+and disabled for the cases in ``keep_for`` (TC014 needs the real chat).
+
+Bytes saved cannot be read from requests that never happen, so
+``measure`` mode lets everything through and records the transfer size
+of each request a rule *would* have caught; the runner merges the sizes of
+all cases (and shards) into ``.harness/blocked_sizes.json`` once the run
+is over (:func:`write_sizes`). ``block`` mode reports savings from those
+sizes, estimating unseen URLs from the average of their rule.
+"""
+import base64
+import json
+import re
+from collections import defaultdict
+
+from playwright import async_api
+
+from . import config
+
+MODES = ("block", "measure")
+
+PIXEL_GIF = base64.b64decode("R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7")
+
+_STUBS = {
+    "image": ("image/gif", PIXEL_GIF),
+    "stylesheet": ("text/css", b""),
+    "script": ("application/javascript", b""),
+    "xhr": ("application/json", b"{}"),
+    "fetch": ("application/json", b"{}"),
+}
+
+
+def _glob_regex(glob):
+    # Plain anchored regex: the route pattern is evaluated by the JS driver,
+    # which does not understand fnmatch.translate()'s inline flags
+    return "^" + ".*".join(re.escape(part) for part in glob.split("*")) + "$"
+
+
+class Rule:
+    def __init__(self, name, url, types=(), action="block", keep_for=()):
+        if action not in ("block", "stub"):
+            raise ValueError(f"Rule {name!r}: action must be 'block' or 'stub'")
+        self.name = name
+        self.url = url
+        self.pattern = re.compile(_glob_regex(url))
+        self.types = set(types)
+        self.action = action
+        self.keep_for = set(keep_for)
+
+    def applies(self, case_id):
+        return case_id not in self.keep_for
+
+    def matches(self, url, resource_type):
+        return (not self.types or resource_type in self.types) and bool(self.pattern.match(url))
+
+
+def load_rules(path=None):
+    path = path or config.BLOCK_RULES_PATH
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return [Rule(**rule) for rule in data["rules"]]
+
+
+def sizes_path():
+    return config.OUTPUT_DIR / "blocked_sizes.json"
+
+
+def load_sizes(path=None):
+    path = path or sizes_path()
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def write_sizes(results, path=None):
+    """Merge the sizes measured by ``results`` into the sizes file."""
+    path = path or sizes_path()
+    merged = load_sizes(path)
+    for result in results:
+        for rule, urls in result.details.get("fast", {}).get("sizes", {}).items():
+            merged.setdefault(rule, {}).update(urls)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(merged, indent=2, sort_keys=True), encoding="utf-8")
+    return path
+
+
+class _Savings:
+    def __init__(self):
+        self.by_rule = defaultdict(lambda: {"requests": 0, "bytes": 0, "estimated": 0})
+        self.sizes = defaultdict(dict)   # measure mode: rule -> {url: bytes}
+
+    def to_dict(self):
+        return {
+            "requests": sum(row["requests"] for row in self.by_rule.values()),
+            "bytes": sum(row["bytes"] for row in self.by_rule.values()),
+            "rules": {name: dict(row) for name, row in sorted(self.by_rule.items())},
+        }
+
+
+class BlockPlugin:
+    """Runner plugin blocking (or measuring) heavy third-party resources."""
+
+    def __init__(self, mode="block", rules=None):
+        if mode not in MODES:
+            raise ValueError(f"Fast mode must be one of {', '.join(MODES)}")
+        self.mode = mode
+        self.rules = load_rules() if rules is None else rules
+        self.sizes = load_sizes()
+        self._savings = {}
+
+    def _case_id(self, api):
+        return getattr(api.case, "id", str(api.case))
+
+    def _rule_for(self, rules, request):
+        for rule in rules:
+            if rule.matches(request.url, request.resource_type):
+                return rule
+        return None
+
+    def _estimate(self, rule, url):
+        if url in self.sizes.get(rule.name, {}):
+            return self.sizes[rule.name][url], False
+        known = list(self.sizes.get(rule.name, {}).values())
+        return (sum(known) // len(known) if known else 0), True
+
+    async def on_context(self, context, api):
+        case_id = self._case_id(api)
+        rules = [rule for rule in self.rules if rule.applies(case_id)]
+        if not rules:
+            return
+        savings = self._savings.setdefault(id(api), _Savings())
+
+        if self.mode == "measure":
+            async def finished(request):
+                rule = self._rule_for(rules, request)
+                if rule is None:
+                    return
+                try:
+                    sizes = await request.sizes()
+                except async_api.Error:
+                    return
+                size = sizes["responseBodySize"] + sizes["responseHeadersSize"]
+                savings.sizes[rule.name][request.url] = size
+                row = savings.by_rule[rule.name]
+                row["requests"] += 1
+                row["bytes"] += size
+
+            context.on("requestfinished", finished)
+            return
+
+        async def handle(route):
+            request = route.request
+            rule = self._rule_for(rules, request)
+            if rule is None:
+                await route.fallback()
+                return
+            size, estimated = self._estimate(rule, request.url)
+            row = savings.by_rule[rule.name]
+            row["requests"] += 1
+            row["bytes"] += size
+            row["estimated"] += estimated
+            stub = _STUBS.get(request.resource_type) if rule.action == "stub" else None
+            if stub is None:
+                await route.abort("blockedbyclient")
+            else:
+                content_type, body = stub
+                await route.fulfill(status=200, content_type=content_type, body=body,
+                                    headers={"access-control-allow-origin": "*"})
+
+        # One route for the union of the rule URLs keeps other requests off the Python side
+        union = "|".join(f"(?:{rule.pattern.pattern})" for rule in rules)
+        await context.route(re.compile(union), handle)
+
+    async def after_case(self, api, result):
+        savings = self._savings.pop(id(api), None)
+        if savings is None:
+            return
+        result.details["fast"] = {"mode": self.mode, **savings.to_dict()}
+        if self.mode == "measure":
+            # Merged once by the parent process: shards would race on the file
+            result.details["fast"]["sizes"] = {rule: dict(urls) for rule, urls in savings.sizes.items()}
+
+
+def _format_bytes(count):
+    if count < 1024:
+        return f"{count} B"
+    for unit in ("KB", "MB"):
+        count /= 1024
+        if count < 1024:
+            return f"{count:.1f} {unit}"
+    return f"{count / 1024:.1f} GB"
+
+
+def format_savings(results):
+    rows = [(r.id, r.details["fast"]) for r in results if "fast" in r.details]
+    if not rows:
+        return ""
+    measuring = rows[0][1]["mode"] == "measure"
+    title = "Bytes the rules would save per case:" if measuring else "Bytes saved per case:"
+    lines = [title]
+    for case_id, fast in rows:
+        rules = ", ".join(
+            f"{name} {row['requests']}" + (f" ({row['estimated']} est.)" if row["estimated"] else "")
+            for name, row in fast["rules"].items()
+        )
+        lines.append(f"  {case_id}  {_format_bytes(fast['bytes']):>9}  {fast['requests']:>4} req  {rules}")
+    total = sum(fast["bytes"] for _, fast in rows)
+    lines.append(f"  total  {_format_bytes(total):>9}  {sum(f['requests'] for _, f in rows):>4} req")
+    return "\n".join(lines)
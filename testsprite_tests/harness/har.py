@@ -0,0 +1,195 @@
+"""HAR record/replay of Supabase traffic for deterministic runs.
+
+``record`` mode asks Playwright to write the REST, auth and storage
+requests of every context a case opens to ``.harness/har/<TC>[-n].har``.
+``replay`` mode loads those files into a :class:`HarIndex` keyed by
+method and URL and answers matching requests from it through
+``context.route``, so the run never reaches the hosted project.
+Repeated requests are answered in recorded order (the last response is
+reused once the sequence runs out); requests with no recording are
+aborted, or sent to the network with ``unmatched="continue"``.
+"""
+import base64
+import json
+import re
+from collections import defaultdict
+from urllib.parse import urlsplit, urlunsplit
+
+from . import config
+
+MODES = ("record", "replay")
+
+# Hop-by-hop / encoding headers that no longer describe the stored body
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+_CORS_PREFLIGHT = {
+    "access-control-allow-origin": "*",
+    "access-control-allow-methods": "GET, POST, PUT, PATCH, DELETE, OPTIONS",
+    "access-control-allow-headers": "*",
+    "access-control-max-age": "86400",
+}
+
+
+def _without_query(url):
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+
+
+class HarIndex:
+    """Recorded responses indexed by ``(method, url)``.
+
+    An entry is listed under its exact URL and under its URL without the
+    query string, but is consumed once, whichever list served it.
+    """
+
+    def __init__(self):
+        self._exact = defaultdict(list)
+        self._by_path = defaultdict(list)
+        self._used = set()
+        self._cursor = defaultdict(int)  # id(list) -> entries before it are used
+        self.hits = 0
+        self.misses = []
+
+    @classmethod
+    def load(cls, paths):
+        index = cls()
+        for path in paths:
+            har = json.loads(path.read_text(encoding="utf-8"))
+            for entry in har["log"]["entries"]:
+                index.add(entry)
+        return index
+
+    def add(self, entry):
+        request = entry["request"]
+        method = request["method"].upper()
+        self._exact[(method, request["url"])].append(entry)
+        self._by_path[(method, _without_query(request["url"]))].append(entry)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._exact.values())
+
+    def _next(self, entries):
+        position = self._cursor[id(entries)]
+        while position < len(entries) and id(entries[position]) in self._used:
+            position += 1
+        self._cursor[id(entries)] = position
+        if position == len(entries):
+            return entries[-1]
+        self._used.add(id(entries[position]))
+        return entries[position]
+
+    def lookup(self, method, url):
+        """Next recorded entry for the request, or None.
+
+        Falls back to the same path with a different query string, which
+        covers filters that embed timestamps or generated ids.
+        """
+        method = method.upper()
+        entries = self._exact.get((method, url)) or self._by_path.get((method, _without_query(url)))
+        if not entries:
+            return None
+        self.hits += 1
+        return self._next(entries)
+
+
+def case_files(directory, case_id):
+    """The HAR files of ``case_id`` in context order: ``TC005.har``, ``TC005-2.har``, ..."""
+    numbered = []
+    for path in directory.glob(f"{case_id}-*.har"):
+        suffix = path.stem[len(case_id) + 1:]
+        if suffix.isdigit():
+            numbered.append((int(suffix), path))
+    first = directory / f"{case_id}.har"
+    return ([first] if first.exists() else []) + [path for _, path in sorted(numbered)]
+
+
+def _response_body(content):
+    text = content.get("text")
+    if text is None:
+        return b""
+    if content.get("encoding") == "base64":
+        return base64.b64decode(text)
+    return text.encode("utf-8")
+
+
+async def fulfill(route, entry):
+    response = entry["response"]
+    headers = {
+        header["name"]: header["value"]
+        for header in response.get("headers", [])
+        if header["name"].lower() not in _DROP_HEADERS
+    }
+    await route.fulfill(
+        status=response["status"],
+        headers=headers,
+        body=_response_body(response.get("content", {})),
+    )
+
+
+class HarPlugin:
+    """Runner plugin recording or replaying Supabase traffic per case."""
+
+    def __init__(self, mode, directory=None, unmatched="abort", pattern=None):
+        if mode not in MODES:
+            raise ValueError(f"HAR mode must be one of {', '.join(MODES)}")
+        self.mode = mode
+        self.directory = directory or config.OUTPUT_DIR / "har"
+        self.unmatched = unmatched
+        self.pattern = re.compile(pattern or config.SUPABASE_URL_PATTERN)
+        self._contexts = defaultdict(int)
+        self._indexes = {}
+
+    def _case_id(self, api):
+        return getattr(api.case, "id", str(api.case))
+
+    def context_options(self, api):
+        """Pool option hook: point Playwright's HAR recorder at the case file."""
+        if self.mode != "record":
+            return {}
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._contexts[id(api)] += 1
+        number = self._contexts[id(api)]
+        if number == 1:
+            # A shorter recording must not replay the extra files of an older one
+            for path in case_files(self.directory, self._case_id(api)):
+                path.unlink()
+        suffix = "" if number == 1 else f"-{number}"
+        return {
+            "record_har_path": str(self.directory / f"{self._case_id(api)}{suffix}.har"),
+            "record_har_url_filter": self.pattern,
+            "record_har_content": "embed",
+        }
+
+    async def on_context(self, context, api):
+        if self.mode != "replay":
+            return
+        index = self._indexes.get(id(api))
+        if index is None:
+            paths = case_files(self.directory, self._case_id(api))
+            index = self._indexes[id(api)] = HarIndex.load(paths)
+
+        async def handle(route):
+            request = route.request
+            entry = index.lookup(request.method, request.url)
+            if entry is not None:
+                await fulfill(route, entry)
+            elif request.method == "OPTIONS":
+                await route.fulfill(status=204, headers=_CORS_PREFLIGHT)
+            else:
+                index.misses.append(f"{request.method} {request.url}")
+                if self.unmatched == "continue":
+                    await route.continue_()
+                else:
+                    await route.abort("internetdisconnected")
+
+        await context.route(self.pattern, handle)
+
+    async def after_case(self, api, result):
+        self._contexts.pop(id(api), None)
+        index = self._indexes.pop(id(api), None)
+        if index is not None:
+            result.details["har"] = {
+                "recorded": len(index),
+                "hits": index.hits,
+                "misses": index.misses,
+            }
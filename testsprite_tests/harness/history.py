@@ -0,0 +1,232 @@
+"""SQLite store of past runs and regression detection on their timings.
+
+Every suite run is written to ``.harness/history.sqlite``: one ``runs``
+row, one ``cases`` row per case (status, duration, error) and one
+``steps`` row per distinct step of the case's timeline (category and
+name, total milliseconds and how often it ran).
+
+:func:`regressions` compares a run against a rolling baseline made of
+the previous ``window`` runs of the same case/step. A value is flagged
+when it is an outlier by the modified z-score (median and MAD, robust to
+the odd slow run in the baseline) *and* is both ``threshold`` relatively
+and ``min_delta_ms`` absolutely slower than the baseline median, so a
+catalog filter step going from 400ms to 520ms is reported while jitter
+on a 5ms step is not.
+"""
+import datetime
+import sqlite3
+import statistics
+import subprocess
+from collections import defaultdict
+from contextlib import closing
+
+from . import config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    revision TEXT,
+    command TEXT,
+    elapsed_s REAL
+);
+CREATE TABLE IF NOT EXISTS cases (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    case_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    duration_ms REAL NOT NULL,
+    error TEXT,
+    PRIMARY KEY (run_id, case_id)
+);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    case_id TEXT NOT NULL,
+    step TEXT NOT NULL,
+    duration_ms REAL NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (run_id, case_id, step)
+);
+CREATE INDEX IF NOT EXISTS steps_by_name ON steps (case_id, step, run_id);
+"""
+
+# Regression thresholds (see module docstring)
+WINDOW = 10
+MIN_SAMPLES = 3
+THRESHOLD = 0.20
+MIN_DELTA_MS = 50.0
+Z_SCORE = 3.5
+
+
+def connect(path=None):
+    path = path or config.HISTORY_DB
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA foreign_keys = ON")
+    db.executescript(SCHEMA)
+    return db
+
+
+def _revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=config.TESTS_DIR, capture_output=True, text=True, timeout=5, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _steps(timeline):
+    """``{"category: name": (total_ms, count)}`` for one timeline."""
+    steps = defaultdict(lambda: [0.0, 0])
+    for span in timeline.spans:
+        row = steps[f"{span.category}: {span.name}"]
+        row[0] += span.duration / 1e6
+        row[1] += 1
+    return steps
+
+
+def record(results, elapsed, command=None, path=None):
+    """Store one run; returns its id."""
+    # The connection's own context manager only commits
+    with closing(connect(path)) as db, db:
+        run_id = db.execute(
+            "INSERT INTO runs (started_at, revision, command, elapsed_s) VALUES (?, ?, ?, ?)",
+            (datetime.datetime.now().isoformat(timespec="seconds"), _revision(), command, elapsed),
+        ).lastrowid
+        db.executemany(
+            "INSERT INTO cases VALUES (?, ?, ?, ?, ?)",
+            [(run_id, r.id, r.status, r.duration * 1000, r.error or None) for r in results],
+        )
+        db.executemany(
+            "INSERT INTO steps VALUES (?, ?, ?, ?, ?)",
+            [
+                (run_id, r.id, step, total, count)
+                for r in results
+                if r.timeline is not None and not r.skipped
+                for step, (total, count) in _steps(r.timeline).items()
+            ],
+        )
+    return run_id
+
+
+def latest_run(db):
+    row = db.execute("SELECT MAX(id) FROM runs").fetchone()
+    return row[0]
+
+
+def _is_regression(value, baseline, threshold, min_delta_ms):
+    if len(baseline) < MIN_SAMPLES:
+        return False
+    median = statistics.median(baseline)
+    if value - median < max(min_delta_ms, threshold * median):
+        return False
+    mad = statistics.median(abs(sample - median) for sample in baseline)
+    if mad == 0:
+        # Perfectly stable baseline: the relative/absolute guard decides
+        return True
+    return 0.6745 * (value - median) / mad > Z_SCORE
+
+
+def regressions(run_id=None, window=WINDOW, threshold=THRESHOLD, min_delta_ms=MIN_DELTA_MS, path=None):
+    """Cases and steps of ``run_id`` (default: latest) slower than their baseline.
+
+    Returns dicts with ``case``, ``step`` (None for the whole case),
+    ``value_ms``, ``baseline_ms`` (median) and ``change`` (relative).
+    Only passing cases are compared: a failure's duration says nothing
+    about speed.
+    """
+    with closing(connect(path)) as db, db:
+        run_id = run_id or latest_run(db)
+        if run_id is None:
+            return []
+        queries = (
+            ("SELECT case_id, NULL, duration_ms FROM cases WHERE run_id = ? AND status = 'PASS'",
+             """SELECT duration_ms FROM cases
+                WHERE case_id = ? AND status = 'PASS' AND run_id < ?
+                ORDER BY run_id DESC LIMIT ?"""),
+            ("""SELECT s.case_id, s.step, s.duration_ms FROM steps s
+                JOIN cases c USING (run_id, case_id)
+                WHERE s.run_id = ? AND c.status = 'PASS'""",
+             """SELECT s.duration_ms FROM steps s JOIN cases c USING (run_id, case_id)
+                WHERE s.case_id = ? AND s.step = ? AND c.status = 'PASS' AND s.run_id < ?
+                ORDER BY s.run_id DESC LIMIT ?"""),
+        )
+        found = []
+        for current, history in queries:
+            for case_id, step, value in db.execute(current, (run_id,)).fetchall():
+                args = (case_id, run_id, window) if step is None else (case_id, step, run_id, window)
+                baseline = [row[0] for row in db.execute(history, args)]
+                if _is_regression(value, baseline, threshold, min_delta_ms):
+                    median = statistics.median(baseline)
+                    found.append({
+                        "case": case_id,
+                        "step": step,
+                        "value_ms": value,
+                        "baseline_ms": median,
+                        "change": (value - median) / median if median else float("inf"),
+                        "samples": len(baseline),
+                    })
+    found.sort(key=lambda row: row["value_ms"] - row["baseline_ms"], reverse=True)
+    return found
+
+
+def format_regressions(rows):
+    if not rows:
+        return ""
+    lines = [f"{len(rows)} timing regression(s) against the rolling baseline:"]
+    for row in rows:
+        lines.append(
+            f"  {row['case']}  {row['step'] or 'whole case':<48.48} "
+            f"{row['baseline_ms']:9.1f} -> {row['value_ms']:9.1f} ms  "
+            f"(+{100 * row['change']:.0f}%, n={row['samples']})"
+        )
+    return "\n".join(lines)
+
+
+_BARS = "▁▂▃▄▅▆▇█"
+# Runs without a value keep their column, as in the status column
+_GAP = " "
+
+
+def _sparkline(values):
+    present = [value for value in values if value is not None]
+    if not present:
+        return ""
+    low, high = min(present), max(present)
+    span = (high - low) or 1
+    return "".join(_GAP if value is None else _BARS[int((value - low) / span * (len(_BARS) - 1))]
+                   for value in values)
+
+
+def trend(cases=None, runs=WINDOW, path=None):
+    """Per-case duration and status over the last ``runs`` runs."""
+    with closing(connect(path)) as db, db:
+        run_ids = [row[0] for row in db.execute("SELECT id FROM runs ORDER BY id DESC LIMIT ?", (runs,))]
+        run_ids.reverse()
+        if not run_ids:
+            return "No runs recorded yet."
+        marks = ",".join("?" * len(run_ids))
+        rows = db.execute(
+            f"SELECT case_id, run_id, status, duration_ms FROM cases WHERE run_id IN ({marks})",
+            run_ids,
+        ).fetchall()
+    by_case = defaultdict(dict)
+    for case_id, run_id, status, duration in rows:
+        if not cases or case_id in cases:
+            by_case[case_id][run_id] = (status, duration)
+
+    symbols = {"PASS": ".", "FAIL": "F", "SKIP": "s"}
+    lines = [f"Last {len(run_ids)} run(s), oldest first (. pass, F fail, s skip):", ""]
+    for case_id in sorted(by_case):
+        history = [by_case[case_id].get(run_id) for run_id in run_ids]
+        statuses = "".join(symbols.get(item[0], "?") if item else " " for item in history)
+        durations = [item[1] / 1000 if item and item[0] == "PASS" else None for item in history]
+        passing = [value for value in durations if value is not None]
+        last = passing[-1] if passing else None
+        median = statistics.median(passing) if passing else None
+        lines.append(
+            f"  {case_id}  {statuses:<{len(run_ids)}}  {_sparkline(durations):<{len(run_ids)}}  "
+            + (f"last {last:6.1f}s  median {median:6.1f}s" if passing else "no passing run")
+        )
+    return "\n".join(lines)
@@ -0,0 +1,195 @@
+"""Minimal asyncio HTTP/1.1 client with pooled keep-alive connections.
+
+Only what the benchmark modes need: one origin per pool, JSON or raw
+bodies, ``Content-Length`` and chunked responses, and an optional
+``on_data`` callback that sees body bytes as they arrive (for measuring
+streamed responses). Connections are opened
+lazily up to ``size`` and handed back to the pool after every response,
+so a benchmark measures the server rather than TCP/TLS handshakes.
+"""
+import asyncio
+import json
+import ssl
+from urllib.parse import urlencode, urlsplit
+
+
+class HttpError(RuntimeError):
+    pass
+
+
+class Response:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 400
+
+    def json(self):
+        return json.loads(self.body or b"null")
+
+
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.reusable = True
+
+    async def request(self, method, target, headers, body, on_data=None):
+        head = [f"{method} {target} HTTP/1.1"]
+        head += [f"{name}: {value}" for name, value in headers.items()]
+        self.writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await self.writer.drain()
+        return await self._read_response(method, on_data)
+
+    async def _read_exactly(self, size, on_data):
+        if on_data is None:
+            return await self.reader.readexactly(size)
+        parts = []
+        while size:
+            piece = await self.reader.read(min(size, 65536))
+            if not piece:
+                raise asyncio.IncompleteReadError(b"".join(parts), size)
+            on_data(piece)
+            parts.append(piece)
+            size -= len(piece)
+        return b"".join(parts)
+
+    async def _read_response(self, method, on_data=None):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed by server")
+        try:
+            version, status = status_line.decode("latin-1").split(" ", 2)[:2]
+            status = int(status)
+        except ValueError:
+            raise HttpError(f"malformed status line {status_line!r}") from None
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            body = b""
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            body = await self._read_chunked(on_data)
+        elif "content-length" in headers:
+            body = await self._read_exactly(int(headers["content-length"]), on_data)
+        else:
+            body = await self.reader.read()
+            if on_data is not None and body:
+                on_data(body)
+            self.reusable = False
+
+        connection = headers.get("connection", "").lower()
+        if connection == "close" or (version == "HTTP/1.0" and connection != "keep-alive"):
+            self.reusable = False
+        return Response(status, headers, body)
+
+    async def _read_chunked(self, on_data=None):
+        chunks = []
+        while True:
+            size = int((await self.reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                # Trailers end with an empty line
+                while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(chunks)
+            chunks.append(await self._read_exactly(size, on_data))
+            await self.reader.readexactly(2)
+
+    def close(self):
+        self.reusable = False
+        self.writer.close()
+
+
+class ConnectionPool:
+    """Up to ``size`` keep-alive connections to the origin of ``base_url``."""
+
+    def __init__(self, base_url, size=10, timeout=10.0, headers=None):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or "http"
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or (443 if self.scheme == "https" else 80)
+        self.base_path = parts.path.rstrip("/")
+        self.size = size
+        self.timeout = timeout
+        self.headers = {
+            "Host": parts.netloc or self.host,
+            "Connection": "keep-alive",
+            "Accept": "application/json",
+            "User-Agent": "testsprite-harness",
+            **(headers or {}),
+        }
+        self._idle = asyncio.LifoQueue()
+        self._slots = asyncio.Semaphore(size)
+        self._open = set()
+        self.connects = 0
+
+    async def _connect(self):
+        context = ssl.create_default_context() if self.scheme == "https" else None
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=context)
+        self.connects += 1
+        connection = _Connection(reader, writer)
+        self._open.add(connection)
+        return connection
+
+    def _discard(self, connection):
+        self._open.discard(connection)
+        connection.close()
+
+    async def request(self, method, path, params=None, json_body=None, body=b"", headers=None, on_data=None):
+        target = self.base_path + path
+        if params:
+            target += ("&" if "?" in target else "?") + urlencode(params)
+        if json_body is not None:
+            body = json.dumps(json_body).encode("utf-8")
+            headers = {"Content-Type": "application/json", **(headers or {})}
+        merged = {**self.headers, **(headers or {}), "Content-Length": str(len(body))}
+
+        async with self._slots:
+            reused = not self._idle.empty()
+            connection = self._idle.get_nowait() if reused else await self._connect()
+            try:
+                response = await asyncio.wait_for(
+                    connection.request(method, target, merged, body, on_data), self.timeout
+                )
+            except (ConnectionError, asyncio.IncompleteReadError):
+                self._discard(connection)
+                if not reused:
+                    raise
+                # The server may close an idle keep-alive socket at any time:
+                # retry once on a fresh connection.
+                connection = await self._connect()
+                try:
+                    response = await asyncio.wait_for(
+                        connection.request(method, target, merged, body, on_data), self.timeout
+                    )
+                except BaseException:
+                    self._discard(connection)
+                    raise
+            except BaseException:
+                self._discard(connection)
+                raise
+            if connection.reusable:
+                self._idle.put_nowait(connection)
+            else:
+                self._discard(connection)
+            return response
+
+    async def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        for connection in list(self._open):
+            self._discard(connection)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
@@ -0,0 +1,374 @@
+"""Change-impact test selection from JS coverage and ``git diff``.
+
+Collecting (``run --collect-impact``): :class:`ImpactPlugin` starts V8
+precise coverage on every page through CDP. Just before a context
+closes it takes the coverage, maps each executed function back to its
+source file through the dev server's source maps and records which
+``frontend/src`` files and which backend routes (requests to
+``config.API_URL``) the case exercised. The run writes the merged result
+to ``impact_map.json``, which can be committed next to the test plan.
+
+Selecting (``impact`` / ``run --since REF``): the files changed since
+``REF`` (committed, staged, unstaged and untracked) are looked up in the
+map. Changes to a TC script select that script, changes to shared
+configuration (package manifests, the harness, backend models) select
+every case they can reach, and files no case executed select nothing.
+Without a map every case is selected.
+
+Coverage is function-level and best effort: module top-level code and
+documents replaced by a full navigation before the context closed are
+not attributed.
+"""
+import datetime
+import fnmatch
+import json
+import logging
+import re
+import subprocess
+from collections import defaultdict
+from urllib.parse import urljoin, urlsplit
+
+from playwright import async_api
+
+from . import config
+from .tasks import spawn
+
+log = logging.getLogger(__name__)
+
+REPO_DIR = config.TESTS_DIR.parent
+BACKEND_SRC = REPO_DIR / "backend" / "src"
+
+# Changes that can affect any case
+GLOBAL_PATTERNS = (
+    "frontend/package.json",
+    "frontend/package-lock.json",
+    "frontend/tsconfig.json",
+    "frontend/tailwind.config.js",
+    "frontend/public/*",
+    "frontend/src/index.tsx",
+    "frontend/src/App.tsx",
+    "frontend/src/*.css",
+    "frontend/src/styles/*",
+    "frontend/.env*",
+    "testsprite_tests/harness/*",
+    "testsprite_tests/locators.json",
+    "testsprite_tests/testsprite_frontend_test_plan.json",
+)
+
+# Backend files every route depends on: they select every case that hit the API
+BACKEND_SHARED_PATTERNS = (
+    "backend/package.json",
+    "backend/src/index.js",
+    "backend/src/config/*",
+    "backend/src/models/*",
+    "backend/.env*",
+)
+
+_CASE_SCRIPT = re.compile(r"^testsprite_tests/(TC\d{3})_.+\.py$")
+
+# ---------------------------------------------------------------- source maps
+
+_BASE64 = {c: i for i, c in enumerate("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/")}
+
+
+def _decode_vlq(segment):
+    values, shift, value = [], 0, 0
+    for char in segment:
+        digit = _BASE64[char]
+        value += (digit & 31) << shift
+        if digit & 32:
+            shift += 5
+            continue
+        values.append(-(value >> 1) if value & 1 else value >> 1)
+        shift = value = 0
+    return values
+
+
+class SourceMap:
+    """Generated (line, column) -> source file lookups for one script."""
+
+    def __init__(self, data):
+        root = data.get("sourceRoot") or ""
+        self.sources = [root + source for source in data["sources"]]
+        # Per generated line: sorted [(column, source index)]
+        self.lines = []
+        source = 0
+        for line in data["mappings"].split(";"):
+            column = 0
+            segments = []
+            for raw in filter(None, line.split(",")):
+                fields = _decode_vlq(raw)
+                column += fields[0]
+                if len(fields) >= 4:
+                    source += fields[1]
+                    segments.append((column, source))
+            self.lines.append(segments)
+
+    def source_at(self, line, column):
+        segments = self.lines[line] if line < len(self.lines) else []
+        best = None
+        for segment_column, source in segments:
+            if segment_column > column:
+                break
+            best = source
+        return None if best is None else self.sources[best]
+
+
+def repo_path(source):
+    """``webpack://mobilindo-frontend/./src/x.ts`` -> ``frontend/src/x.ts``."""
+    path = re.sub(r"^webpack://[^/]*/", "", source)
+    path = path.split("?")[0].lstrip("./")
+    if path.startswith("src/"):
+        return "frontend/" + path
+    return None
+
+
+class _Script:
+    def __init__(self, text, source_map):
+        self.line_starts = [0] + [match.end() for match in re.finditer("\n", text)]
+        self.source_map = source_map
+
+    def source_at(self, offset):
+        line = _bisect(self.line_starts, offset)
+        return self.source_map.source_at(line, offset - self.line_starts[line])
+
+
+def _bisect(starts, offset):
+    low, high = 0, len(starts) - 1
+    while low < high:
+        middle = (low + high + 1) // 2
+        if starts[middle] <= offset:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+_SOURCE_MAPPING_URL = re.compile(r"//[#@] sourceMappingURL=(\S+)\s*$")
+
+# Scripts are the same for every case of a run: fetch and decode them once per process
+_scripts = {}
+
+
+async def _load_script(request, url):
+    if url in _scripts:
+        return _scripts[url]
+    script = None
+    try:
+        text = await (await request.get(url)).text()
+        match = _SOURCE_MAPPING_URL.search(text[-500:])
+        if match and not match.group(1).startswith("data:"):
+            response = await request.get(urljoin(url, match.group(1)))
+            if response.ok:
+                script = _Script(text, SourceMap(await response.json()))
+    except (async_api.Error, ValueError, KeyError) as exc:
+        log.warning("No source map for %s: %s", url, exc)
+    _scripts[url] = script
+    return script
+
+
+# --------------------------------------------------------------- backend routes
+
+def _module_path(directory, specifier):
+    # require('./routes/auth.routes') -> routes/auth.routes.js
+    path = (directory / specifier).resolve()
+    return path if path.suffix == ".js" else path.with_name(path.name + ".js")
+
+
+def backend_routes():
+    """``{"/api/cars": ["backend/src/routes/car.routes.js", "backend/src/controllers/..."]}``."""
+    index = BACKEND_SRC / "index.js"
+    if not index.exists():
+        return {}
+    source = index.read_text(encoding="utf-8")
+    modules = dict(re.findall(r"const (\w+) = require\('(\./routes/[^']+)'\)", source))
+    routes = {}
+    for prefix, name in re.findall(r"app\.use\('([^']+)',\s*(\w+)\)", source):
+        if name not in modules:
+            continue
+        route_file = _module_path(BACKEND_SRC, modules[name])
+        files = [route_file]
+        if route_file.exists():
+            for required in re.findall(r"require\('(\.\./(?:controllers|models)/[^']+)'\)",
+                                       route_file.read_text(encoding="utf-8")):
+                files.append(_module_path(route_file.parent, required))
+        routes[prefix] = sorted(str(path.relative_to(REPO_DIR)) for path in files)
+    return routes
+
+
+def _route_prefix(path, routes):
+    matches = [prefix for prefix in routes if path == prefix or path.startswith(prefix + "/")]
+    return max(matches, key=len) if matches else None
+
+
+# ------------------------------------------------------------------ collection
+
+class _Coverage:
+    """Files and routes exercised by the contexts of one case."""
+
+    def __init__(self):
+        self.files = set()
+        self.routes = set()
+
+
+class ImpactPlugin:
+    """Runner plugin recording the files and routes each case exercises."""
+
+    def __init__(self, api_url=None):
+        self.api_url = (api_url or config.API_URL).rstrip("/")
+        self.routes = backend_routes()
+        self._coverage = {}
+        self._sessions = {}   # context -> (coverage, CDP sessions)
+
+    async def on_context(self, context, api):
+        coverage = self._coverage.setdefault(id(api), _Coverage())
+        sessions = []
+        self._sessions[context] = (coverage, sessions)
+
+        async def start(page):
+            try:
+                session = await context.new_cdp_session(page)
+                await session.send("Profiler.enable")
+                await session.send("Profiler.startPreciseCoverage", {"callCount": False, "detailed": False})
+                sessions.append(session)
+            except async_api.Error as exc:
+                log.warning("Cannot start coverage: %s", exc)
+
+        def on_request(request):
+            if not request.url.startswith(self.api_url):
+                return
+            prefix = _route_prefix(urlsplit(request.url).path, self.routes)
+            if prefix:
+                coverage.routes.add(prefix)
+
+        for page in context.pages:
+            await start(page)
+        context.on("page", lambda page: spawn(start(page)))
+        context.on("request", on_request)
+
+    async def before_close(self, context):
+        coverage, sessions = self._sessions.pop(context, (None, []))
+        for session in sessions:
+            await self._collect(context, session, coverage)
+
+    async def _collect(self, context, session, coverage):
+        try:
+            result = await session.send("Profiler.takePreciseCoverage")
+        except async_api.Error:
+            return
+        for entry in result["result"]:
+            if not entry["url"].startswith(("http://", "https://")):
+                continue
+            script = await _load_script(context.request, entry["url"])
+            if script is None:
+                continue
+            for function in entry["functions"]:
+                first = function["ranges"][0]
+                if not first["count"]:
+                    continue
+                path = repo_path(script.source_at(first["startOffset"]) or "")
+                if path:
+                    coverage.files.add(path)
+
+    async def after_case(self, api, result):
+        coverage = self._coverage.pop(id(api), None)
+        if coverage is None or result.skipped:
+            return
+        files = set(coverage.files)
+        for prefix in coverage.routes:
+            files.update(self.routes.get(prefix, []))
+        result.details["impact"] = {"files": sorted(files), "routes": sorted(coverage.routes)}
+
+
+def write_map(results, path=None, revision=None):
+    """Merge the ``impact`` details of ``results`` into the map file."""
+    path = path or config.IMPACT_MAP_PATH
+    impact_map = load_map(path) or {"cases": {}}
+    for result in results:
+        if "impact" in result.details:
+            impact_map["cases"][result.id] = result.details["impact"]
+    impact_map["generated"] = datetime.datetime.now().isoformat(timespec="seconds")
+    impact_map["revision"] = revision or _git("rev-parse", "--short", "HEAD").strip() or None
+    path.write_text(json.dumps(impact_map, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return path
+
+
+def load_map(path=None):
+    path = path or config.IMPACT_MAP_PATH
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+# ------------------------------------------------------------------- selection
+
+def _git(*args):
+    try:
+        return subprocess.run(
+            ["git", *args], cwd=REPO_DIR, capture_output=True, text=True, timeout=30, check=True,
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def changed_files(since="HEAD"):
+    """Files changed since ``since`` plus uncommitted and untracked files."""
+    names = set()
+    if since != "HEAD":
+        names.update(_git("diff", "--name-only", f"{since}...HEAD").split())
+    names.update(_git("diff", "--name-only", "HEAD").split())
+    names.update(_git("ls-files", "--others", "--exclude-standard").split())
+    return sorted(names)
+
+
+def _matches(path, patterns):
+    return any(fnmatch.fnmatchcase(path, pattern) for pattern in patterns)
+
+
+def select(changed, case_ids, impact_map=None):
+    """``({case_id: [reason, ...]}, unmapped_files)`` for the ``changed`` files."""
+    impact_map = load_map() if impact_map is None else impact_map
+    selected = defaultdict(list)
+    if not impact_map:
+        return {case_id: ["no impact map"] for case_id in case_ids}, []
+
+    cases = impact_map.get("cases", {})
+    by_file = defaultdict(set)
+    for case_id, entry in cases.items():
+        for path in entry.get("files", []):
+            by_file[path].add(case_id)
+    api_cases = {case_id for case_id, entry in cases.items() if entry.get("routes")}
+
+    unmapped = []
+    for path in changed:
+        script = _CASE_SCRIPT.match(path)
+        if script:
+            targets = {script.group(1)}
+        elif _matches(path, GLOBAL_PATTERNS):
+            targets = set(case_ids)
+        elif _matches(path, BACKEND_SHARED_PATTERNS):
+            targets = api_cases
+        else:
+            targets = by_file.get(path, set())
+            if path not in by_file:
+                unmapped.append(path)
+        for case_id in targets:
+            if case_id in case_ids:
+                selected[case_id].append(path)
+    # Cases missing from the map have never been profiled: run them
+    for case_id in case_ids:
+        if case_id not in cases:
+            selected[case_id].append("not in impact map")
+    return dict(sorted(selected.items())), unmapped
+
+
+def format_selection(selected, unmapped, total):
+    lines = [f"{len(selected)}/{total} case(s) affected:"]
+    for case_id, reasons in selected.items():
+        shown = ", ".join(reasons[:3]) + (f" (+{len(reasons) - 3} more)" if len(reasons) > 3 else "")
+        lines.append(f"  {case_id}  {shown}")
+    if unmapped:
+        lines.append("")
+        lines.append("Changed files no case exercises:")
+        lines += [f"  {path}" for path in unmapped]
+    return "\n".join(lines)
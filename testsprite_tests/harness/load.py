@@ -0,0 +1,155 @@
+"""Virtual-user load mode for browser journeys.
+
+A journey is a compiled test plan (TC005's catalog browse by default:
+open Katalog Mobil, search 'Toyota', apply filters). ``users`` virtual
+users are started over ``ramp_up`` seconds; each one repeatedly opens a
+fresh browser context on the shared pool, walks the journey with a random
+think time between steps, and records every step's latency together with
+the number of users active when the step started. The report gives
+p50/p95/p99 per step, errors per second, and latency per concurrency
+level so the point where the catalog starts to degrade is visible.
+"""
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+
+from . import config, stats
+from .plan import load_plans
+from .pool import BrowserPool
+
+
+class LoadReport:
+    def __init__(self, users):
+        self.users = users
+        self.started = time.monotonic()
+        self.finished = None
+        self.samples = defaultdict(list)   # step -> [(offset_s, active, ms)]
+        self.errors = []                   # (offset_s, step, message)
+        self.iterations = 0
+        self.active = 0
+
+    def offset(self):
+        return time.monotonic() - self.started
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    def step_summaries(self):
+        return {step: stats.summarize([ms for _, _, ms in rows]) for step, rows in self.samples.items()}
+
+    def by_concurrency(self, buckets=5):
+        """Journey-wide latency grouped by active users when the step started."""
+        width = max(1, -(-self.users // buckets))
+        groups = defaultdict(list)
+        for rows in self.samples.values():
+            for _, active, ms in rows:
+                low = (active - 1) // width * width + 1
+                groups[(low, min(low + width - 1, self.users))].append(ms)
+        return {f"{low}-{high} users": stats.summarize(values) for (low, high), values in sorted(groups.items())}
+
+    def to_dict(self):
+        return {
+            "users": self.users,
+            "elapsed_s": round(self.elapsed, 3),
+            "iterations": self.iterations,
+            "errors": len(self.errors),
+            "errors_per_s": len(self.errors) / self.elapsed if self.elapsed else 0.0,
+            "steps": self.step_summaries(),
+            "by_concurrency": self.by_concurrency(),
+            "error_samples": [
+                {"t": round(t, 3), "step": step, "error": message}
+                for t, step, message in self.errors[:50]
+            ],
+        }
+
+    def format(self):
+        summary = self.to_dict()
+        lines = [
+            f"{summary['iterations']} journeys by {self.users} virtual users in "
+            f"{summary['elapsed_s']:.1f}s, {summary['errors']} errors "
+            f"({summary['errors_per_s']:.2f}/s)",
+            "",
+            stats.format_header("step"),
+        ]
+        lines += [stats.format_row(step, row) for step, row in summary["steps"].items()]
+        lines += ["", stats.format_header("concurrency")]
+        lines += [stats.format_row(level, row) for level, row in summary["by_concurrency"].items()]
+        return "\n".join(lines)
+
+    def export(self, path=None):
+        path = path or config.OUTPUT_DIR / "load" / f"load-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        return path
+
+
+def journey_steps(plan_id):
+    """``(label, actions)`` per step of a fully bound plan."""
+    plan = load_plans([plan_id])[0]
+    if plan.unbound:
+        raise ValueError(f"{plan_id} has steps without 'do' operations and cannot be load-tested")
+    return [
+        (f"{number}. {step['description'][:40]}", actions)
+        for number, (step, actions) in enumerate(plan.steps, 1)
+    ]
+
+
+async def _iteration(api, steps, think_time, report):
+    context = await api.browser.new_context()
+    context.set_default_timeout(config.DEFAULT_TIMEOUT)
+    try:
+        page = await context.new_page()
+        await page.goto(config.BASE_URL, wait_until="commit")
+        for label, actions in steps:
+            active = report.active
+            started = time.perf_counter()
+            try:
+                for action in actions:
+                    await action(context.pages[-1])
+            except Exception as exc:
+                report.errors.append((report.offset(), label, f"{type(exc).__name__}: {exc}".splitlines()[0]))
+                # Back off like a real user would instead of hammering a failing page
+                await asyncio.sleep(random.uniform(*think_time))
+                return
+            report.samples[label].append((report.offset(), active, (time.perf_counter() - started) * 1000))
+            await asyncio.sleep(random.uniform(*think_time))
+        report.iterations += 1
+    finally:
+        await context.close()
+
+
+async def _virtual_user(number, pool, steps, delay, deadline, think_time, report):
+    await asyncio.sleep(delay)
+    api = pool.lease(f"vu-{number}")
+    report.active += 1
+    try:
+        while time.monotonic() < deadline:
+            await _iteration(api, steps, think_time, report)
+    finally:
+        report.active -= 1
+        await api.release()
+
+
+async def run_load(users=10, ramp_up=30.0, duration=120.0, think_time=(1.0, 3.0),
+                   browsers=None, plan_id="TC005"):
+    """Drive ``plan_id`` with ``users`` concurrent virtual users."""
+    steps = journey_steps(plan_id)
+    report = LoadReport(users)
+    async with BrowserPool(size=browsers) as pool:
+        report.started = time.monotonic()
+        deadline = report.started + ramp_up + duration
+        await asyncio.gather(*(
+            _virtual_user(number, pool, steps, ramp_up * number / users, deadline, think_time, report)
+            for number in range(users)
+        ))
+    report.finished = time.monotonic()
+    return report
+
+
+def parse_think_time(value):
+    """``"2"`` -> (2, 2); ``"1-3"`` -> (1, 3) seconds."""
+    low, _, high = value.partition("-")
+    return float(low), float(high or low)
@@ -0,0 +1,97 @@
+"""Discovery and loading of the generated TC0xx_*.py scripts.
+
+The scripts are regenerated by TestSprite and end with a module-level
+``asyncio.run(run_test())``, so importing them would immediately run the
+test in its own event loop. The loader compiles each script with that
+trailing call removed and hands back a fresh module whose ``run_test``
+coroutine can be awaited by the suite runner.
+"""
+import ast
+import re
+import types
+
+from . import config
+
+CASE_PATTERN = re.compile(r"^(TC\d{3})_(.+)\.py$")
+
+
+class TestCase:
+    """A single generated TC script on disk."""
+
+    def __init__(self, path):
+        match = CASE_PATTERN.match(path.name)
+        self.path = path
+        self.id = match.group(1)
+        self.title = match.group(2).replace("_", " ")
+
+    @property
+    def name(self):
+        return self.path.stem
+
+    def load(self):
+        """Compile the script into a fresh module without running it."""
+        source = self.path.read_text(encoding="utf-8")
+        tree = ast.parse(source, filename=str(self.path))
+        tree.body = [node for node in tree.body if not _is_asyncio_run(node)]
+        code = compile(tree, str(self.path), "exec")
+
+        module = types.ModuleType(self.name)
+        module.__file__ = str(self.path)
+        exec(code, module.__dict__)
+        if not hasattr(module, "run_test"):
+            raise AttributeError(f"{self.path.name} does not define run_test()")
+        return module
+
+    async def execute(self, api):
+        """Run the script's ``run_test`` with ``api`` standing in for Playwright."""
+        module = self.load()
+        module.async_api = api
+        await module.run_test()
+
+    def __repr__(self):
+        return f"TestCase({self.id})"
+
+
+def _is_asyncio_run(node):
+    # Matches the generated `asyncio.run(run_test())` entry point
+    if not isinstance(node, ast.Expr) or not isinstance(node.value, ast.Call):
+        return False
+    func = node.value.func
+    return (
+        isinstance(func, ast.Attribute)
+        and func.attr == "run"
+        and isinstance(func.value, ast.Name)
+        and func.value.id == "asyncio"
+    )
+
+
+def discover(selectors=None, tests_dir=None):
+    """Return the TC scripts in ``tests_dir`` ordered by id.
+
+    ``selectors`` may contain ids (``TC005``) or script names; when empty
+    every script is returned.
+    """
+    tests_dir = tests_dir or config.TESTS_DIR
+    cases = [
+        TestCase(path)
+        for path in sorted(tests_dir.glob("TC*.py"))
+        if CASE_PATTERN.match(path.name)
+    ]
+    if not selectors:
+        return cases
+
+    by_key = {}
+    for case in cases:
+        by_key[case.id] = case
+        by_key[case.name] = case
+
+    selected, missing = [], []
+    for selector in selectors:
+        case = by_key.get(selector.upper()) or by_key.get(selector)
+        if case is None:
+            missing.append(selector)
+        elif case not in selected:
+            selected.append(case)
+    if missing:
+        raise ValueError(f"Unknown test case(s): {', '.join(missing)}")
+    return sorted(selected, key=lambda c: c.id)
@@ -0,0 +1,133 @@
+"""Semantic locator index with cached, self-healing resolution.
+
+The generated scripts address elements with absolute XPath chains that
+break on any layout change. ``locators.json`` instead names elements per
+page (``katalog.search``, ``navigation.simulasi``) and lists several
+strategies for each, most robust first::
+
+    "search": {"placeholder": "Cari mobil", "xpath": "html/body/..."}
+
+Supported strategies: ``test_id``, ``role`` (+ ``name``), ``label``,
+``placeholder``, ``text``, ``css`` and ``xpath``. The first strategy
+that matches is cached for the page's lifetime; when a cached locator
+stops matching, :meth:`LocatorIndex.heal` drops it and resolves again.
+"""
+import json
+import logging
+import weakref
+
+from playwright import async_api
+
+from . import config, timing
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ("test_id", "role", "label", "placeholder", "text", "css", "xpath")
+
+
+class LocatorIndex:
+    def __init__(self, pages):
+        self.entries = {
+            f"{page}.{name}": spec
+            for page, names in pages.items()
+            for name, spec in names.items()
+        }
+        self.healed = {}
+        self._cache = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def load(cls, path=None):
+        path = path or config.LOCATORS_PATH
+        return cls(json.loads(path.read_text(encoding="utf-8")))
+
+    def spec(self, name):
+        try:
+            return self.entries[name]
+        except KeyError:
+            raise KeyError(f"No locator named {name!r} in the index") from None
+
+    def candidates(self, page, name):
+        """``(strategy, locator)`` pairs for ``name`` in priority order."""
+        spec = self.spec(name)
+        exact = spec.get("exact", False)
+        built = []
+        for strategy in STRATEGIES:
+            value = spec.get(strategy)
+            if value is None:
+                continue
+            if strategy == "test_id":
+                locator = page.get_by_test_id(value)
+            elif strategy == "role":
+                locator = page.get_by_role(value, name=spec.get("name"), exact=exact)
+            elif strategy == "label":
+                locator = page.get_by_label(value, exact=exact)
+            elif strategy == "placeholder":
+                locator = page.get_by_placeholder(value, exact=exact)
+            elif strategy == "text":
+                locator = page.get_by_text(value, exact=exact)
+            elif strategy == "css":
+                locator = page.locator(value)
+            else:
+                locator = page.locator(f"xpath={value}")
+            built.append((strategy, locator.nth(spec.get("nth", 0))))
+        if not built:
+            raise ValueError(f"Locator {name!r} defines none of {', '.join(STRATEGIES)}")
+        return built
+
+    async def resolve(self, page, name, timeout=None):
+        """Return a locator for ``name`` on ``page``, cached per page.
+
+        Waits (up to ``timeout`` ms) for any strategy to match, then picks
+        the highest-priority one that does. If nothing matches in time the
+        primary strategy is returned so the caller's action reports the
+        usual Playwright timeout.
+        """
+        cache = self._cache.setdefault(page, {})
+        if name in cache:
+            return cache[name]
+        with timing.span("locator", name):
+            return await self._resolve(page, name, cache, timeout)
+
+    async def _resolve(self, page, name, cache, timeout):
+        candidates = self.candidates(page, name)
+        combined = candidates[0][1]
+        for _, locator in candidates[1:]:
+            combined = combined.or_(locator)
+        try:
+            await combined.first.wait_for(state="attached", timeout=timeout or config.WAIT_TIMEOUT)
+        except async_api.TimeoutError:
+            return candidates[0][1]
+
+        for position, (strategy, locator) in enumerate(candidates):
+            if await locator.count():
+                if position:
+                    self._record_heal(name, candidates[0][0], strategy)
+                cache[name] = locator
+                return locator
+        return candidates[0][1]
+
+    async def heal(self, page, name, timeout=None):
+        """Forget the cached locator for ``name`` and resolve it again."""
+        self._cache.get(page, {}).pop(name, None)
+        return await self.resolve(page, name, timeout)
+
+    def _record_heal(self, name, primary, used):
+        if self.healed.get(name) != used:
+            logger.warning("locator %s: %s did not match, fell back to %s", name, primary, used)
+        self.healed[name] = used
+
+
+_default = None
+
+
+def default_index():
+    """The index loaded from ``locators.json``, shared by the whole run."""
+    global _default
+    if _default is None:
+        _default = LocatorIndex.load()
+    return _default
+
+
+async def find(page, name, timeout=None):
+    """Shortcut for ``default_index().resolve(page, name)``."""
+    return await default_index().resolve(page, name, timeout)
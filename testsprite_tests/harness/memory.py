@@ -0,0 +1,267 @@
+"""Browser memory sampling and heap-growth detection per test case.
+
+:class:`MemoryPlugin` opens a CDP session on every page a case creates.
+It samples ``Performance.getMetrics`` (JS heap used/total, DOM nodes,
+event listeners, documents) at three points: before each step (from
+:func:`harness.waits.before_action`, once the previous action has
+settled), after every document load, and when the context closes.
+Garbage is collected first (``HeapProfiler.collectGarbage``), so the
+numbers are what the page retains rather than what it has not freed yet.
+
+A page is flagged when a series grows almost monotonically by more than
+a noise floor. Two kinds of series are checked: the heap at each visit
+to the same route, which catches a realtime subscription or a controller
+cache that is never released across repeated navigations, and heap, DOM
+nodes and listeners over the page's whole life. Flags are reported, not
+failed on.
+
+Heap snapshots can be taken on demand with :func:`snapshot`, or for
+every page after its first load and at close with ``--memory snapshot``.
+They are written under ``.harness/memory/`` and open in DevTools'
+Memory panel, where the Comparison view shows what was retained between
+the two.
+"""
+import asyncio
+import json
+import time
+import weakref
+from urllib.parse import urlsplit
+
+from playwright import async_api
+
+from . import config
+from .tasks import spawn
+
+MODES = ("sample", "snapshot")
+
+# Series checked for growth and the least growth worth flagging
+SERIES = {"heap": 1024 * 1024, "nodes": 500, "listeners": 50}
+# ... which must also be this share of the first value
+MIN_RATIO = 0.10
+# Share of consecutive samples that must not fall (GC leaves a little noise)
+RISE_SHARE = 0.8
+MIN_SAMPLES = 4
+MIN_VISITS = 3
+
+_samplers = weakref.WeakKeyDictionary()
+
+
+def _directory():
+    return config.OUTPUT_DIR / "memory"
+
+
+def _metrics(result):
+    values = {metric["name"]: metric["value"] for metric in result["metrics"]}
+    return {
+        "heap": int(values.get("JSHeapUsedSize", 0)),
+        "heap_total": int(values.get("JSHeapTotalSize", 0)),
+        "nodes": int(values.get("Nodes", 0)),
+        "listeners": int(values.get("JSEventListeners", 0)),
+        "documents": int(values.get("Documents", 0)),
+    }
+
+
+class PageSampler:
+    """CDP session and samples for one page."""
+
+    def __init__(self, case_id, index, session, collect_garbage=True):
+        self.case_id = case_id
+        self.index = index
+        self.session = session
+        self.collect_garbage = collect_garbage
+        self.samples = []
+        self.snapshots = []
+        self._lock = asyncio.Lock()
+
+    async def sample(self, page, label):
+        async with self._lock:
+            try:
+                if self.collect_garbage:
+                    await self.session.send("HeapProfiler.collectGarbage")
+                metrics = _metrics(await self.session.send("Performance.getMetrics"))
+            except async_api.Error:
+                return None  # page closed under us
+            row = {
+                "t_ms": round(time.perf_counter() * 1000, 1),
+                "label": label,
+                "path": urlsplit(page.url).path or "/",
+                **metrics,
+            }
+            self.samples.append(row)
+            return row
+
+    async def snapshot(self, label):
+        chunks = []
+
+        def collect(event):
+            chunks.append(event["chunk"])
+
+        self.session.on("HeapProfiler.addHeapSnapshotChunk", collect)
+        try:
+            async with self._lock:
+                await self.session.send("HeapProfiler.takeHeapSnapshot", {"reportProgress": False})
+        finally:
+            self.session.remove_listener("HeapProfiler.addHeapSnapshotChunk", collect)
+        path = _directory() / self.case_id / f"page{self.index}-{len(self.snapshots)}-{label}.heapsnapshot"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("".join(chunks), encoding="utf-8")
+        self.snapshots.append(str(path))
+        return path
+
+
+async def sample_step(page, label):
+    """Sample ``page`` before a step; a no-op unless :class:`MemoryPlugin` is active."""
+    sampler = _samplers.get(page)
+    if sampler is not None:
+        await sampler.sample(page, f"before {label}")
+
+
+async def snapshot(page, label="manual"):
+    """Write a heap snapshot of ``page``; returns its path (``None`` without the plugin)."""
+    sampler = _samplers.get(page)
+    if sampler is None:
+        return None
+    return await sampler.snapshot(label)
+
+
+# ----------------------------------------------------------------- detection
+
+def growth(values, min_growth, min_samples=MIN_SAMPLES):
+    """Total growth of ``values`` if it rises almost monotonically past the floor, else ``None``."""
+    if len(values) < min_samples:
+        return None
+    rises = sum(later >= earlier for earlier, later in zip(values, values[1:]))
+    total = values[-1] - values[0]
+    if rises < RISE_SHARE * (len(values) - 1) or total < min_growth or total < MIN_RATIO * values[0]:
+        return None
+    return total
+
+
+def _visits(samples):
+    # First sample of each run of consecutive samples on the same route
+    visits = {}
+    previous = None
+    for sample in samples:
+        if sample["path"] != previous:
+            visits.setdefault(sample["path"], []).append(sample)
+        previous = sample["path"]
+    return visits
+
+
+def _amount(series, value):
+    return f"{value / 1024 / 1024:.1f} MB" if series == "heap" else f"{value:,}"
+
+
+def flags(samples):
+    """Human-readable growth findings for the samples of one page."""
+    found = []
+    for path, visits in _visits(samples).items():
+        grown = growth([visit["heap"] for visit in visits], SERIES["heap"], MIN_VISITS)
+        if grown:
+            found.append(f"heap grew {_amount('heap', grown)} over {len(visits)} visits to {path}")
+    for series, floor in SERIES.items():
+        grown = growth([sample[series] for sample in samples], floor)
+        if grown:
+            found.append(f"{series} grew {_amount(series, grown)} over {len(samples)} samples")
+    return found
+
+
+# -------------------------------------------------------------------- plugin
+
+class MemoryPlugin:
+    """Runner plugin sampling heap, DOM nodes and listeners per step."""
+
+    def __init__(self, mode="sample", collect_garbage=True):
+        if mode not in MODES:
+            raise ValueError(f"Memory mode must be one of {', '.join(MODES)}")
+        self.mode = mode
+        self.collect_garbage = collect_garbage
+        self._pages = {}
+
+    async def on_context(self, context, api):
+        case_id = getattr(api.case, "id", str(api.case))
+        samplers = self._pages.setdefault(id(api), [])
+
+        async def attach(page):
+            try:
+                session = await context.new_cdp_session(page)
+                await session.send("Performance.enable")
+            except async_api.Error:
+                return
+            sampler = PageSampler(case_id, len(samplers), session, self.collect_garbage)
+            samplers.append(sampler)
+            _samplers[page] = sampler
+
+            async def loaded():
+                await sampler.sample(page, "load")
+                # The first snapshot is of the first loaded document, not about:blank
+                if self.mode == "snapshot" and not sampler.snapshots:
+                    try:
+                        await sampler.snapshot("first")
+                    except async_api.Error:
+                        pass
+
+            page.on("load", lambda _: spawn(loaded()))
+
+        for page in context.pages:
+            await attach(page)
+        context.on("page", lambda page: spawn(attach(page)))
+
+    async def before_close(self, context):
+        for page in context.pages:
+            sampler = _samplers.get(page)
+            if sampler is None:
+                continue
+            await sampler.sample(page, "close")
+            if self.mode == "snapshot":
+                try:
+                    await sampler.snapshot("close")
+                except async_api.Error:
+                    pass
+
+    async def after_case(self, api, result):
+        samplers = self._pages.pop(id(api), None)
+        if samplers is None or result.skipped:
+            return
+        pages = []
+        for sampler in samplers:
+            origin = sampler.samples[0]["t_ms"] if sampler.samples else 0
+            samples = [{**row, "t_ms": round(row["t_ms"] - origin, 1)} for row in sampler.samples]
+            pages.append({"page": sampler.index, "samples": samples, "flags": flags(samples),
+                          "snapshots": sampler.snapshots})
+        result.details["memory"] = pages
+        _export(result.id, pages)
+
+
+def _export(case_id, pages):
+    path = _directory() / f"{case_id}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(pages, indent=2), encoding="utf-8")
+    return path
+
+
+def _range(samples, series):
+    first, last = samples[0][series], samples[-1][series]
+    peak = max(sample[series] for sample in samples)
+    return f"{_amount(series, first)} -> {_amount(series, last)} (peak {_amount(series, peak)})"
+
+
+def format_memory(results):
+    lines = []
+    flagged = []
+    for result in results:
+        for page in result.details.get("memory", []):
+            samples = page["samples"]
+            if not samples:
+                continue
+            lines.append(f"  {result.id} page{page['page']}  {len(samples):>3} samples  "
+                         f"heap {_range(samples, 'heap')}  nodes {_range(samples, 'nodes')}  "
+                         f"listeners {_range(samples, 'listeners')}")
+            flagged += [f"  {result.id} page{page['page']}: {flag}" for flag in page["flags"]]
+    if not lines:
+        return ""
+    output = ["Memory per page (after GC):", *lines]
+    if flagged:
+        output += ["", "Heap growth flagged:", *flagged]
+    return "\n".join(output)
+
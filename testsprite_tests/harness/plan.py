@@ -0,0 +1,229 @@
+"""Plan-driven execution of testsprite_frontend_test_plan.json.
+
+Each plan step may carry a ``do`` list of operations next to its prose
+description. Every operation names one verb whose value is the target::
+
+    {"goto": "/simulasi"}
+    {"click": "text=Input Manual"}
+    {"fill": "#email", "value": "user@example.com"}
+    {"fill": "@simulasi.car_price", "value": "235000000", "shows": "235.000.000"}
+    {"fill": "@chat.message", "value": "Masih tersedia?", "unique": true}
+    {"press": "#search", "key": "Enter"}
+    {"select": "select[name=tenor]", "value": "48"}
+    {"select": "@simulasi.package", "label": "48 bulan"}  # or "index": 1
+    {"expect": "h3", "text": "Toyota Avanza"}      # or "visible": false
+    {"expect_url": "/katalog"}
+
+``shows`` is the value a formatting input displays after the fill.
+A ``unique`` fill posts data (a chat message): every run appends its own
+tag to the value, and to any ``expect`` text equal to it, so the check
+cannot pass on what an earlier run left behind.
+``select`` takes an option value, a ``label`` (the first option whose
+text contains it, for options that carry data such as rates) or an
+``index``.
+
+Targets starting with ``@`` name an entry in the semantic locator index
+(``{"click": "@navigation.katalog"}``, see :mod:`harness.locators`);
+anything else is passed to Playwright as a selector.
+
+Operations are compiled once into :class:`Action` objects (resolve the
+locator, act, verify the effect) and cached, so identical steps shared by
+several plans compile to the same action. Plans run on the shared
+:class:`~harness.pool.BrowserPool` exactly like the generated scripts,
+without a Python file or a browser launch per test.
+"""
+import functools
+import json
+import re
+import uuid
+from urllib.parse import urljoin
+
+from playwright import async_api
+
+from . import config, locators, session, waits
+from .runner import SkipCase
+
+VERBS = ("goto", "click", "fill", "press", "select", "expect", "expect_url")
+
+
+class PlanError(ValueError):
+    pass
+
+
+class Action:
+    """A compiled plan operation: resolve locator -> act -> verify."""
+
+    def __init__(self, verb, target, options):
+        self.verb = verb
+        self.target = target
+        self.options = options
+
+    @property
+    def indexed(self):
+        return self.target.startswith("@")
+
+    async def resolve(self, page, heal=False):
+        if not self.indexed:
+            return page.locator(self.target).first
+        index = locators.default_index()
+        if heal:
+            return await index.heal(page, self.target[1:])
+        return await index.resolve(page, self.target[1:])
+
+    async def __call__(self, page):
+        if self.verb == "goto":
+            await page.goto(urljoin(config.BASE_URL + "/", self.target.lstrip("/")))
+            await waits.settle(page)
+            return
+        if self.verb == "expect_url":
+            await async_api.expect(page).to_have_url(
+                re.compile(re.escape(self.target)), timeout=config.WAIT_TIMEOUT
+            )
+            return
+
+        locator = await self.resolve(page)
+        if self.verb == "expect":
+            await self._verify_expect(locator)
+            return
+
+        try:
+            await waits.before_action(page, locator, label=repr(self))
+        except async_api.TimeoutError:
+            if not self.indexed:
+                raise
+            # The cached locator went stale (re-render, layout change): heal once
+            locator = await self.resolve(page, heal=True)
+            await waits.before_action(page, locator, label=repr(self))
+        if self.verb == "click":
+            await locator.click()
+        elif self.verb == "fill":
+            await locator.fill(str(self.options["value"]))
+            await async_api.expect(locator).to_have_value(str(self.options.get("shows", self.options["value"])))
+        elif self.verb == "press":
+            await locator.press(self.options["key"])
+        elif self.verb == "select":
+            await self._select(locator)
+        await waits.settle(page)
+
+    async def _select(self, locator):
+        if "label" in self.options:
+            option = locator.locator("option", has_text=str(self.options["label"])).first
+            await locator.select_option(await option.get_attribute("value", timeout=config.WAIT_TIMEOUT))
+        elif "index" in self.options:
+            await locator.select_option(index=int(self.options["index"]))
+        else:
+            await locator.select_option(str(self.options["value"]))
+
+    async def _verify_expect(self, locator):
+        check = async_api.expect(locator)
+        if "text" in self.options:
+            await check.to_contain_text(str(self.options["text"]), timeout=config.WAIT_TIMEOUT)
+        elif self.options.get("visible", True):
+            await check.to_be_visible(timeout=config.WAIT_TIMEOUT)
+        else:
+            await check.to_be_hidden(timeout=config.WAIT_TIMEOUT)
+
+    def tagged(self, values, tag):
+        """This action with a value or expected text in ``values`` suffixed by ``tag``."""
+        key = {"fill": "value", "expect": "text"}.get(self.verb)
+        if key is None or str(self.options.get(key)) not in values:
+            return self
+        return Action(self.verb, self.target, {**self.options, key: f"{self.options[key]} {tag}"})
+
+    def __repr__(self):
+        return f"Action({self.verb} {self.target!r})"
+
+
+@functools.lru_cache(maxsize=None)
+def _compile(key):
+    op = json.loads(key)
+    verbs = [verb for verb in VERBS if verb in op]
+    if len(verbs) != 1:
+        raise PlanError(f"Operation must name exactly one of {', '.join(VERBS)}: {op}")
+    verb = verbs[0]
+    options = {k: v for k, v in op.items() if k != verb}
+    if verb == "fill" and "value" not in options:
+        raise PlanError(f"'fill' needs a value: {op}")
+    if verb == "select" and not any(key in options for key in ("value", "label", "index")):
+        raise PlanError(f"'select' needs a value, label or index: {op}")
+    if verb == "press" and "key" not in options:
+        raise PlanError(f"'press' needs a key: {op}")
+    return Action(verb, op[verb], options)
+
+
+def compile_op(op):
+    """Compile one operation dict into a cached :class:`Action`."""
+    return _compile(json.dumps(op, sort_keys=True, ensure_ascii=False))
+
+
+class PlanCase:
+    """A test plan entry compiled into executable steps."""
+
+    def __init__(self, entry):
+        self.id = entry["id"]
+        self.title = entry["title"]
+        self.role = entry.get("role")
+        self.steps = [
+            (step, [compile_op(op) for op in step.get("do", [])])
+            for step in entry["steps"]
+        ]
+
+    @property
+    def name(self):
+        return f"{self.id}_{self.title.replace(' ', '_')}"
+
+    @property
+    def unbound(self):
+        """Steps that only have a prose description."""
+        return [step for step, actions in self.steps if not actions]
+
+    @property
+    def unique_values(self):
+        """Values of the ``unique`` fills, i.e. the data this plan posts."""
+        return {str(action.options["value"]) for _, actions in self.steps for action in actions
+                if action.verb == "fill" and action.options.get("unique")}
+
+    def steps_for(self, tag):
+        """:attr:`steps` with the ``unique`` values (and their expects) tagged ``tag``."""
+        values = self.unique_values
+        if not values:
+            return self.steps
+        return [(step, [action.tagged(values, tag) for action in actions]) for step, actions in self.steps]
+
+    async def execute(self, api):
+        if self.unbound:
+            raise SkipCase(f"{len(self.unbound)} step(s) have no 'do' operations, "
+                           f"first: {self.unbound[0]['description']}")
+
+        options = {}
+        if self.role:
+            options["storage_state"] = await session.case_storage_state(api.browser, self.role)
+        context = await api.browser.new_context(**options)
+        context.set_default_timeout(config.DEFAULT_TIMEOUT)
+        page = await context.new_page()
+        await page.goto(config.BASE_URL, wait_until="commit")
+
+        for number, (step, actions) in enumerate(self.steps_for(f"#{uuid.uuid4().hex[:6]}"), 1):
+            for action in actions:
+                try:
+                    # Follow the newest tab, as the generated scripts do
+                    await action(context.pages[-1])
+                except AssertionError as exc:
+                    raise AssertionError(f"step {number} ({step['description']}) {action}: {exc}") from None
+
+    def __repr__(self):
+        return f"PlanCase({self.id})"
+
+
+def load_plans(selectors=None, path=None):
+    """Compile the plan file into :class:`PlanCase` objects ordered by id."""
+    path = path or config.PLAN_PATH
+    entries = json.loads(path.read_text(encoding="utf-8"))
+    plans = {entry["id"]: PlanCase(entry) for entry in entries}
+    if not selectors:
+        return [plans[key] for key in sorted(plans)]
+
+    missing = [s for s in selectors if s.upper() not in plans]
+    if missing:
+        raise ValueError(f"Unknown plan id(s): {', '.join(missing)}")
+    return [plans[key] for key in sorted({s.upper() for s in selectors})]
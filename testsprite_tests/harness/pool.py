@@ -0,0 +1,182 @@
+"""Shared Chromium pool for running TC scripts concurrently.
+
+The generated scripts each start Playwright and launch their own browser.
+Inside the runner we keep that code untouched and instead swap the
+module's ``async_api`` for a :class:`SharedApi` lease: ``launch()`` hands
+back the pooled browser, ``new_context()`` creates a real isolated
+context on it, and ``close()``/``stop()`` only release the lease.
+
+Closing a context the pool created, from the script or on release, first
+awaits the pool's close hooks so plugins can flush what the pages still
+hold (coverage, a last memory sample, pending render batches).
+"""
+from playwright import async_api
+
+from . import config
+
+
+class BrowserPool:
+    """A small set of long-lived Chromium instances shared by all cases."""
+
+    def __init__(self, size=None, headless=None, launch_args=None, context_options=None):
+        self.size = max(1, size or config.BROWSERS)
+        self.headless = config.HEADLESS if headless is None else headless
+        self.launch_args = list(launch_args or config.LAUNCH_ARGS)
+        self.context_options = dict(context_options or {})
+        # Called as hook(lease) -> dict of extra new_context() options
+        self.option_hooks = []
+        # Awaited as hook(context, lease) for every context a case creates
+        self.context_hooks = []
+        # Awaited as hook(context) before such a context closes
+        self.close_hooks = []
+        self._playwright = None
+        self._browsers = []
+        self._load = []
+
+    async def start(self):
+        self._playwright = await async_api.async_playwright().start()
+        for _ in range(self.size):
+            browser = await self._playwright.chromium.launch(
+                headless=self.headless, args=self.launch_args
+            )
+            self._browsers.append(browser)
+            self._load.append(0)
+        return self
+
+    async def stop(self):
+        for browser in self._browsers:
+            try:
+                await browser.close()
+            except async_api.Error:
+                pass
+        self._browsers.clear()
+        self._load.clear()
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def lease(self, case):
+        """Bind ``case`` to the least busy browser and return its API shim."""
+        if not self._browsers:
+            raise RuntimeError("BrowserPool.start() must be awaited before leasing")
+        index = min(range(len(self._browsers)), key=self._load.__getitem__)
+        self._load[index] += 1
+        return SharedApi(self, index, case)
+
+    def _release(self, index):
+        self._load[index] -= 1
+
+
+class SharedApi:
+    """Stand-in for ``playwright.async_api`` inside one loaded TC module."""
+
+    def __init__(self, pool, index, case):
+        self.pool = pool
+        self.case = case
+        self.browser = _SharedBrowser(self, pool._browsers[index])
+        self._index = index
+        self._released = False
+
+    def __getattr__(self, name):
+        # Error, TimeoutError, expect, ... resolve to the real module
+        return getattr(async_api, name)
+
+    def async_playwright(self):
+        return _SharedPlaywrightStarter(self)
+
+    async def release(self):
+        """Close anything the script left open and free the browser slot."""
+        if self._released:
+            return
+        self._released = True
+        await self.browser.close_contexts()
+        self.pool._release(self._index)
+
+
+class _SharedPlaywrightStarter:
+    def __init__(self, api):
+        self._api = api
+
+    async def start(self):
+        return _SharedPlaywright(self._api)
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+class _SharedPlaywright:
+    def __init__(self, api):
+        self.chromium = _SharedBrowserType(api)
+
+    async def stop(self):
+        pass
+
+
+class _SharedBrowserType:
+    def __init__(self, api):
+        self._api = api
+
+    async def launch(self, **kwargs):
+        # Script launch arguments are ignored: the pool owns the browser
+        return self._api.browser
+
+
+class _SharedBrowser:
+    def __init__(self, api, browser):
+        self._api = api
+        self._browser = browser
+        self.contexts = []
+
+    def __getattr__(self, name):
+        return getattr(self._browser, name)
+
+    async def new_context(self, **kwargs):
+        options = dict(self._api.pool.context_options)
+        for hook in self._api.pool.option_hooks:
+            options.update(hook(self._api))
+        options.update(kwargs)
+        context = await self._browser.new_context(**options)
+        self.contexts.append(context)
+        self._hook_close(context)
+        for hook in self._api.pool.context_hooks:
+            await hook(context, self._api)
+        return context
+
+    def _hook_close(self, context):
+        close = context.close
+        hooks = self._api.pool.close_hooks
+        closed = False
+
+        async def close_after_hooks(**kwargs):
+            nonlocal closed
+            if not closed:
+                closed = True
+                for hook in hooks:
+                    await hook(context)
+            await close(**kwargs)
+
+        context.close = close_after_hooks
+
+    async def new_page(self, **kwargs):
+        context = await self.new_context(**kwargs)
+        return await context.new_page()
+
+    async def close_contexts(self):
+        for context in self.contexts:
+            try:
+                await context.close()
+            except async_api.Error:
+                pass
+        self.contexts.clear()
+
+    async def close(self):
+        await self.close_contexts()
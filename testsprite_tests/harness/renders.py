@@ -0,0 +1,261 @@
+"""React commit and re-render profiling per test step.
+
+:class:`RenderPlugin` installs a ``__REACT_DEVTOOLS_GLOBAL_HOOK__`` with
+an init script, before the app's bundle runs, so React registers its
+renderer with it the way it would with the DevTools extension. On every
+commit the hook walks the part of the fiber tree React worked on and
+records which components rendered (mounted, or performed work again)
+and how long each took on its own (``selfBaseDuration``). The per-component times are only measured by
+development and profiling builds of React, such as the dev server the
+suite runs against; a production build still gives commit and render
+counts. Commits are sent to Python in small batches.
+
+Each commit is attributed to the step that was running: the action span
+of the case timeline (see :mod:`harness.timing`) that started last
+before it, or ``load`` before the first action. A step that fills one
+filter input and re-renders the whole NextUI table therefore shows up as
+one step with many component re-renders. The components with the most
+re-render time (mounts are paid once and left out) are listed per case
+in the run output and the Markdown report, and every commit is written
+to ``.harness/renders/<TC>.json``. Nothing is failed.
+"""
+import json
+import time
+from collections import defaultdict
+
+from playwright import async_api
+
+from . import config
+
+# Components listed per case and per step
+TOP = 5
+
+# Wait this long for more commits before sending a batch to Python
+FLUSH_MS = 100
+
+INIT_SCRIPT = """
+(() => {
+  if (window.__harnessRenders) return;
+  // Component fiber tags: function, class, forwardRef, simple memo. A
+  // memo() around a non-simple component renders in its child fiber.
+  const COMPONENTS = new Set([0, 1, 11, 15]);
+  const PERFORMED_WORK = 1;
+  const pending = [];
+  let timer = null;
+
+  const flush = () => {
+    timer = null;
+    if (!pending.length) return;
+    try { window.__harnessReportRenders(pending.splice(0)); } catch (e) {}
+  };
+  const nameOf = (type) => {
+    if (!type || typeof type === 'string') return null;
+    return type.displayName || type.name
+      || (type.render && (type.render.displayName || type.render.name))
+      || (type.type && nameOf(type.type)) || 'Anonymous';
+  };
+  const rendered = (fiber) => {
+    if (!fiber.alternate) return true;
+    return ((fiber.flags !== undefined ? fiber.flags : fiber.effectTag) & PERFORMED_WORK) !== 0;
+  };
+
+  const record = (root) => {
+    const components = {};
+    const stack = [root.current];
+    while (stack.length) {
+      const fiber = stack.pop();
+      if (COMPONENTS.has(fiber.tag) && rendered(fiber)) {
+        const name = nameOf(fiber.elementType || fiber.type);
+        const entry = components[name] || (components[name] = [0, 0, 0, 0]);
+        const ms = fiber.selfBaseDuration || 0;
+        entry[0] += 1;
+        entry[1] += ms;
+        if (fiber.alternate) {
+          entry[2] += 1;
+          entry[3] += ms;
+        }
+      }
+      // A fiber that bailed out keeps its old children (and their old
+      // flags): nothing below it rendered in this commit
+      const previous = fiber.alternate;
+      if (previous && fiber.child === previous.child) continue;
+      for (let child = fiber.child; child; child = child.sibling) stack.push(child);
+    }
+    const duration = root.current.actualDuration;
+    pending.push({
+      t: performance.timeOrigin + performance.now(),
+      path: location.pathname,
+      duration: typeof duration === 'number' ? duration : null,
+      components,
+    });
+    if (timer === null) timer = setTimeout(flush, %(flush)d);
+  };
+
+  let hook = window.__REACT_DEVTOOLS_GLOBAL_HOOK__;
+  if (!hook) {
+    const renderers = new Map();
+    hook = window.__REACT_DEVTOOLS_GLOBAL_HOOK__ = {
+      renderers,
+      supportsFiber: true,
+      inject(renderer) {
+        const id = renderers.size + 1;
+        renderers.set(id, renderer);
+        return id;
+      },
+      onCommitFiberRoot() {},
+      onCommitFiberUnmount() {},
+      onPostCommitFiberRoot() {},
+      checkDCE() {},
+    };
+  }
+  // Chain an existing hook (the DevTools extension in a headed run)
+  const original = hook.onCommitFiberRoot;
+  hook.onCommitFiberRoot = function (id, root, ...rest) {
+    try { record(root); } catch (e) {}
+    return original.call(this, id, root, ...rest);
+  };
+  window.__harnessRenders = { flush };
+  window.addEventListener('pagehide', flush);
+})();
+""" % {"flush": FLUSH_MS}
+
+
+class Collector:
+    """Commits reported by the pages of one case."""
+
+    def __init__(self):
+        self.commits = []
+
+    def _report(self, source, batch):
+        self.commits.extend(batch)
+
+    async def install(self, context):
+        await context.expose_binding("__harnessReportRenders", self._report)
+        await context.add_init_script(INIT_SCRIPT)
+
+
+async def _flush(context):
+    """Send the batches still waiting for their timer."""
+    for page in context.pages:
+        try:
+            await page.evaluate("() => window.__harnessRenders && window.__harnessRenders.flush()")
+        except async_api.Error:
+            pass
+
+
+def _step_starts(timeline):
+    """``[(epoch_ms, label)]`` of the action spans of ``timeline``."""
+    if timeline is None:
+        return []
+    # Timeline spans use perf_counter; commits carry wall-clock times
+    offset_ms = time.time() * 1000 - time.perf_counter_ns() / 1e6
+    return [
+        (span.start / 1e6 + offset_ms, span.name)
+        for span in timeline.spans
+        if span.category == "action"
+    ]
+
+
+def _bucket():
+    return {"renders": 0, "ms": 0.0, "updates": 0, "update_ms": 0.0}
+
+
+def _top(components, limit=TOP):
+    # Mounting is paid once; offenders are the components that keep re-rendering
+    ordered = sorted(
+        (item for item in components.items() if item[1]["updates"]),
+        key=lambda item: (-item[1]["update_ms"], -item[1]["updates"], item[0]),
+    )
+    return [{"component": name, **{key: round(value, 2) for key, value in row.items()}}
+            for name, row in ordered[:limit]]
+
+
+def summarize(commits, starts):
+    """Commits, render time and heaviest components per step and for the case."""
+    steps = [{"step": label, "commits": 0, "ms": 0.0, "components": defaultdict(_bucket)}
+             for label in ["load", *(label for _, label in starts)]]
+    total = defaultdict(_bucket)
+    timed = False
+    for commit in sorted(commits, key=lambda commit: commit["t"]):
+        position = sum(1 for started, _ in starts if started <= commit["t"])
+        step = steps[position]
+        step["commits"] += 1
+        if commit["duration"] is not None:
+            timed = True
+            step["ms"] += commit["duration"]
+        for name, (renders, ms, updates, update_ms) in commit["components"].items():
+            for bucket in (step["components"][name], total[name]):
+                bucket["renders"] += renders
+                bucket["ms"] += ms
+                bucket["updates"] += updates
+                bucket["update_ms"] += update_ms
+    return {
+        "commits": len(commits),
+        "timed": timed,
+        "top": _top(total),
+        "steps": [
+            {"step": step["step"], "commits": step["commits"], "ms": round(step["ms"], 2),
+             "renders": sum(row["renders"] for row in step["components"].values()),
+             "updates": sum(row["updates"] for row in step["components"].values()),
+             "top": _top(step["components"])}
+            for step in steps
+            if step["commits"]
+        ],
+    }
+
+
+class RenderPlugin:
+    """Runner plugin counting React commits and component renders per step."""
+
+    def __init__(self):
+        self._collectors = {}
+
+    async def on_context(self, context, api):
+        collector = self._collectors.setdefault(id(api), Collector())
+        await collector.install(context)
+
+    async def before_close(self, context):
+        await _flush(context)
+
+    async def after_case(self, api, result):
+        collector = self._collectors.pop(id(api), None)
+        if collector is None or result.skipped:
+            return
+        summary = summarize(collector.commits, _step_starts(result.timeline))
+        result.details["renders"] = summary
+        _export(result.id, {**summary, "commit_log": collector.commits})
+
+
+def _export(case_id, data):
+    directory = config.OUTPUT_DIR / "renders"
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{case_id}.json"
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    return path
+
+
+def busiest_step(summary):
+    """The step with the most re-renders (then render time)."""
+    return max(summary["steps"], key=lambda step: (step["updates"], step["ms"]))
+
+
+def offender(row, timed):
+    return f"{row['component']} x{row['updates']}" + (f" {row['update_ms']:.1f}ms" if timed else "")
+
+
+def format_renders(results):
+    lines = []
+    for result in results:
+        summary = result.details.get("renders")
+        if not summary or not summary["commits"]:
+            continue
+        timed = summary["timed"]
+        busiest = busiest_step(summary)
+        lines.append(f"  {result.id}  {summary['commits']:>4} commits  busiest step: {busiest['step']} "
+                     f"({busiest['commits']} commits, {busiest['updates']} re-renders"
+                     + (f", {busiest['ms']:.1f}ms)" if timed else ")"))
+        if summary["top"]:
+            lines.append("         top: " + ", ".join(offender(row, timed) for row in summary["top"]))
+    if not lines:
+        return ""
+    return "\n".join(["React commits per case (component x re-renders, self time):", *lines])
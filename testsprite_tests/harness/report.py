@@ -0,0 +1,141 @@
+"""Markdown run report in the layout of ``testsprite-mcp-test-report.md``.
+
+The TestSprite report is written in Indonesian and grouped into an
+executive summary, passed tests and failed tests; harness runs (sharded
+or not) render the same sections from their :class:`CaseResult` list so
+both reports can be read side by side.
+"""
+import datetime
+
+from . import config, renders
+
+_MONTHS = (
+    "Januari", "Februari", "Maret", "April", "Mei", "Juni",
+    "Juli", "Agustus", "September", "Oktober", "November", "Desember",
+)
+
+
+def _date(day):
+    return f"{day.day} {_MONTHS[day.month - 1]} {day.year}"
+
+
+def _percent(part, total):
+    return f"{100 * part / total:.2f}%" if total else "0.00%"
+
+
+def _title(result):
+    prefix = f"{result.id}_"
+    name = result.name[len(prefix):] if result.name.startswith(prefix) else result.name
+    return name.replace("_", " ")
+
+
+def _first_line(text):
+    return text.strip().splitlines()[0] if text.strip() else ""
+
+
+def _cell(text):
+    return text.replace("|", "\\|")
+
+
+def render(results, elapsed, shards=None, project="Mobilindo Showroom", day=None):
+    day = day or datetime.date.today()
+    total = len(results)
+    passed = [r for r in results if r.passed and not r.skipped]
+    failed = [r for r in results if not r.passed and not r.skipped]
+    skipped = [r for r in results if r.skipped]
+
+    lines = [
+        f"# Laporan Pengujian TestSprite - {project}",
+        "",
+        "## 📋 Ringkasan Eksekutif",
+        "",
+        f"**Proyek:** {project}  ",
+        f"**Tanggal Pengujian:** {_date(day)}  ",
+        f"**Total Tes:** {total}  ",
+        f"**Tes Berhasil:** {len(passed)} ({_percent(len(passed), total)})  ",
+        f"**Tes Gagal:** {len(failed)} ({_percent(len(failed), total)})  ",
+    ]
+    if skipped:
+        lines.append(f"**Tes Dilewati:** {len(skipped)} ({_percent(len(skipped), total)})  ")
+    lines += [
+        f"**Durasi Eksekusi:** {elapsed:.1f} detik  ",
+        "",
+        "## 🎯 Hasil Pengujian",
+        "",
+        f"### ✅ Tes yang Berhasil ({len(passed)}/{total})",
+        "",
+    ]
+    for number, result in enumerate(passed, 1):
+        lines += [
+            f"{number}. **{result.id} - {_title(result)}**",
+            "   - Status: ✅ Berhasil",
+            f"   - Durasi: {result.duration:.1f} detik",
+            "",
+        ]
+
+    lines += [f"### ❌ Tes yang Gagal ({len(failed)}/{total})", ""]
+    for result in failed:
+        lines += [
+            f"**{result.id}** - {_title(result)}",
+            f"- **Masalah:** {_first_line(result.error) or 'Tidak ada pesan error'}",
+            f"- **Durasi:** {result.duration:.1f} detik",
+            "",
+        ]
+
+    if skipped:
+        lines += [f"### ⏭️ Tes yang Dilewati ({len(skipped)}/{total})", ""]
+        for result in skipped:
+            lines += [
+                f"**{result.id}** - {_title(result)}",
+                f"- **Alasan:** {_first_line(result.error)}",
+                "",
+            ]
+
+    if shards:
+        lines += [
+            "## ⚙️ Eksekusi per Shard",
+            "",
+            "| Shard | Tes | Estimasi (detik) | Durasi (detik) |",
+            "|-------|-----|------------------|----------------|",
+        ]
+        lines += [
+            f"| {shard['shard']} | {', '.join(shard['cases'])} | "
+            f"{shard['estimated_s']:.1f} | {shard['duration_s']:.1f} |"
+            for shard in shards
+        ]
+        lines.append("")
+
+    profiled = [r for r in results if r.details.get("renders", {}).get("commits")]
+    if profiled:
+        lines += [
+            "## ⚛️ Render React per Tes",
+            "",
+            "| Tes | Commit | Langkah Tersibuk | Komponen Re-render Teratas |",
+            "|-----|--------|------------------|----------------------------|",
+        ]
+        for result in profiled:
+            summary = result.details["renders"]
+            busiest = renders.busiest_step(summary)
+            top = ", ".join(renders.offender(row, summary["timed"]) for row in summary["top"]) or "-"
+            lines.append(f"| {result.id} | {summary['commits']} | {_cell(busiest['step'])} "
+                         f"({busiest['updates']} re-render) | {_cell(top)} |")
+        lines.append("")
+
+    lines += [
+        "## 📈 Kesimpulan",
+        "",
+        f"**Tingkat Kesiapan:** {_percent(len(passed), total)} "
+        f"({len(passed)} dari {total} tes berhasil)  ",
+        "",
+        "---",
+        f"*Laporan ini dihasilkan oleh harness testsprite_tests pada {_date(day)}*",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def write(results, elapsed, shards=None, path=None):
+    path = path or config.OUTPUT_DIR / "testsprite-mcp-test-report.md"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(render(results, elapsed, shards), encoding="utf-8")
+    return path
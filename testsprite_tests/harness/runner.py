@@ -0,0 +1,176 @@
+"""Concurrent suite runner for the generated TC scripts.
+
+One :class:`BrowserPool` is started for the whole run and every
+``run_test`` gets its own browser context on it, so the suite pays for a
+handful of browser cold starts instead of one per script. ``workers``
+bounds how many cases are in flight at the same time.
+"""
+import asyncio
+import contextvars
+import time
+import traceback
+from dataclasses import dataclass, field
+
+from . import config, timing
+from .loader import discover
+from .pool import BrowserPool
+
+
+_details = contextvars.ContextVar("details", default=None)
+
+
+class SkipCase(Exception):
+    """Raised by a case that cannot be executed in this run."""
+
+
+def annotate(key, value):
+    """Attach ``value`` to the details of the case running in this task.
+
+    Outside the runner (a script started on its own) this does nothing.
+    """
+    details = _details.get()
+    if details is not None:
+        details[key] = value
+
+
+@dataclass
+class CaseResult:
+    id: str
+    name: str
+    passed: bool
+    duration: float
+    error: str = ""
+    skipped: bool = False
+    details: dict = field(default_factory=dict)
+    timeline: object = None
+
+    @property
+    def status(self):
+        if self.skipped:
+            return "SKIP"
+        return "PASS" if self.passed else "FAIL"
+
+    @property
+    def ok(self):
+        return self.passed or self.skipped
+
+
+async def run_case(pool, case, timeout=None, trace=True, plugins=()):
+    """Run one case against ``pool`` and return its :class:`CaseResult`.
+
+    ``case`` is anything with ``id``, ``name`` and an ``execute(api)``
+    coroutine: a generated script (:class:`~harness.loader.TestCase`) or
+    a compiled plan (:class:`~harness.plan.PlanCase`). Each plugin's
+    ``after_case(api, result)`` may annotate or fail the result; one that
+    raises fails the result with its error.
+    """
+    timeout = timeout or config.CASE_TIMEOUT
+    started = time.perf_counter()
+    timeline = timing.Timeline(case.id)
+    token = timing.bind(timeline)
+    details = {}
+    details_token = _details.set(details)
+    api = pool.lease(case)
+    error = ""
+    skipped = False
+    try:
+        await asyncio.wait_for(case.execute(api), timeout)
+    except SkipCase as exc:
+        skipped = True
+        error = str(exc)
+    except asyncio.TimeoutError:
+        error = f"Timed out after {timeout:.0f}s"
+    except AssertionError as exc:
+        error = f"AssertionError: {exc}" if str(exc) else "AssertionError"
+    except Exception as exc:
+        error = "".join(traceback.format_exception_only(type(exc), exc)).strip()
+    finally:
+        await api.release()
+        timeline.finish()
+        timing.unbind(token)
+        _details.reset(details_token)
+    result = CaseResult(
+        id=case.id,
+        name=case.name,
+        passed=not error,
+        duration=time.perf_counter() - started,
+        error=error,
+        skipped=skipped,
+        details=details,
+        timeline=timeline,
+    )
+    for plugin in plugins:
+        if not hasattr(plugin, "after_case"):
+            continue
+        try:
+            await plugin.after_case(api, result)
+        except Exception as exc:
+            # A broken plugin fails this case, not the whole gather in run_suite
+            message = f"{type(plugin).__name__}.after_case: " + "".join(
+                traceback.format_exception_only(type(exc), exc)).strip()
+            result.error = f"{result.error}\n{message}" if result.error else message
+            result.passed = False
+    if trace and not skipped:
+        result.details["trace"] = str(timeline.export())
+    return result
+
+
+async def run_suite(cases=None, workers=None, browsers=None, timeout=None,
+                    context_options=None, on_result=None, trace=True, plugins=()):
+    """Run ``cases`` (default: every TC script) concurrently.
+
+    ``on_result`` is called with each :class:`CaseResult` as soon as the
+    case finishes, which lets the CLI stream progress. With ``trace`` each
+    case's timeline is exported under ``.harness/traces``.
+
+    ``plugins`` extend a run without touching the cases. Each may define
+    ``context_options(api)`` returning extra ``new_context()`` options,
+    an ``on_context(context, api)`` coroutine awaited for every browser
+    context a case creates, ``before_close(context)`` awaited before such
+    a context closes, and ``after_case(api, result)`` awaited once the
+    case has finished.
+    """
+    cases = discover() if cases is None else cases
+    workers = max(1, workers or config.WORKERS)
+    semaphore = asyncio.Semaphore(workers)
+
+    async with BrowserPool(size=browsers, context_options=context_options) as pool:
+        pool.context_hooks.append(timing.instrument_context)
+        for plugin in plugins:
+            if hasattr(plugin, "context_options"):
+                pool.option_hooks.append(plugin.context_options)
+            if hasattr(plugin, "on_context"):
+                pool.context_hooks.append(plugin.on_context)
+            if hasattr(plugin, "before_close"):
+                pool.close_hooks.append(plugin.before_close)
+
+        async def guarded(case):
+            async with semaphore:
+                result = await run_case(pool, case, timeout, trace, plugins)
+            if on_result:
+                on_result(result)
+            return result
+
+        results = await asyncio.gather(*(guarded(case) for case in cases))
+    results = sorted(results, key=lambda r: r.id)
+    if trace:
+        timing.write_summary([r.timeline for r in results if not r.skipped])
+    return results
+
+
+def format_summary(results, elapsed):
+    passed = sum(r.passed for r in results)
+    skipped = sum(r.skipped for r in results)
+    lines = [
+        f"{r.id}  {r.status}  {r.duration:6.1f}s  {r.name}"
+        + (f"\n        {r.error.splitlines()[0]}" if r.error else "")
+        for r in results
+    ]
+    lines.append("")
+    lines.append(
+        f"{passed}/{len(results)} passed"
+        + (f", {skipped} skipped" if skipped else "")
+        + f" in {elapsed:.1f}s "
+        f"(sum of case time {sum(r.duration for r in results):.1f}s)"
+    )
+    return "\n".join(lines)
@@ -0,0 +1,479 @@
+"""Bulk synthetic data for the marketplace schema.
+
+Generates referentially consistent rows for the eight tables of
+``backend/migrations/001-initial-setup.sql`` at a scale given in cars
+(10k to several million). The other tables follow from that count with
+the ratios in :class:`Scale`. Rows are written as one pg_dump-style
+script, with ``COPY ... FROM stdin`` blocks in text format, and streamed
+straight into ``psql``. Nothing is inserted row by row, and no Python
+database driver is needed. The same script can be written to a file
+(``--out``, gzipped for ``.gz``) and restored later with ``psql -f``.
+
+Data is deterministic for a given seed and anchor date. Ids are derived
+from the table and row number, so foreign keys never need a lookup.
+Sellers are skewed towards a few large dealers. Only sold cars get a
+completed transaction, reviews belong to completed transactions, and
+wishlist pairs are unique. With ``--defer-indexes`` the secondary indexes
+of the migration are dropped before the load and rebuilt afterwards.
+Every table is ``ANALYZE``d at the end so the planner sees the new
+volume. :data:`QUERIES` then times the catalog filter, dashboard
+aggregates and sales report queries with ``EXPLAIN ANALYZE``.
+"""
+import bisect
+import datetime
+import gzip
+import itertools
+import json
+import random
+import re
+import shutil
+import subprocess
+import time
+from dataclasses import dataclass
+
+from . import config
+
+# Same bcrypt hash as the migration's admin user: every seeded user shares its password
+PASSWORD_HASH = "$2a$10$92IXUNpkjO0rOQ5byMi.Ye4oKoEa3Ro9llC/.og/at2.uheWG/igi"
+
+# Load order (parents first) and the columns written for each table
+TABLES = {
+    "Users": ("id", "username", "email", "password", "role", "fullName", "phoneNumber", "address",
+              "isVerified", "isActive", "lastLogin", "createdAt", "updatedAt"),
+    "Cars": ("id", "sellerId", "brand", "model", "year", "price", "mileage", "fuelType", "transmission",
+             "bodyType", "color", "engineCapacity", "description", "condition", "location", "status",
+             "isNegotiable", "viewCount", "createdAt", "updatedAt"),
+    "CarImages": ("id", "carId", "imageUrl", "isPrimary", "caption"),
+    "Transactions": ("id", "buyerId", "sellerId", "carId", "amount", "status", "paymentMethod",
+                     "paymentStatus", "transactionDate", "notes", "createdAt", "updatedAt"),
+    "Wishlists": ("id", "userId", "carId", "createdAt", "updatedAt"),
+    "TestDrives": ("id", "userId", "carId", "scheduledDate", "status", "notes", "feedback", "rating",
+                   "createdAt", "updatedAt"),
+    "Reviews": ("id", "userId", "carId", "transactionId", "rating", "comment", "isVerified",
+                "createdAt", "updatedAt"),
+    "Chats": ("id", "senderId", "receiverId", "carId", "message", "messageType", "attachmentUrl",
+              "isRead", "readAt", "createdAt", "updatedAt"),
+}
+
+# Models sold in Indonesia: brand -> [(model, body type, new price in rupiah, engine cc, fuel)]
+CATALOG = {
+    "Toyota": [("Avanza", "MPV", 260e6, 1500, "gasoline"), ("Innova", "MPV", 420e6, 2400, "diesel"),
+               ("Fortuner", "SUV", 560e6, 2400, "diesel"), ("Rush", "SUV", 290e6, 1500, "gasoline"),
+               ("Yaris", "Hatchback", 300e6, 1500, "gasoline"), ("Calya", "MPV", 170e6, 1200, "gasoline"),
+               ("Camry", "Sedan", 700e6, 2500, "hybrid")],
+    "Honda": [("Brio", "Hatchback", 180e6, 1200, "gasoline"), ("Jazz", "Hatchback", 270e6, 1500, "gasoline"),
+              ("HR-V", "SUV", 400e6, 1500, "gasoline"), ("CR-V", "SUV", 600e6, 1500, "gasoline"),
+              ("Civic", "Sedan", 550e6, 1500, "gasoline"), ("Mobilio", "MPV", 250e6, 1500, "gasoline")],
+    "Daihatsu": [("Xenia", "MPV", 240e6, 1300, "gasoline"), ("Terios", "SUV", 280e6, 1500, "gasoline"),
+                 ("Ayla", "Hatchback", 150e6, 1000, "gasoline"), ("Sigra", "MPV", 160e6, 1200, "gasoline")],
+    "Mitsubishi": [("Xpander", "MPV", 290e6, 1500, "gasoline"),
+                   ("Pajero Sport", "SUV", 580e6, 2400, "diesel")],
+    "Suzuki": [("Ertiga", "MPV", 250e6, 1500, "hybrid"), ("XL7", "SUV", 280e6, 1500, "gasoline")],
+    "Nissan": [("Livina", "MPV", 270e6, 1500, "gasoline")],
+    "Hyundai": [("Creta", "SUV", 350e6, 1500, "gasoline"), ("Ioniq 5", "SUV", 800e6, None, "electric")],
+    "Wuling": [("Almaz", "SUV", 350e6, 1500, "gasoline"), ("Air ev", "Hatchback", 250e6, None, "electric")],
+}
+BRAND_WEIGHTS = {"Toyota": 30, "Honda": 20, "Daihatsu": 15, "Mitsubishi": 10, "Suzuki": 10,
+                 "Nissan": 4, "Hyundai": 6, "Wuling": 5}
+
+CITIES = ("Jakarta Selatan", "Jakarta Barat", "Jakarta Timur", "Tangerang", "Bekasi", "Depok", "Bogor",
+          "Bandung", "Surabaya", "Semarang", "Yogyakarta", "Solo", "Malang", "Medan", "Palembang",
+          "Makassar", "Denpasar", "Balikpapan")
+CITY_WEIGHTS = (12, 9, 8, 8, 8, 5, 5, 9, 10, 5, 4, 3, 3, 5, 3, 3, 3, 2)
+COLORS = ("Putih", "Hitam", "Silver", "Abu-abu", "Merah", "Biru", "Coklat")
+FIRST_NAMES = ("Budi", "Siti", "Agus", "Dewi", "Andi", "Rina", "Eko", "Sri", "Joko", "Ayu", "Rudi",
+               "Putri", "Hendra", "Wati", "Fajar", "Intan", "Dimas", "Nur", "Yoga", "Lestari")
+LAST_NAMES = ("Santoso", "Wijaya", "Saputra", "Pratama", "Hidayat", "Kusuma", "Setiawan", "Nugroho",
+              "Siregar", "Halim", "Gunawan", "Susanto", "Rahman", "Lubis", "Wibowo")
+PAYMENT_METHODS = ("transfer_bank", "kredit", "tunai", "virtual_account")
+CHAT_LINES = (
+    ("Halo, mobilnya masih ada?", "Masih ada kak, silakan kalau mau lihat unitnya."),
+    ("Harganya masih bisa nego?", "Bisa kak, untuk pembeli serius kami kasih harga terbaik."),
+    ("Surat-suratnya lengkap?", "Lengkap kak, BPKB dan STNK atas nama sendiri."),
+    ("Bisa test drive hari Sabtu?", "Bisa kak, showroom buka jam 9 sampai jam 5."),
+    ("Ada servis record resmi?", "Ada kak, servis rutin di bengkel resmi."),
+    ("Bisa kredit DP 20%?", "Bisa kak, nanti kami bantu ajukan ke leasing."),
+)
+REVIEW_COMMENTS = ("Mobil sesuai deskripsi, penjual ramah.", "Proses cepat dan dokumen lengkap.",
+                   "Kondisi mobil bagus, harga wajar.", "Pelayanan baik, pengiriman tepat waktu.",
+                   "Ada sedikit lecet yang tidak disebutkan.", "Respon penjual agak lambat.")
+
+# Listing status mix
+STATUSES = ("available", "sold", "pending", "inactive")
+STATUS_WEIGHTS = (70, 12, 10, 8)
+
+
+def _weighted(items, weights):
+    # rng.choices() rebuilds its cumulative weights on every call
+    cumulative = list(itertools.accumulate(weights))
+    total = cumulative[-1]
+    return lambda rng: items[bisect.bisect(cumulative, rng.random() * total)]
+
+
+@dataclass
+class Scale:
+    """Row counts derived from the number of cars."""
+
+    cars: int
+    users_per_car: float = 0.25
+    seller_share: float = 0.1
+    admins: int = 3
+    images_per_car: int = 3
+    wishlists_per_buyer: int = 3
+    test_drives_per_car: float = 0.05
+    review_share: float = 0.5
+    conversations_per_car: float = 0.1
+    messages_per_conversation: int = 6
+
+    @property
+    def users(self):
+        return max(100, int(self.cars * self.users_per_car))
+
+    @property
+    def sellers(self):
+        return max(1, int(self.users * self.seller_share))
+
+    @property
+    def buyers(self):
+        return self.users - self.admins - self.sellers
+
+    def summary(self):
+        return (f"{self.cars:,} cars, {self.users:,} users ({self.sellers:,} sellers), "
+                f"~{self.cars * self.images_per_car:,} images")
+
+
+class Generator:
+    """Row generators for one seed; yields tuples in ``TABLES`` column order."""
+
+    def __init__(self, scale, seed=0, anchor=None):
+        self.scale = scale
+        self.seed = seed
+        now = datetime.datetime.now(datetime.timezone.utc)
+        self.anchor = anchor or now.replace(hour=0, minute=0, second=0, microsecond=0)
+        self._prefixes = {table: f"{seed & 0xFFFFFFFF:08x}-{index:04x}-4000-8000-"
+                          for index, table in enumerate(TABLES)}
+        self._brand = _weighted(list(BRAND_WEIGHTS), list(BRAND_WEIGHTS.values()))
+        self._status = _weighted(STATUSES, STATUS_WEIGHTS)
+        self._city = _weighted(CITIES, CITY_WEIGHTS)
+        # Sold and pending cars, filled by cars() and consumed by transactions() and reviews()
+        self._sales = []
+
+    # ------------------------------------------------------------------ ids
+
+    def id(self, table, number):
+        """Deterministic UUID (version 4 layout) for row ``number`` of ``table``."""
+        return f"{self._prefixes[table]}{number:012x}"
+
+    def _user(self, number):
+        return self.id("Users", number)
+
+    def _seller(self, car):
+        # Large dealers hold most listings: square a well-spread fraction
+        fraction = ((car * 2654435761) & 0xFFFFFFFF) / 2 ** 32
+        return self.scale.admins + int(self.scale.sellers * fraction * fraction)
+
+    def _buyer(self, rng):
+        return self.scale.admins + self.scale.sellers + rng.randrange(self.scale.buyers)
+
+    def _timestamp(self, rng, max_days=730, after=None):
+        start = after or self.anchor - datetime.timedelta(days=max_days)
+        span = max(1, int((self.anchor - start).total_seconds()))
+        return start + datetime.timedelta(seconds=rng.randrange(span))
+
+    # --------------------------------------------------------------- tables
+
+    def users(self):
+        rng = random.Random(f"{self.seed}:users")
+        for number in range(self.scale.users):
+            if number < self.scale.admins:
+                role = "admin"
+            elif number < self.scale.admins + self.scale.sellers:
+                role = "seller"
+            else:
+                role = "buyer"
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            name = f"{first} {last}" if role != "seller" else f"{last} Motor {rng.choice(CITIES)}"
+            created = self._timestamp(rng, 1095)
+            yield (
+                self._user(number), f"seed{self.seed}_{number}", f"seed{self.seed}_{number}@seed.mobilindo.test",
+                PASSWORD_HASH, role, name, f"08{rng.randrange(10 ** 9, 10 ** 10)}",
+                f"Jl. {rng.choice(LAST_NAMES)} No. {rng.randrange(1, 200)}, {rng.choice(CITIES)}",
+                rng.random() < 0.8, rng.random() < 0.97, self._timestamp(rng, after=created),
+                created, created,
+            )
+
+    def cars(self):
+        rng = random.Random(f"{self.seed}:cars")
+        for number in range(self.scale.cars):
+            brand = self._brand(rng)
+            model, body, new_price, engine, fuel = rng.choice(CATALOG[brand])
+            age = min(int(rng.expovariate(1 / 4)), 15)
+            mileage = 0 if age == 0 else int(age * rng.uniform(8_000, 20_000))
+            price = new_price * 0.88 ** age * rng.uniform(0.9, 1.08)
+            price = round(price / 500_000) * 500_000
+            status = self._status(rng)
+            location = self._city(rng)
+            created = self._timestamp(rng)
+            year = created.year - age
+            seller = self._seller(number)
+            if status in ("sold", "pending"):
+                self._sales.append((number, seller, self._buyer(rng), price, status, created))
+            transmission = "automatic" if fuel == "electric" or rng.random() < 0.6 else "manual"
+            kilometres = f"{mileage:,}".replace(",", ".")
+            yield (
+                self.id("Cars", number), self._user(seller), brand, model, year, f"{price:.2f}",
+                mileage, fuel, transmission, body, rng.choice(COLORS),
+                None if engine is None else f"{engine} cc",
+                f"{brand} {model} {year} {transmission}, {kilometres} km, pajak hidup, siap pakai.",
+                "new" if age == 0 else "used", location, status, rng.random() < 0.8,
+                int(rng.paretovariate(1.5) * 20), created, created,
+            )
+
+    def car_images(self):
+        per_car = self.scale.images_per_car
+        for car in range(self.scale.cars):
+            car_id = self.id("Cars", car)
+            for position in range(per_car):
+                yield (
+                    self.id("CarImages", car * per_car + position), car_id,
+                    f"https://seed.mobilindo.test/storage/v1/object/public/car-images/{car_id}/{position}.jpg",
+                    position == 0, f"Foto {position + 1}",
+                )
+
+    def transactions(self):
+        rng = random.Random(f"{self.seed}:transactions")
+        for car, seller, buyer, price, status, listed in self._sales:
+            date = self._timestamp(rng, after=listed)
+            completed = status == "sold"
+            amount = price * (rng.uniform(0.93, 1.0) if completed else 1)
+            yield (
+                self.id("Transactions", car), self._user(buyer), self._user(seller), self.id("Cars", car),
+                f"{round(amount / 100_000) * 100_000:.2f}", "completed" if completed else "pending",
+                rng.choice(PAYMENT_METHODS), "paid" if completed else "pending", date, None, date, date,
+            )
+
+    def wishlists(self):
+        rng = random.Random(f"{self.seed}:wishlists")
+        number = 0
+        first_buyer = self.scale.admins + self.scale.sellers
+        per_buyer = min(self.scale.wishlists_per_buyer, self.scale.cars)
+        for buyer in range(first_buyer, self.scale.users):
+            # sample() without replacement keeps (userId, carId) unique
+            for car in rng.sample(range(self.scale.cars), rng.randint(0, per_buyer)):
+                created = self._timestamp(rng, 365)
+                yield self.id("Wishlists", number), self._user(buyer), self.id("Cars", car), created, created
+                number += 1
+
+    def test_drives(self):
+        rng = random.Random(f"{self.seed}:testdrives")
+        for number in range(int(self.scale.cars * self.scale.test_drives_per_car)):
+            created = self._timestamp(rng, 365)
+            scheduled = created + datetime.timedelta(days=rng.randint(1, 14), hours=rng.randint(9, 16))
+            status = "scheduled" if scheduled > self.anchor else rng.choices(
+                ("completed", "cancelled", "no_show"), (75, 15, 10))[0]
+            rating = rng.randint(3, 5) if status == "completed" else None
+            yield (
+                self.id("TestDrives", number), self._user(self._buyer(rng)),
+                self.id("Cars", rng.randrange(self.scale.cars)), scheduled, status, None,
+                "Mobil nyaman dikendarai." if rating else None, rating, created, created,
+            )
+
+    def reviews(self):
+        rng = random.Random(f"{self.seed}:reviews")
+        for car, _, buyer, _, status, listed in self._sales:
+            if status != "sold" or rng.random() >= self.scale.review_share:
+                continue
+            created = self._timestamp(rng, after=listed)
+            yield (
+                self.id("Reviews", car), self._user(buyer), self.id("Cars", car), self.id("Transactions", car),
+                rng.choices((1, 2, 3, 4, 5), (2, 3, 10, 35, 50))[0], rng.choice(REVIEW_COMMENTS), True,
+                created, created,
+            )
+
+    def chats(self):
+        rng = random.Random(f"{self.seed}:chats")
+        number = 0
+        for _ in range(int(self.scale.cars * self.scale.conversations_per_car)):
+            car = rng.randrange(self.scale.cars)
+            buyer, seller = self._user(self._buyer(rng)), self._user(self._seller(car))
+            sent = self._timestamp(rng, 365)
+            for turn in range(rng.randint(2, self.scale.messages_per_conversation)):
+                question, answer = CHAT_LINES[(turn // 2) % len(CHAT_LINES)]
+                sender, receiver = (buyer, seller) if turn % 2 == 0 else (seller, buyer)
+                sent = sent + datetime.timedelta(seconds=rng.randint(20, 3600))
+                read = sent <= self.anchor and rng.random() < 0.85
+                yield (
+                    self.id("Chats", number), sender, receiver, self.id("Cars", car),
+                    question if turn % 2 == 0 else answer, "text", None, read,
+                    sent + datetime.timedelta(seconds=rng.randint(5, 600)) if read else None, sent, sent,
+                )
+                number += 1
+
+    def rows(self, table):
+        generators = {
+            "Users": self.users, "Cars": self.cars, "CarImages": self.car_images,
+            "Transactions": self.transactions, "Wishlists": self.wishlists, "TestDrives": self.test_drives,
+            "Reviews": self.reviews, "Chats": self.chats,
+        }
+        return generators[table]()
+
+
+# ------------------------------------------------------------------- COPY
+
+def _field(value):
+    # COPY text format. Generated text never contains tabs, newlines or
+    # backslashes, and Postgres parses str() of booleans and datetimes as is.
+    return "\\N" if value is None else str(value)
+
+
+def secondary_indexes(path=config.MIGRATION_PATH):
+    """``{name: CREATE INDEX statement}`` from the migration."""
+    source = path.read_text(encoding="utf-8")
+    return {name: statement for statement, name in
+            re.findall(r'^(CREATE INDEX IF NOT EXISTS "(\w+)" ON [^;]+;)', source, re.M)}
+
+
+def script(generator, reset=False, defer_indexes=False, progress=None):
+    """Yield the load script in chunks: setup, one COPY block per table, ANALYZE."""
+    tables = list(TABLES)
+    indexes = secondary_indexes() if defer_indexes else {}
+    yield "\\set ON_ERROR_STOP on\nSET client_encoding = 'UTF8';\nSET synchronous_commit = off;\nBEGIN;\n"
+    if reset:
+        # Truncating in the load's own transaction also lets COPY skip WAL when wal_level=minimal
+        yield "TRUNCATE " + ", ".join(f'"{table}"' for table in tables) + " CASCADE;\n"
+    for name in indexes:
+        yield f'DROP INDEX IF EXISTS "{name}";\n'
+
+    for table in tables:
+        columns = ", ".join(f'"{column}"' for column in TABLES[table])
+        yield f'COPY "{table}" ({columns}) FROM stdin;\n'
+        started = time.perf_counter()
+        count = 0
+        chunk = []
+        for row in generator.rows(table):
+            chunk.append("\t".join(map(_field, row)))
+            count += 1
+            if len(chunk) == 10_000:
+                yield "\n".join(chunk) + "\n"
+                chunk = []
+        if chunk:
+            yield "\n".join(chunk) + "\n"
+        yield "\\.\n"
+        if progress:
+            progress(table, count, time.perf_counter() - started)
+
+    yield "".join(f"{statement}\n" for statement in indexes.values())
+    yield "COMMIT;\n"
+    yield "".join(f'ANALYZE "{table}";\n' for table in tables)
+
+
+def _psql(dsn, *args):
+    if shutil.which("psql") is None:
+        raise RuntimeError("psql not found: install the PostgreSQL client or write the script with --out")
+    return ["psql", "-X", "-q", "-v", "ON_ERROR_STOP=1", dsn, *args]
+
+
+def load(generator, dsn=None, out=None, reset=False, defer_indexes=False, progress=None):
+    """Stream the script into ``psql`` (or into ``out``); returns elapsed seconds."""
+    started = time.perf_counter()
+    chunks = script(generator, reset=reset, defer_indexes=defer_indexes, progress=progress)
+    if out is not None:
+        out.parent.mkdir(parents=True, exist_ok=True)
+        opener = gzip.open if out.suffix == ".gz" else open
+        with opener(out, "wt", encoding="utf-8") as handle:
+            handle.writelines(chunks)
+        return time.perf_counter() - started
+
+    process = subprocess.Popen(_psql(dsn), stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                               text=True, encoding="utf-8")
+    try:
+        for chunk in chunks:
+            process.stdin.write(chunk)
+    except BrokenPipeError:
+        pass  # psql stopped on an error; its exit status says so
+    finally:
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+    if process.wait():
+        raise RuntimeError(f"psql exited with status {process.returncode}")
+    return time.perf_counter() - started
+
+
+# ------------------------------------------------------------------ queries
+
+# Queries the seeded volume is meant to exercise (see car.controller.js getAllCars)
+QUERIES = {
+    "catalog filter": """
+        SELECT * FROM "Cars"
+        WHERE status = 'available' AND brand = 'Toyota' AND price BETWEEN 150000000 AND 300000000
+          AND year >= 2018
+        ORDER BY "createdAt" DESC LIMIT 12""",
+    "catalog count": """
+        SELECT count(*) FROM "Cars"
+        WHERE status = 'available' AND brand = 'Toyota' AND price BETWEEN 150000000 AND 300000000
+          AND year >= 2018""",
+    "car detail": """
+        SELECT c.*, u."fullName", u."phoneNumber", i."imageUrl"
+        FROM "Cars" c JOIN "Users" u ON u.id = c."sellerId"
+        LEFT JOIN "CarImages" i ON i."carId" = c.id
+        WHERE c.id = (SELECT id FROM "Cars" ORDER BY "viewCount" DESC LIMIT 1)""",
+    "dashboard stats": """
+        SELECT status, count(*), avg(price) FROM "Cars" GROUP BY status""",
+    "recent activities": """
+        SELECT t.id, t.amount, t."transactionDate", c.brand, c.model
+        FROM "Transactions" t JOIN "Cars" c ON c.id = t."carId"
+        ORDER BY t."transactionDate" DESC LIMIT 10""",
+    "popular cars": """
+        SELECT brand, model, sum("viewCount") AS views FROM "Cars"
+        GROUP BY brand, model ORDER BY views DESC LIMIT 10""",
+    "monthly sales report": """
+        SELECT date_trunc('month', t."transactionDate") AS month, c.brand, count(*), sum(t.amount)
+        FROM "Transactions" t JOIN "Cars" c ON c.id = t."carId"
+        WHERE t.status = 'completed' GROUP BY 1, 2 ORDER BY 1 DESC, 4 DESC""",
+    "seller rating": """
+        SELECT c."sellerId", avg(r.rating), count(*) FROM "Reviews" r JOIN "Cars" c ON c.id = r."carId"
+        GROUP BY c."sellerId" ORDER BY count(*) DESC LIMIT 10""",
+    "inbox": """
+        SELECT * FROM "Chats"
+        WHERE "receiverId" = (SELECT "sellerId" FROM "Cars" LIMIT 1) AND NOT "isRead"
+        ORDER BY "createdAt" DESC LIMIT 50""",
+}
+
+
+def explain(dsn, queries=None):
+    """``[{"name", "ms", "plan"}]``: execution time and top plan node per query."""
+    rows = []
+    for name, sql in (queries or QUERIES).items():
+        result = subprocess.run(_psql(dsn, "-A", "-t", "-c", f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"),
+                                capture_output=True, text=True)
+        if result.returncode:
+            rows.append({"name": name, "ms": None, "plan": result.stderr.strip().splitlines()[-1]})
+            continue
+        plan = json.loads(result.stdout)[0]
+        rows.append({"name": name, "ms": plan["Execution Time"], "plan": _plan_summary(plan["Plan"])})
+    return rows
+
+
+def _plan_summary(node):
+    # The scans are what volume changes: list them depth-first
+    scans = []
+
+    def visit(node):
+        if "Scan" in node["Node Type"]:
+            target = node.get("Index Name") or node.get("Relation Name", "")
+            scans.append(f"{node['Node Type']} {target}".strip())
+        for child in node.get("Plans", ()):
+            visit(child)
+
+    visit(node)
+    return ", ".join(scans)
+
+
+def format_explain(rows):
+    lines = ["Query timings (EXPLAIN ANALYZE):"]
+    for row in rows:
+        ms = f"{row['ms']:9.1f} ms" if row["ms"] is not None else "    error"
+        lines.append(f"  {row['name']:<22} {ms}  {row['plan']}")
+    return "\n".join(lines)
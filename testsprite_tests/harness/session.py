@@ -0,0 +1,158 @@
+"""Cached, pre-authenticated Playwright storage state per user role.
+
+Logging in through the UI costs several steps and a Supabase auth round
+trip per test. :func:`storage_state` logs a role in once, saves the
+context's storage state (cookies plus the ``sb-<project>-auth-token``
+entry supabase-js keeps in localStorage) and hands the saved file to every
+later test. The file is reused across runs until the access token is
+about to expire, at which point the role is logged in again.
+"""
+import asyncio
+import json
+import os
+import re
+import time
+
+from playwright import async_api
+
+from . import config
+from .runner import SkipCase
+
+# Re-authenticate when the access token has less than this many seconds left
+EXPIRY_MARGIN = 120
+
+_AUTH_TOKEN_KEY = re.compile(r"^sb-.+-auth-token$")
+
+# Every role is configured through TESTSPRITE_<ROLE>_EMAIL / _PASSWORD.
+# The generated scripts' "mobilindoandre" is not an email address, which
+# the login form rejects before it reaches Supabase, so it is no default.
+ROLES = {
+    "buyer": (None, None),
+    "seller": (None, None),
+    "admin": (None, None),
+    "owner": (None, None),
+}
+
+# Form errors the login page shows: the banner for Supabase errors, the
+# per-field messages of validateForm and the browser's own validation
+_LOGIN_ERRORS = """() => [
+    ...Array.from(document.querySelectorAll('form .text-red-500, .text-red-700 span'),
+                  (element) => element.textContent.trim()),
+    ...Array.from(document.querySelectorAll('#email, #password'), (input) => input.validationMessage),
+].filter(Boolean)"""
+
+_locks = {}
+
+
+class SessionError(RuntimeError):
+    pass
+
+
+def credentials(role):
+    if role not in ROLES:
+        raise SessionError(f"Unknown role {role!r}; expected one of {', '.join(ROLES)}")
+    default_user, default_password = ROLES[role]
+    prefix = f"TESTSPRITE_{role.upper()}"
+    user = os.environ.get(f"{prefix}_EMAIL", default_user)
+    password = os.environ.get(f"{prefix}_PASSWORD", default_password)
+    if not user or not password:
+        raise SessionError(f"Set {prefix}_EMAIL and {prefix}_PASSWORD to log in as {role}")
+    return user, password
+
+
+def state_path(role):
+    return config.OUTPUT_DIR / "sessions" / f"{role}.json"
+
+
+def _auth_items(state):
+    for origin in state.get("origins", []):
+        for item in origin.get("localStorage", []):
+            if _AUTH_TOKEN_KEY.match(item.get("name", "")):
+                yield item
+
+
+def project_ref(state):
+    """The ``<ref>`` of the ``sb-<ref>-auth-token`` key in ``state``.
+
+    supabase-js names the key after the first label of the Supabase host,
+    so the local stack shows up as ``localhost`` or ``127``.
+    """
+    for item in _auth_items(state):
+        return item["name"][len("sb-"):-len("-auth-token")]
+    return None
+
+
+def token_expiry(state):
+    """Return the Supabase access token expiry (unix seconds) in ``state``."""
+    for item in _auth_items(state):
+        try:
+            session = json.loads(item["value"])
+        except (TypeError, ValueError):
+            continue
+        # supabase-js v2 stores the session itself; older builds nest it
+        session = session.get("currentSession", session)
+        if session.get("expires_at"):
+            return float(session["expires_at"])
+    return None
+
+
+def is_fresh(path):
+    if not path.exists():
+        return False
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        return False
+    expires_at = token_expiry(state)
+    return expires_at is not None and expires_at - time.time() > EXPIRY_MARGIN
+
+
+async def login(browser, role, path):
+    """Log ``role`` in through the login page and save the storage state."""
+    user, password = credentials(role)
+    context = await browser.new_context()
+    try:
+        page = await context.new_page()
+        await page.goto(f"{config.BASE_URL}/login", wait_until="domcontentloaded")
+        await page.fill("#email", user)
+        await page.fill("#password", password)
+        await page.click("form button[type=submit]")
+        # supabase-js writes the session to localStorage once signInWithPassword resolves
+        try:
+            await page.wait_for_function(
+                """() => Object.keys(localStorage).some(
+                    (key) => key.startsWith('sb-') && key.endsWith('-auth-token'))""",
+                timeout=config.WAIT_TIMEOUT * 3,
+            )
+        except async_api.TimeoutError:
+            shown = await page.evaluate(_LOGIN_ERRORS)
+            raise SessionError(f"Login as {role} ({user}) did not create a session: "
+                               + ("; ".join(shown) if shown else "no error shown on the login page")) from None
+        path.parent.mkdir(parents=True, exist_ok=True)
+        await context.storage_state(path=str(path))
+    finally:
+        await context.close()
+    return path
+
+
+async def storage_state(browser, role="buyer", refresh=False):
+    """Path to a valid storage state for ``role``, logging in if needed.
+
+    Pass the result as ``browser.new_context(storage_state=...)``.
+    Concurrent callers for the same role share a single login.
+    """
+    lock = _locks.setdefault(role, asyncio.Lock())
+    path = state_path(role)
+    async with lock:
+        if refresh or not is_fresh(path):
+            await login(browser, role, path)
+    return str(path)
+
+
+async def case_storage_state(browser, role="buyer"):
+    """:func:`storage_state` for a test case, skipped when ``role`` has no credentials."""
+    try:
+        credentials(role)
+    except SessionError as exc:
+        raise SkipCase(str(exc)) from None
+    return await storage_state(browser, role)
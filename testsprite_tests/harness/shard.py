@@ -0,0 +1,178 @@
+"""Process-sharded suite execution balanced by historical durations.
+
+One Python process drives every browser of a :func:`run_suite` call from
+a single event loop, so a large suite ends up CPU bound on one core.
+:func:`run_sharded` splits the cases over ``shards`` worker processes,
+each running its own :func:`~harness.runner.run_suite` with its own
+browser pool, and merges the results.
+
+Cases are assigned longest-first to the shard with the least estimated
+work (LPT scheduling) and each shard starts its longest cases first, so
+long flows such as TC013 and TC003 do not end up running alone at the
+end. Estimates come from ``.harness/durations.json``, which every run
+updates; cases without history are estimated from their action count.
+"""
+import asyncio
+import heapq
+import json
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from . import config, fastmode, har, impact, memory, renders, vitals, waterfall
+from .loader import TestCase, discover
+from .plan import load_plans
+from .runner import run_suite
+
+# Weight of the newest run in the moving average of a case's duration
+SMOOTHING = 0.5
+
+# Estimated seconds per scripted action for cases without history
+SECONDS_PER_ACTION = 1.5
+
+
+def durations_path():
+    return config.OUTPUT_DIR / "durations.json"
+
+
+def load_durations(path=None):
+    path = path or durations_path()
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def record_durations(results, path=None):
+    """Fold the duration of every executed case into the history file."""
+    path = path or durations_path()
+    history = load_durations(path)
+    for result in results:
+        if result.skipped:
+            continue
+        previous = history.get(result.id)
+        history[result.id] = round(
+            result.duration if previous is None
+            else SMOOTHING * result.duration + (1 - SMOOTHING) * previous,
+            3,
+        )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(history, indent=2, sort_keys=True), encoding="utf-8")
+    return path
+
+
+def _action_count(case):
+    if isinstance(case, TestCase):
+        source = case.path.read_text(encoding="utf-8")
+        return source.count("waits.before_action(") + source.count(".goto(")
+    return sum(len(actions) for _, actions in getattr(case, "steps", []))
+
+
+def estimate(case, history):
+    if case.id in history:
+        return history[case.id]
+    return max(1, _action_count(case)) * SECONDS_PER_ACTION
+
+
+def plan_shards(cases, shards, history=None):
+    """Split ``cases`` into ``shards`` lists of roughly equal estimated time.
+
+    Returns ``[(estimated_seconds, [case, ...]), ...]``; every list is
+    ordered longest-first.
+    """
+    history = load_durations() if history is None else history
+    ordered = sorted(cases, key=lambda case: (-estimate(case, history), case.id))
+    heap = [(0.0, number) for number in range(max(1, min(shards, len(cases))))]
+    assigned = {number: [] for _, number in heap}
+    for case in ordered:
+        load, number = heapq.heappop(heap)
+        assigned[number].append(case)
+        heapq.heappush(heap, (load + estimate(case, history), number))
+    return [
+        (sum(estimate(case, history) for case in assigned[number]), assigned[number])
+        for number in sorted(assigned)
+        if assigned[number]
+    ]
+
+
+def build_plugins(options):
+    """Runner plugins for the ``fast`` / ``har`` / ``vitals`` / ``impact`` / ``memory`` / ``waterfall`` /
+    ``renders`` options."""
+    plugins = []
+    if options.get("fast"):
+        plugins.append(fastmode.BlockPlugin(options["fast"]))
+    if options.get("har"):
+        plugins.append(har.HarPlugin(
+            options["har"],
+            directory=options.get("har_dir"),
+            unmatched=options.get("har_unmatched", "abort"),
+        ))
+    if options.get("vitals"):
+        plugins.append(vitals.VitalsPlugin(enforce=not options.get("no_budgets")))
+    if options.get("impact"):
+        plugins.append(impact.ImpactPlugin())
+    if options.get("memory"):
+        plugins.append(memory.MemoryPlugin(options["memory"]))
+    if options.get("waterfall"):
+        plugins.append(waterfall.WaterfallPlugin())
+    if options.get("renders"):
+        plugins.append(renders.RenderPlugin())
+    return plugins
+
+
+def _select(kind, ids):
+    cases = load_plans(ids) if kind == "plan" else discover(ids)
+    by_id = {case.id: case for case in cases}
+    return [by_id[case_id] for case_id in ids]
+
+
+def _run_shard(number, kind, ids, options):
+    """Process entry point: run one shard and return its results."""
+    logging.basicConfig(level=logging.WARNING,
+                        format=f"%(levelname)s [shard {number}] %(name)s: %(message)s")
+
+    def progress(result):
+        print(f"  [{number}] {result.id} {result.status} ({result.duration:.1f}s)", flush=True)
+
+    started = time.perf_counter()
+    results = asyncio.run(run_suite(
+        _select(kind, ids),
+        workers=options.get("workers"),
+        browsers=options.get("browsers"),
+        timeout=options.get("timeout"),
+        on_result=progress,
+        trace=options.get("trace", True),
+        plugins=build_plugins(options),
+    ))
+    return time.perf_counter() - started, results
+
+
+def run_sharded(cases, shards, kind="run", options=None):
+    """Run ``cases`` over ``shards`` processes; returns ``(results, plan)``.
+
+    ``kind`` says how a worker rebuilds the cases from their ids
+    (``"run"`` for TC scripts, ``"plan"`` for plan entries). ``options``
+    holds the suite options (workers, browsers, timeout, trace, har,
+    vitals...) applied inside every shard.
+    """
+    options = options or {}
+    plan = plan_shards(cases, shards)
+    # Playwright's driver does not survive fork(): always spawn fresh workers
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=len(plan), mp_context=context) as executor:
+        futures = [
+            executor.submit(_run_shard, number, kind, [case.id for case in shard_cases], options)
+            for number, (_, shard_cases) in enumerate(plan, 1)
+        ]
+        shard_results = [future.result() for future in futures]
+    results = sorted((r for _, rs in shard_results for r in rs), key=lambda r: r.id)
+    summary = [
+        {
+            "shard": number,
+            "cases": [case.id for case in shard_cases],
+            "estimated_s": round(estimated, 1),
+            "duration_s": round(elapsed, 1),
+        }
+        for number, ((estimated, shard_cases), (elapsed, _)) in enumerate(zip(plan, shard_results), 1)
+    ]
+    return results, summary
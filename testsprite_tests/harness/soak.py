@@ -0,0 +1,324 @@
+"""Soak mode: loop user journeys in one long-lived page and track drift.
+
+The showroom tablets keep Katalog and Chat open all day, so leaks that a
+single test run never sees add up there. :func:`run_soak` opens one
+browser context and one page and walks the plan journeys (TC005 catalog,
+TC009 credit simulation, TC018 buyer chat by default) round after round
+until the duration is up. Only the first round loads a document; every
+later ``goto`` is a client-side navigation (``history.pushState`` plus a
+``popstate`` event, which React Router follows), the way a user clicking
+through the app keeps the same JS heap alive.
+
+After each journey the page is sampled through CDP (after a forced GC,
+see :class:`harness.memory.PageSampler`) and the latency of each step is
+kept. Drift compares the median of the first and the last window of
+rounds, skipping the first round, which pays for the cold load: a series
+drifts when it rose by more than ``threshold`` of its starting value and
+by more than an absolute floor (the memory floors of
+:data:`harness.memory.SERIES`, :data:`LATENCY_FLOOR_MS` for latency).
+Steps that only have a prose description (TC018's seller reply) are
+skipped and listed in the report.
+
+A journey that fails in the first round is dropped from the rotation and
+listed with its error: reloading after it every round would reset the
+heap and hide the drift the run is there to find. Journeys that post data
+(``unique`` fills, TC018's chat message) tag the text with the round so
+each round checks its own message, and only run when the app signs in to
+the local stack; elsewhere they are dropped the same way.
+"""
+import asyncio
+import json
+import random
+import re
+import statistics
+import time
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+from playwright import async_api
+
+from . import config, memory, session, stats, waits
+from .plan import load_plans
+from .pool import BrowserPool
+
+DEFAULT_PLANS = ("TC005", "TC009", "TC018")
+
+# Memory series checked for drift, with the floors the memory plugin uses
+MEMORY_SERIES = memory.SERIES
+LATENCY_FLOOR_MS = 100.0
+# Supabase project refs of the local stack, see session.project_ref()
+LOCAL_REFS = ("localhost", "127")
+# Rounds per comparison window: a fifth of the run, at least this many
+MIN_WINDOW = 3
+
+_SPA_NAVIGATE = """path => {
+    history.pushState(null, "", path);
+    window.dispatchEvent(new PopStateEvent("popstate", {state: null}));
+}"""
+
+_DURATION = re.compile(r"^(\d+(?:\.\d+)?)([smh]?)$")
+
+
+def parse_duration(value):
+    """``"90"`` -> 90, ``"45m"`` -> 2700, ``"4h"`` -> 14400 seconds."""
+    match = _DURATION.match(value.strip().lower())
+    if not match:
+        raise ValueError(f"Duration must be seconds or a number with s/m/h: {value!r}")
+    amount, unit = match.groups()
+    return float(amount) * {"": 1, "s": 1, "m": 60, "h": 3600}[unit]
+
+
+def drift(values, threshold, floor):
+    """Compare the first and last window of ``values`` (warmup excluded).
+
+    Returns ``None`` when there are too few values for two disjoint
+    windows, else ``{"first", "last", "change", "ratio", "drifted"}``.
+    """
+    values = values[1:]
+    window = max(MIN_WINDOW, len(values) // 5)
+    if len(values) < 2 * window:
+        return None
+    first = statistics.median(values[:window])
+    last = statistics.median(values[-window:])
+    change = last - first
+    ratio = change / first if first else 0.0
+    return {
+        "first": first,
+        "last": last,
+        "change": change,
+        "ratio": ratio,
+        "drifted": change > floor and ratio > threshold,
+    }
+
+
+class SoakReport:
+    def __init__(self, plans, threshold, latency_threshold):
+        self.plans = plans
+        self.threshold = threshold
+        self.latency_threshold = latency_threshold
+        self.started = time.monotonic()
+        self.finished = None
+        self.stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.rounds = 0
+        self.journeys = {plan.id: [] for plan in plans}   # plan -> [sample row + "ms"]
+        self.steps = {}                                   # label -> [(offset_s, ms)]
+        self.errors = []                                  # (offset_s, step, message)
+        self.reloads = 0
+        self.excluded = {}                                # plan -> why it left the rotation
+        self.skipped = {
+            plan.id: [step["description"] for step in plan.unbound] for plan in plans
+        }
+
+    def offset(self):
+        return time.monotonic() - self.started
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    def drifts(self):
+        """``{(series, name): drift}`` for every series with enough rounds."""
+        found = {}
+        for plan_id, rows in self.journeys.items():
+            for series, floor in MEMORY_SERIES.items():
+                found[(series, plan_id)] = drift([row[series] for row in rows], self.threshold, floor)
+            found[("latency", plan_id)] = drift([row["ms"] for row in rows], self.latency_threshold,
+                                                LATENCY_FLOOR_MS)
+        for label, rows in self.steps.items():
+            found[("latency", label)] = drift([ms for _, ms in rows], self.latency_threshold,
+                                              LATENCY_FLOOR_MS)
+        return {key: value for key, value in found.items() if value is not None}
+
+    def latest_heap(self):
+        latest = max((rows[-1] for rows in self.journeys.values() if rows),
+                     key=lambda row: row["t_s"], default=None)
+        return _amount("heap", latest["heap"]) if latest else "-"
+
+    @property
+    def drifted(self):
+        return [key for key, value in self.drifts().items() if value["drifted"]]
+
+    def to_dict(self):
+        return {
+            "plans": [plan.id for plan in self.plans],
+            "elapsed_s": round(self.elapsed, 3),
+            "rounds": self.rounds,
+            "threshold": self.threshold,
+            "latency_threshold": self.latency_threshold,
+            "reloads": self.reloads,
+            "excluded": self.excluded,
+            "errors": len(self.errors),
+            "skipped_steps": self.skipped,
+            "drift": [
+                {"series": series, "name": name, **{k: round(v, 3) if isinstance(v, float) else v
+                                                     for k, v in value.items()}}
+                for (series, name), value in self.drifts().items()
+            ],
+            "steps": {label: stats.summarize([ms for _, ms in rows]) for label, rows in self.steps.items()},
+            "journeys": self.journeys,
+            "step_samples": {label: [[round(t, 3), round(ms, 1)] for t, ms in rows]
+                             for label, rows in self.steps.items()},
+            "error_samples": [
+                {"t": round(t, 3), "step": step, "error": message}
+                for t, step, message in self.errors[:50]
+            ],
+        }
+
+    def format(self):
+        lines = [
+            f"{self.rounds} rounds of {', '.join(plan.id for plan in self.plans)} in "
+            f"{self.elapsed / 60:.1f} min, {len(self.errors)} errors, {self.reloads} reloads",
+        ]
+        if self.excluded:
+            lines += ["", "Journeys left out of the rotation:",
+                      *(f"  {plan_id}: {why}" for plan_id, why in self.excluded.items())]
+        skipped = [f"  {plan_id}: {description}" for plan_id, descriptions in self.skipped.items()
+                   for description in descriptions]
+        if skipped:
+            lines += ["", "Skipped steps without 'do' operations:", *skipped]
+        lines += ["", stats.format_header("step", width=48)]
+        lines += [stats.format_row(label, stats.summarize([ms for _, ms in rows]), width=48)
+                  for label, rows in self.steps.items()]
+
+        drifts = self.drifts()
+        if not drifts:
+            lines += ["", f"Too few rounds to measure drift (need {2 * MIN_WINDOW + 1})"]
+            return "\n".join(lines)
+        lines += ["", f"Drift, first vs last fifth of the rounds, at least {MIN_WINDOW} (memory > {self.threshold:.0%}, "
+                      f"latency > {self.latency_threshold:.0%}):"]
+        for (series, name), value in drifts.items():
+            marker = "DRIFT" if value["drifted"] else "ok"
+            lines.append(f"  {marker:<5} {series:<9} {name:<48} {_amount(series, value['first']):>10} -> "
+                         f"{_amount(series, value['last']):>10}  {value['ratio']:+7.1%}")
+        return "\n".join(lines)
+
+    def export(self, path=None):
+        path = path or config.OUTPUT_DIR / "soak" / f"soak-{self.stamp}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        return path
+
+
+def _amount(series, value):
+    if series == "latency":
+        return f"{value:.0f} ms"
+    return f"{value / 1024 / 1024:.1f} MB" if series == "heap" else f"{value:,.0f}"
+
+
+async def _navigate(page, action):
+    """Run a ``goto`` as a client-side navigation once the app is loaded."""
+    path = urlsplit(urljoin(config.BASE_URL + "/", action.target.lstrip("/"))).path
+    await page.evaluate(_SPA_NAVIGATE, path)
+    await waits.settle(page)
+
+
+async def _journey(page, plan, think_time, report):
+    """Walk the bound steps of ``plan``; ``False`` if a step failed."""
+    tag = f"#{report.stamp}.{report.rounds + 1}"
+    for number, (step, actions) in enumerate(plan.steps_for(tag), 1):
+        if not actions:
+            continue
+        label = f"{plan.id} {number}. {step['description'][:40]}"
+        started = time.perf_counter()
+        try:
+            for action in actions:
+                if action.verb == "goto":
+                    await _navigate(page, action)
+                else:
+                    await action(page)
+        except (AssertionError, async_api.Error) as exc:
+            report.errors.append((report.offset(), label, f"{type(exc).__name__}: {exc}".splitlines()[0]))
+            return False
+        report.steps.setdefault(label, []).append((report.offset(), (time.perf_counter() - started) * 1000))
+        await asyncio.sleep(random.uniform(*think_time))
+    return True
+
+
+async def _storage_state(api, plans):
+    roles = {plan.role for plan in plans if plan.role}
+    if len(roles) > 1:
+        raise ValueError(f"Soak plans must share one role, got {', '.join(sorted(roles))}")
+    return {"storage_state": await session.storage_state(api.browser, roles.pop())} if roles else {}
+
+
+def _exclude_writers(plans, options, report):
+    """Drop journeys that post data unless the app signs in to the local stack."""
+    ref = None
+    if "storage_state" in options:
+        state = json.loads(Path(options["storage_state"]).read_text(encoding="utf-8"))
+        ref = session.project_ref(state)
+    if ref in LOCAL_REFS:
+        return plans
+    target = f"Supabase project {ref!r}" if ref else "an unknown Supabase project"
+    for plan in plans:
+        if plan.unique_values:
+            report.excluded[plan.id] = (f"posts data every round and the app signs in to {target}; "
+                                        f"soak it against the local stack (stack up)")
+    return [plan for plan in plans if not plan.unique_values]
+
+
+async def run_soak(plan_ids=DEFAULT_PLANS, duration=3600.0, think_time=(1.0, 3.0), threshold=0.2,
+                   latency_threshold=0.5, browsers=1, progress=None, export_every=10):
+    """Loop ``plan_ids`` in one page for ``duration`` seconds and measure drift."""
+    plans = load_plans(list(plan_ids))
+    runnable = [plan for plan in plans if any(actions for _, actions in plan.steps)]
+    if not runnable:
+        raise ValueError("None of the plans has steps with 'do' operations")
+    report = SoakReport(plans, threshold, latency_threshold)
+    async with BrowserPool(size=browsers) as pool:
+        api = pool.lease("soak")
+        try:
+            options = await _storage_state(api, plans)
+            runnable = _exclude_writers(runnable, options, report)
+            if not runnable:
+                raise ValueError("Every journey was left out: " + "; ".join(
+                    f"{plan_id} {why}" for plan_id, why in report.excluded.items()))
+            context = await api.browser.new_context(**options)
+            context.set_default_timeout(config.DEFAULT_TIMEOUT)
+            page = await context.new_page()
+            cdp = await context.new_cdp_session(page)
+            await cdp.send("Performance.enable")
+            sampler = memory.PageSampler("soak", 0, cdp)
+            await page.goto(config.BASE_URL)
+            await waits.settle(page)
+
+            report.started = time.monotonic()
+            deadline = report.started + duration
+            while time.monotonic() < deadline:
+                for plan in list(runnable):
+                    started = time.perf_counter()
+                    if not await _journey(page, plan, think_time, report):
+                        if not report.rounds:
+                            # Broken from the start: a reload every round would
+                            # reset the heap of the journeys that do work
+                            runnable.remove(plan)
+                            report.excluded[plan.id] = f"failed in round 1: {report.errors[-1][2]}"
+                        # Start the next journey from a known state; the reload
+                        # resets the heap, which can only hide drift, not fake it
+                        report.reloads += 1
+                        await page.goto(config.BASE_URL)
+                        await waits.settle(page)
+                        continue
+                    ms = (time.perf_counter() - started) * 1000
+                    row = await sampler.sample(page, f"after {plan.id}")
+                    if row is not None:
+                        report.journeys[plan.id].append({
+                            **{key: row[key] for key in ("heap", "nodes", "listeners", "documents")},
+                            "t_s": round(report.offset(), 3),
+                            "ms": round(ms, 1),
+                        })
+                if not runnable:
+                    raise ValueError("Every journey failed in round 1: " + "; ".join(
+                        f"{label}: {message}" for _, label, message in report.errors))
+                report.rounds += 1
+                if progress:
+                    progress(f"  round {report.rounds:>4}  {report.offset() / 60:6.1f} min  "
+                             f"heap {report.latest_heap()}  errors {len(report.errors)}")
+                if export_every and report.rounds % export_every == 0:
+                    report.export()  # keep a partial report if the run is cut short
+            await context.close()
+        finally:
+            await api.release()
+    report.finished = time.monotonic()
+    return report
+
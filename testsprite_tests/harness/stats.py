@@ -0,0 +1,76 @@
+"""Small statistics helpers shared by the load and benchmark modes."""
+import math
+
+
+def percentile(values, q):
+    """``q``-th percentile (0-100) of ``values`` with linear interpolation."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * q / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return ordered[low]
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values):
+    """count / mean / p50 / p95 / p99 / max of a list of latencies."""
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values),
+    }
+
+
+def format_row(name, summary, width=28):
+    if not summary.get("count"):
+        return f"  {name:<{width}} {'-':>7}"
+    return (
+        f"  {name:<{width}} {summary['count']:>7} {summary['p50']:>9.1f} "
+        f"{summary['p95']:>9.1f} {summary['p99']:>9.1f} {summary['max']:>9.1f}"
+    )
+
+
+def format_header(title, width=28):
+    return f"  {title:<{width}} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+
+
+# Upper bounds (ms) of the latency histogram buckets; roughly 1-2-5 spaced
+HISTOGRAM_BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def histogram(values, bounds=HISTOGRAM_BOUNDS):
+    """``[(label, count)]`` of ``values`` in ``<= bound`` buckets plus overflow."""
+    counts = [0] * (len(bounds) + 1)
+    for value in values:
+        for position, bound in enumerate(bounds):
+            if value <= bound:
+                counts[position] += 1
+                break
+        else:
+            counts[-1] += 1
+    labels = [f"<= {bound} ms" for bound in bounds] + [f"> {bounds[-1]} ms"]
+    return list(zip(labels, counts))
+
+
+def format_histogram(buckets, width=40):
+    total = sum(count for _, count in buckets) or 1
+    peak = max((count for _, count in buckets), default=0) or 1
+    # Trim empty buckets at both ends so the chart stays readable
+    filled = [position for position, (_, count) in enumerate(buckets) if count]
+    if not filled:
+        return ""
+    lines = []
+    for label, count in buckets[filled[0]:filled[-1] + 1]:
+        bar = "#" * round(width * count / peak)
+        lines.append(f"  {label:>12} {count:>7} {100 * count / total:5.1f}%  {bar}")
+    return "\n".join(lines)
@@ -0,0 +1,24 @@
+"""Background tasks started from Playwright event handlers.
+
+Event callbacks (``page``, ``load``, ``requestfinished``) are plain
+functions, so the plugins hand their coroutines to :func:`spawn`. The
+event loop only keeps weak references to tasks; the sets here keep them
+alive until they finish.
+"""
+import asyncio
+
+_pending = set()
+
+
+def spawn(coroutine, pending=None):
+    """Run ``coroutine`` in the background and return its task.
+
+    ``pending`` is an extra set that tracks the task until it is done, for
+    callers that wait on their own tasks later.
+    """
+    task = asyncio.ensure_future(coroutine)
+    for tracked in (_pending, pending):
+        if tracked is not None:
+            tracked.add(task)
+            task.add_done_callback(tracked.discard)
+    return task
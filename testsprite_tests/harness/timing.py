@@ -0,0 +1,248 @@
+"""Per-step timing for TC runs and trace export.
+
+Each case runs with a :class:`Timeline` bound to a context variable.
+The harness records spans into it as the case executes:
+
+``locator``     resolving a name from the locator index
+``wait``        event-driven waits (network idle, DOM settle, element)
+``action``      the click/fill/... that follows a wait
+``navigation``  main-frame navigations, from request to ``load``
+
+Generated scripts are not edited for this: an ``action`` span is opened
+when :func:`harness.waits.before_action` returns and closed when the
+script's next harness call starts, which is exactly the Playwright call
+in between. Timelines are written as a JSON trace and as a Chrome trace
+(``chrome://tracing`` / Perfetto) per case.
+"""
+import contextlib
+import contextvars
+import json
+import time
+
+from . import config
+
+CATEGORIES = ("locator", "wait", "action", "navigation")
+
+_current = contextvars.ContextVar("timeline", default=None)
+
+
+class Span:
+    __slots__ = ("category", "name", "start", "end", "args")
+
+    def __init__(self, category, name, start, end=None, args=None):
+        self.category = category
+        self.name = name
+        self.start = start
+        self.end = end
+        self.args = args or {}
+
+    @property
+    def duration(self):
+        return (self.end or self.start) - self.start
+
+    def to_dict(self, origin):
+        return {
+            "category": self.category,
+            "name": self.name,
+            "start_ms": round((self.start - origin) / 1e6, 3),
+            "duration_ms": round(self.duration / 1e6, 3),
+            **({"args": self.args} if self.args else {}),
+        }
+
+
+class Timeline:
+    """High-resolution spans recorded while one case runs."""
+
+    def __init__(self, case_id):
+        self.case_id = case_id
+        self.origin = time.perf_counter_ns()
+        self.finished = None
+        self.spans = []
+        self._open_action = None
+
+    def begin(self, category, name, **args):
+        self.close_action()
+        span = Span(category, name, time.perf_counter_ns(), args=args)
+        self.spans.append(span)
+        return span
+
+    def end(self, span):
+        span.end = time.perf_counter_ns()
+
+    def open_action(self, name, **args):
+        """Start an action span that ends when the next span begins."""
+        self.close_action()
+        self._open_action = Span("action", name, time.perf_counter_ns(), args=args)
+        self.spans.append(self._open_action)
+
+    def close_action(self):
+        if self._open_action is not None:
+            self._open_action.end = time.perf_counter_ns()
+            self._open_action = None
+
+    def add(self, category, name, start, end, **args):
+        """Record a span measured elsewhere (e.g. from page events)."""
+        self.spans.append(Span(category, name, start, end, args))
+
+    def finish(self):
+        self.close_action()
+        self.finished = time.perf_counter_ns()
+        for span in self.spans:
+            if span.end is None:
+                span.end = self.finished
+
+    @property
+    def duration_ms(self):
+        return ((self.finished or time.perf_counter_ns()) - self.origin) / 1e6
+
+    def totals(self):
+        """Milliseconds spent per category."""
+        totals = dict.fromkeys(CATEGORIES, 0.0)
+        for span in self.spans:
+            totals[span.category] = totals.get(span.category, 0.0) + span.duration / 1e6
+        return totals
+
+    def to_dict(self):
+        return {
+            "case": self.case_id,
+            "duration_ms": round(self.duration_ms, 3),
+            "totals_ms": {k: round(v, 3) for k, v in self.totals().items()},
+            "spans": [span.to_dict(self.origin) for span in self.spans],
+        }
+
+    def to_chrome_trace(self):
+        """Trace Event Format: one complete ("X") event per span, one lane per category."""
+        lanes = {category: index for index, category in enumerate(CATEGORIES, 1)}
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": category}}
+            for category, tid in lanes.items()
+        ]
+        for span in self.spans:
+            events.append({
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": (span.start - self.origin) / 1e3,
+                "dur": span.duration / 1e3,
+                "pid": 1,
+                "tid": lanes.get(span.category, len(lanes) + 1),
+                "args": span.args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"case": self.case_id}}
+
+    def export(self, directory=None):
+        """Write ``<case>.json`` and ``<case>.trace.json``; return the JSON path."""
+        directory = directory or config.OUTPUT_DIR / "traces"
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{self.case_id}.json"
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        (directory / f"{self.case_id}.trace.json").write_text(
+            json.dumps(self.to_chrome_trace()), encoding="utf-8"
+        )
+        return path
+
+
+def current():
+    """The timeline of the case running in this task, if any."""
+    return _current.get()
+
+
+def bind(timeline):
+    return _current.set(timeline)
+
+
+def unbind(token):
+    _current.reset(token)
+
+
+@contextlib.contextmanager
+def span(category, name, **args):
+    """Time the enclosed block on the current timeline (no-op without one)."""
+    timeline = current()
+    if timeline is None:
+        yield None
+        return
+    recorded = timeline.begin(category, name, **args)
+    try:
+        yield recorded
+    finally:
+        timeline.end(recorded)
+
+
+def open_action(name, **args):
+    timeline = current()
+    if timeline is not None:
+        timeline.open_action(name, **args)
+
+
+async def instrument_context(context, api):
+    """Pool context hook: record main-frame navigations on every page."""
+    timeline = current()
+    if timeline is None:
+        return
+
+    def watch(page):
+        pending = {}
+
+        def on_request(request):
+            try:
+                main_frame = request.frame == page.main_frame
+            except Exception:
+                # Service worker requests have no frame
+                return
+            if main_frame and request.is_navigation_request():
+                pending["url"] = request.url
+                pending["start"] = time.perf_counter_ns()
+
+        def on_load(_):
+            if "start" in pending:
+                timeline.add("navigation", pending.pop("url"), pending.pop("start"),
+                             time.perf_counter_ns())
+
+        page.on("request", on_request)
+        page.on("load", on_load)
+
+    for page in context.pages:
+        watch(page)
+    context.on("page", watch)
+
+
+def slowest(timelines, limit=10, categories=CATEGORIES):
+    """The ``limit`` longest spans across ``timelines`` as (case, span) pairs."""
+    spans = [
+        (timeline.case_id, span)
+        for timeline in timelines
+        for span in timeline.spans
+        if span.category in categories
+    ]
+    spans.sort(key=lambda item: item[1].duration, reverse=True)
+    return spans[:limit]
+
+
+def format_slowest(timelines, limit=10):
+    rows = slowest(timelines, limit)
+    if not rows:
+        return ""
+    lines = [f"Slowest {len(rows)} step(s):"]
+    for case_id, span in rows:
+        lines.append(f"  {span.duration / 1e6:9.1f} ms  {case_id}  {span.category:<10} {span.name}")
+    return "\n".join(lines)
+
+
+def write_summary(timelines, path=None, limit=25):
+    path = path or config.OUTPUT_DIR / "traces" / "summary.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    origins = {t.case_id: t.origin for t in timelines}
+    summary = {
+        "cases": {
+            t.case_id: {"duration_ms": round(t.duration_ms, 3),
+                        "totals_ms": {k: round(v, 3) for k, v in t.totals().items()}}
+            for t in timelines
+        },
+        "slowest": [
+            {"case": case_id, **span.to_dict(origins[case_id])}
+            for case_id, span in slowest(timelines, limit)
+        ],
+    }
+    path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    return path
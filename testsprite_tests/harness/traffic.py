@@ -0,0 +1,581 @@
+"""Weighted traffic model from the PRD's user flows, and an open-loop replay.
+
+``standard_prd.json`` names the user flows of the marketplace (catalog
+browsing, credit simulation, chat, advertisement posting, executive
+features, ...) and the roles walking them: buyers, external sellers,
+showroom admins and owners. :func:`build_model` turns every flow of the
+PRD into the routes each role visits for it (:data:`FLOWS`) and builds,
+per role, a Markov chain of page transitions:
+
+* a session starts on the first page of a flow, picked by the flow's
+  weight for that role;
+* after a page it continues with the next page of a flow that page
+  belongs to (``CONTINUE``), leaves (``EXIT``), or starts another flow,
+  again picked by weight.
+
+Each page carries the data requests it makes on load (:data:`PAGES`),
+the supabase-js queries of the page's services as REST calls, so the
+model is also a weighted mix of API calls. Writes (inserts, view
+counters) are left out: a replay must not pile rows into the database.
+
+:func:`run_traffic` replays the model against the Supabase origin (the
+local stack's gateway by default) at a target rate. Sessions arrive as
+a Poisson process whose rate is the target divided by the expected
+requests per session (open loop: a slow server gets more concurrent
+sessions, not fewer requests), walk the chain of their role with a think
+time between pages and fire each page's requests concurrently, as the
+browser does. Requests are counted after a warm-up of about one session
+length, once the mix of sessions in flight is steady. The report gives
+achieved vs target throughput, latency per endpoint and page views per
+role.
+
+Flow weights and role shares are not in the PRD; the defaults below are
+estimates to be replaced by analytics numbers when there are some
+(``--roles``, or an edited ``traffic model`` output passed to
+``--model``).
+"""
+import asyncio
+import json
+import random
+import re
+import time
+from collections import Counter, defaultdict
+
+from . import config, session, stack, stats, waterfall
+from .httpclient import ConnectionPool, HttpError
+
+# Share of sessions per role
+ROLE_SHARES = {"buyer": 80, "seller": 12, "admin": 6, "owner": 2}
+
+# PRD user flow (the text before the colon in user_flow_summary) ->
+# role -> (weight among that role's flows, routes in visiting order)
+FLOWS = {
+    "User Registration/Login": {
+        "buyer": (8, ["/login", "/dashboard"]),
+        "seller": (8, ["/login", "/dashboard"]),
+        "admin": (5, ["/admin/login", "/admin"]),
+        "owner": (10, ["/admin/login", "/executive"]),
+    },
+    "Car Catalog Browsing": {
+        "buyer": (40, ["/", "/katalog", "/mobil/:id", "/perbandingan"]),
+        "seller": (10, ["/katalog", "/mobil/:id"]),
+    },
+    "Transaction Flow": {
+        "buyer": (5, ["/mobil/:id", "/pembelian", "/pembayaran", "/transaksi"]),
+        "seller": (10, ["/seller/transaksi"]),
+    },
+    "Test Drive Booking": {
+        "buyer": (6, ["/mobil/:id", "/test-drive", "/riwayat-test-drive"]),
+        "admin": (12, ["/admin/test-drive"]),
+    },
+    "Trade-in Process": {
+        "buyer": (4, ["/trade-in", "/riwayat"]),
+        "admin": (8, ["/admin/trade-in"]),
+    },
+    "Wishlist Management": {
+        "buyer": (10, ["/katalog", "/wishlist", "/mobil/:id"]),
+    },
+    "Credit Simulation": {
+        "buyer": (12, ["/simulasi", "/katalog"]),
+    },
+    "Chat System": {
+        "buyer": (8, ["/mobil/:id", "/chat"]),
+        "seller": (20, ["/chat"]),
+        "admin": (15, ["/admin/chat"]),
+    },
+    "Advertisement Posting": {
+        "seller": (40, ["/iklan", "/kelola-iklan"]),
+        "admin": (15, ["/admin/kelola-iklan", "/admin/pembayaran-iklan"]),
+    },
+    "Admin Management": {
+        "admin": (35, ["/admin", "/admin/mobil-showroom", "/admin/users", "/admin/pembelian", "/admin/laporan"]),
+    },
+    "Executive Features": {
+        "owner": (70, ["/executive", "/executive/analytics", "/executive/kemitraan", "/executive/reports"]),
+    },
+    "System Administration": {
+        "admin": (10, ["/admin", "/admin/users", "/admin/parameter-kredit"]),
+    },
+}
+
+_CARS = ("/rest/v1/cars?select=*,car_brands!inner(id,name,logo_url,country),car_models!inner(id,name,brand_id),"
+         "car_categories!inner(id,name,slug),car_images(id,image_url,is_primary,display_order)")
+_MINE = "user_id=eq.{user_id}"
+_TABLE = re.compile(r"/rest/v1/(\w+)")
+
+# Route -> requests made when it loads. ``{car_id}`` is a car seen in the
+# catalog, ``{user_id}`` the logged-in account; POST /auth/v1/token is sent
+# with the role's credentials.
+PAGES = {
+    "/": [
+        f"GET {_CARS}&is_featured=eq.true&order=posted_at.desc&limit=6",
+        f"GET {_CARS}&order=posted_at.desc&limit=12",
+    ],
+    "/login": ["POST /auth/v1/token?grant_type=password"],
+    "/admin/login": ["POST /auth/v1/token?grant_type=password"],
+    "/dashboard": ["GET /auth/v1/user", f"GET /rest/v1/transactions?select=*&buyer_id=eq.{{user_id}}&limit=5"],
+    "/katalog": [
+        f"GET {_CARS}&status=eq.available&order=posted_at.desc&offset=0&limit=12",
+        "GET /rest/v1/car_brands?select=*&order=name.asc",
+        "GET /rest/v1/car_categories?select=*&order=name.asc",
+        "GET /rest/v1/cars?select=price&status=eq.available&order=price.asc",
+        f"GET /rest/v1/wishlists?select=*&{_MINE}&is_active=eq.true&order=added_at.desc",
+    ],
+    "/mobil/:id": [
+        "GET /rest/v1/cars?select=*&id=eq.{car_id}",
+        "GET /rest/v1/car_images?select=*&car_id=eq.{car_id}&order=display_order.asc",
+        "GET /rest/v1/car_specifications?select=*&car_id=eq.{car_id}",
+        f"GET /rest/v1/wishlists?select=id,is_active&{_MINE}&car_id=eq.{{car_id}}",
+    ],
+    "/perbandingan": ["GET /rest/v1/cars?select=*,car_brands(id,name),car_models(id,name)&id=in.({car_id})"],
+    "/simulasi": [
+        "GET /rest/v1/credit_parameters?select=*,financial_partners(id,name)&is_active=eq.true",
+        f"GET {_CARS}&status=eq.available&order=price.asc&limit=50",
+    ],
+    "/wishlist": [f"GET /rest/v1/wishlists?select=*&{_MINE}&is_active=eq.true&order=added_at.desc"],
+    "/test-drive": ["GET /rest/v1/cars?select=*&id=eq.{car_id}"],
+    "/riwayat-test-drive": [f"GET /rest/v1/test_drive_requests?select=*,cars(id,title)&{_MINE}&order=created_at.desc"],
+    "/trade-in": [
+        "GET /rest/v1/car_brands?select=*&order=name.asc",
+        f"GET /rest/v1/trade_in_requests?select=*&{_MINE}&order=created_at.desc",
+    ],
+    "/riwayat": ["GET /rest/v1/transactions?select=*,cars(id,title)&buyer_id=eq.{user_id}&order=created_at.desc"],
+    "/pembelian": ["GET /rest/v1/cars?select=*&id=eq.{car_id}"],
+    "/pembayaran": ["GET /rest/v1/transactions?select=*&buyer_id=eq.{user_id}&order=created_at.desc&limit=1"],
+    "/transaksi": [
+        "GET /rest/v1/transactions?select=*,cars(id,title,price)&buyer_id=eq.{user_id}&order=created_at.desc",
+        "GET /rest/v1/payments?select=*&order=created_at.desc&limit=20",
+    ],
+    "/chat": [
+        "GET /rest/v1/chat_rooms?select=*&or=(user1_id.eq.{user_id},user2_id.eq.{user_id})"
+        "&order=last_message_at.desc.nullslast",
+        "GET /rest/v1/chat_messages?select=*,chat_attachments(*)&order=sent_at.desc&limit=50",
+    ],
+    "/seller/transaksi": ["GET /rest/v1/transactions?select=*,cars(id,title,price)&seller_id=eq.{user_id}"
+                          "&order=created_at.desc"],
+    "/iklan": [
+        "GET /rest/v1/listing_packages?select=*&is_active=eq.true",
+        "GET /rest/v1/car_brands?select=*&order=name.asc",
+        "GET /rest/v1/car_categories?select=*&order=name.asc",
+    ],
+    "/kelola-iklan": [
+        f"GET {_CARS}&seller_id=eq.{{user_id}}&order=created_at.desc",
+        "GET /rest/v1/listing_payments?select=*&order=created_at.desc",
+    ],
+    "/admin": [
+        "GET /rest/v1/cars?select=id,status",
+        "GET /rest/v1/transactions?select=id,status,total_amount",
+        "GET /rest/v1/users?select=id,role",
+    ],
+    "/admin/mobil-showroom": [f"GET {_CARS}&order=created_at.desc"],
+    "/admin/users": ["GET /rest/v1/users?select=*&order=created_at.desc"],
+    "/admin/pembelian": ["GET /rest/v1/transactions?select=*,cars(id,title,price)&order=created_at.desc"],
+    "/admin/laporan": ["GET /rest/v1/reports?select=*&order=created_at.desc"],
+    "/admin/test-drive": ["GET /rest/v1/test_drive_requests?select=*,cars(id,title)&order=created_at.desc"],
+    "/admin/trade-in": ["GET /rest/v1/trade_in_requests?select=*,trade_in_images(*)&order=created_at.desc"],
+    "/admin/chat": ["GET /rest/v1/chat_rooms?select=*&order=last_message_at.desc.nullslast"],
+    "/admin/kelola-iklan": [f"GET {_CARS}&order=created_at.desc&limit=50"],
+    "/admin/pembayaran-iklan": ["GET /rest/v1/listing_payments?select=*,listing_packages(*)&order=created_at.desc"],
+    "/admin/parameter-kredit": ["GET /rest/v1/credit_parameters?select=*,financial_partners(id,name)"],
+    "/executive": [
+        "GET /rest/v1/transactions?select=id,status,total_amount,created_at",
+        "GET /rest/v1/cars?select=id,status,price",
+    ],
+    "/executive/analytics": [
+        "GET /rest/v1/transactions?select=*&order=created_at.desc",
+        "GET /rest/v1/payments?select=*&order=created_at.desc",
+    ],
+    "/executive/kemitraan": ["GET /rest/v1/financial_partners?select=*"],
+    "/executive/reports": [
+        "GET /rest/v1/reports?select=*&order=created_at.desc",
+        "GET /rest/v1/report_distributions?select=*",
+    ],
+}
+
+# After a page: move on within a flow, or leave; the rest starts a new flow
+CONTINUE = 0.6
+EXIT = 0.15
+
+EXIT_STATE = "exit"
+
+
+class SetupError(RuntimeError):
+    pass
+
+
+def prd_flows(path=None):
+    """Flow names of the PRD's ``user_flow_summary``."""
+    prd = json.loads((path or config.PRD_PATH).read_text(encoding="utf-8"))
+    return [line.partition(":")[0].strip() for line in prd["user_flow_summary"]]
+
+
+def _normalize(weights):
+    total = sum(weights.values())
+    return {key: round(value / total, 4) for key, value in weights.items() if value > 0}
+
+
+def _chain(flows):
+    """``(entry, transitions)`` of one role from ``[(weight, pages)]``."""
+    entry = Counter()
+    for weight, pages in flows:
+        entry[pages[0]] += weight
+    transitions = {}
+    for page in {page for _, pages in flows for page in pages}:
+        following = Counter()
+        for weight, pages in flows:
+            for position, current in enumerate(pages[:-1]):
+                if current == page:
+                    following[pages[position + 1]] += weight
+        moves = Counter({EXIT_STATE: EXIT})
+        switch = 1 - EXIT
+        if following:
+            total = sum(following.values())
+            for target, weight in following.items():
+                moves[target] += CONTINUE * weight / total
+            switch -= CONTINUE
+        total = sum(entry.values())
+        for target, weight in entry.items():
+            moves[target] += switch * weight / total
+        transitions[page] = _normalize(moves)
+    return _normalize(entry), dict(sorted(transitions.items()))
+
+
+def expected_visits(role_model, iterations=500):
+    """Expected visits per page in one session of ``role_model``."""
+    visits = dict(role_model["entry"])
+    inflow = dict(visits)
+    for _ in range(iterations):
+        following = Counter()
+        for page, amount in inflow.items():
+            for target, probability in role_model["transitions"][page].items():
+                if target != EXIT_STATE:
+                    following[target] += amount * probability
+        for page, amount in following.items():
+            visits[page] = visits.get(page, 0.0) + amount
+        inflow = following
+        if sum(inflow.values()) < 1e-9:
+            break
+    return visits
+
+
+def build_model(prd_path=None, shares=None):
+    """Per-role Markov chains over the routes of the PRD's user flows."""
+    flows = prd_flows(prd_path)
+    unknown = [flow for flow in flows if flow not in FLOWS]
+    if unknown:
+        raise ValueError(f"PRD flow(s) without routes in traffic.FLOWS: {', '.join(unknown)}")
+    shares = dict(ROLE_SHARES if shares is None else shares)
+    roles = {}
+    for role, share in shares.items():
+        walked = [FLOWS[flow][role] for flow in flows if role in FLOWS[flow]]
+        if share <= 0 or not walked:
+            continue
+        entry, transitions = _chain(walked)
+        roles[role] = {
+            "share": share,
+            "flows": [flow for flow in flows if role in FLOWS[flow]],
+            "entry": entry,
+            "transitions": transitions,
+        }
+    if not roles:
+        raise ValueError("No role with a positive share walks any of the PRD's flows")
+    pages = sorted({page for model in roles.values() for page in model["transitions"]})
+    model = {
+        "source": (prd_path or config.PRD_PATH).name,
+        "roles": roles,
+        "requests": {page: PAGES[page] for page in pages},
+    }
+    for role_model in roles.values():
+        visits = expected_visits(role_model)
+        role_model["pages_per_session"] = round(sum(visits.values()), 3)
+        role_model["requests_per_session"] = round(
+            sum(amount * len(model["requests"][page]) for page, amount in visits.items()), 3
+        )
+    return model
+
+
+def load_model(path, shares=None):
+    """Read a model written by ``traffic model``, optionally with new role shares."""
+    model = json.loads(path.read_text(encoding="utf-8"))
+    if shares is not None:
+        model["roles"] = {role: {**model["roles"][role], "share": share}
+                          for role, share in shares.items() if share > 0 and role in model["roles"]}
+        if not model["roles"]:
+            raise ValueError("None of the --roles is in the model")
+    missing = sorted({page for role in model["roles"].values() for page in role["transitions"]}
+                     - set(model["requests"]))
+    if missing:
+        raise ValueError(f"Model pages without requests: {', '.join(missing)}")
+    return model
+
+
+def parse_shares(value):
+    """``"buyer=90,seller=10"`` -> ``{"buyer": 90.0, "seller": 10.0}``."""
+    shares = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        role, _, share = item.partition("=")
+        if role not in ROLE_SHARES:
+            raise ValueError(f"Unknown role {role!r}; expected one of {', '.join(ROLE_SHARES)}")
+        shares[role] = float(share or 1)
+    if not any(shares.values()):
+        raise ValueError("Role shares need at least one role with a positive share")
+    return shares
+
+
+def format_model(model):
+    lines = [f"Traffic model from {model['source']}:"]
+    total = sum(role["share"] for role in model["roles"].values())
+    for name, role in model["roles"].items():
+        lines += [
+            "",
+            f"  {name}: {role['share'] / total:.0%} of sessions, {role['pages_per_session']:.1f} pages and "
+            f"{role['requests_per_session']:.1f} requests per session",
+            f"    flows: {', '.join(role['flows'])}",
+            "    starts: " + ", ".join(f"{page} {share:.0%}" for page, share in
+                                       sorted(role["entry"].items(), key=lambda item: -item[1])),
+        ]
+        visits = expected_visits(role)
+        for page, amount in sorted(visits.items(), key=lambda item: -item[1]):
+            top = sorted(role["transitions"][page].items(), key=lambda item: -item[1])[:3]
+            lines.append(f"    {page:<26} {amount:5.2f} visits  -> "
+                         + ", ".join(f"{target} {share:.0%}" for target, share in top))
+    return "\n".join(lines)
+
+
+# -------------------------------------------------------------------- replay
+
+class TrafficReport:
+    def __init__(self, base_url, target_rps, model):
+        self.base_url = base_url
+        self.target_rps = target_rps
+        self.model = model
+        self.started = time.monotonic()
+        self.finished = None
+        self.latencies = defaultdict(list)    # endpoint -> [ms]
+        self.statuses = defaultdict(Counter)  # endpoint -> status -> count
+        self.per_second = Counter()           # whole second since start -> sent
+        self.sessions = Counter()             # role -> sessions started
+        self.page_views = defaultdict(Counter)  # role -> page -> views
+        self.errors = Counter()               # "endpoint: message" -> count
+        self.skipped_roles = {}               # role -> reason
+        self.warmup = 0.0
+        self.active = 0
+        self.peak_active = 0
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    def record(self, name, started, status=None, error=None):
+        if started < self.started:
+            return  # warm-up traffic
+        now = time.monotonic()
+        self.per_second[int(started - self.started)] += 1
+        if error is not None:
+            self.errors[f"{name}: {error}"] += 1
+            self.statuses[name]["error"] += 1
+            return
+        self.latencies[name].append((now - started) * 1000)
+        self.statuses[name][str(status)] += 1
+
+    def total(self):
+        return sum(self.per_second.values())
+
+    def to_dict(self):
+        everything = [ms for values in self.latencies.values() for ms in values]
+        seconds = [self.per_second.get(second, 0) for second in range(int(self.elapsed))]
+        return {
+            "base_url": self.base_url,
+            "target_rps": self.target_rps,
+            "warmup_s": round(self.warmup, 3),
+            "elapsed_s": round(self.elapsed, 3),
+            "requests": self.total(),
+            "throughput_rps": self.total() / self.elapsed if self.elapsed else 0.0,
+            "throughput_per_second": {
+                "min": min(seconds, default=0),
+                "mean": sum(seconds) / len(seconds) if seconds else 0.0,
+                "max": max(seconds, default=0),
+            },
+            "peak_sessions": self.peak_active,
+            "sessions": dict(self.sessions),
+            "skipped_roles": self.skipped_roles,
+            "page_views": {role: dict(views.most_common()) for role, views in self.page_views.items()},
+            "latency": stats.summarize(everything),
+            "endpoints": {
+                name: {**stats.summarize(self.latencies[name]), "statuses": dict(counts)}
+                for name, counts in sorted(self.statuses.items())
+            },
+            "histogram": dict(stats.histogram(everything)),
+            "errors": dict(self.errors.most_common(20)),
+            "model": self.model,
+        }
+
+    def format(self):
+        summary = self.to_dict()
+        per_second = summary["throughput_per_second"]
+        sessions = ", ".join(f"{role} {count}" for role, count in self.sessions.most_common())
+        lines = [
+            f"{summary['requests']} requests to {self.base_url} in {summary['elapsed_s']:.1f}s from "
+            f"{sum(self.sessions.values())} sessions ({sessions}), at most {self.peak_active} at once, "
+            f"after a {self.warmup:.0f}s warm-up",
+            f"throughput {summary['throughput_rps']:.1f} req/s for a target of {self.target_rps:g} "
+            f"(per second: min {per_second['min']}, mean {per_second['mean']:.1f}, max {per_second['max']})",
+        ]
+        for role, reason in self.skipped_roles.items():
+            lines.append(f"  {role} skipped: {reason}")
+        lines += ["", stats.format_header("endpoint", width=40), stats.format_row("all", summary["latency"], width=40)]
+        for name, row in sorted(summary["endpoints"].items(), key=lambda item: -item[1].get("count", 0)):
+            codes = ", ".join(f"{code}x{count}" for code, count in sorted(row["statuses"].items()))
+            lines.append(f"{stats.format_row(name, row, width=40)}  [{codes}]")
+        chart = stats.format_histogram(list(summary["histogram"].items()))
+        if chart:
+            lines += ["", "Latency histogram:", chart]
+        if self.errors:
+            lines += ["", "Errors:"]
+            lines += [f"  {count:>5}  {message}" for message, count in self.errors.most_common(10)]
+        return "\n".join(lines)
+
+    def export(self, path=None):
+        path = path or config.OUTPUT_DIR / "traffic" / f"traffic-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        return path
+
+
+class _Account:
+    def __init__(self, role, email, password, token, user_id):
+        self.role = role
+        self.email = email
+        self.password = password
+        self.token = token
+        self.user_id = user_id
+
+
+async def _sign_in(pool, role, email, password):
+    response = await pool.request("POST", "/auth/v1/token?grant_type=password",
+                                  json_body={"email": email, "password": password})
+    if response.status != 200:
+        raise SetupError(f"POST /auth/v1/token returned {response.status} for {email}")
+    data = response.json()
+    return _Account(role, email, password, data["access_token"], data["user"]["id"])
+
+
+def tables(model):
+    """The PostgREST tables the requests of ``model`` read, sorted."""
+    return sorted({match for requests in model["requests"].values() for request in requests
+                   for match in _TABLE.findall(request)})
+
+
+async def _prepare(pool, model, report):
+    """Log in each role of the model and collect car ids for ``{car_id}``."""
+    accounts = {}
+    for role in list(model["roles"]):
+        try:
+            email, password = session.credentials(role)
+        except session.SessionError as exc:
+            report.skipped_roles[role] = str(exc)
+            continue
+        accounts[role] = await _sign_in(pool, role, email, password)
+    if not accounts:
+        raise SetupError("No role of the traffic model has credentials: "
+                         + "; ".join(report.skipped_roles.values()))
+    account = next(iter(accounts.values()))
+    missing = await stack.missing_tables(pool, tables(model), headers={"Authorization": f"Bearer {account.token}"})
+    if missing:
+        raise SetupError(f"{report.base_url} does not expose {', '.join(missing)}: the local stack needs "
+                         "`stack up --schema <dump>` with the hosted project's schema")
+    car_ids = []
+    if any("{car_id}" in request for requests in model["requests"].values() for request in requests):
+        response = await pool.request("GET", "/rest/v1/cars?select=id&status=eq.available&limit=200")
+        if response.status == 200:
+            car_ids = [row["id"] for row in response.json() if row.get("id") is not None]
+        if not car_ids:
+            raise SetupError(f"GET /rest/v1/cars returned {response.status} and no car ids for {{car_id}}")
+    return accounts, car_ids
+
+
+async def _request(pool, account, car_ids, template, report):
+    method, _, path = template.partition(" ")
+    path = path.replace("{user_id}", account.user_id)
+    if "{car_id}" in path:
+        path = path.replace("{car_id}", str(random.choice(car_ids)))
+    name = waterfall.endpoint(method, report.base_url + path)
+    headers = {"Authorization": f"Bearer {account.token}"}
+    body = None
+    if path.startswith("/auth/v1/token"):
+        body = {"email": account.email, "password": account.password}
+    started = time.monotonic()
+    try:
+        response = await pool.request(method, path, json_body=body, headers=headers)
+    except (OSError, asyncio.TimeoutError, HttpError, ValueError) as exc:
+        report.record(name, started, error=type(exc).__name__ if not str(exc) else str(exc))
+        return
+    report.record(name, started, status=response.status)
+    if body is not None and response.status == 200:
+        account.token = response.json()["access_token"]
+
+
+async def _session(pool, model, account, car_ids, think_time, deadline, report):
+    role = model["roles"][account.role]
+    report.sessions[account.role] += 1
+    report.active += 1
+    report.peak_active = max(report.peak_active, report.active)
+    try:
+        page = _pick(role["entry"])
+        while True:
+            report.page_views[account.role][page] += 1
+            await asyncio.gather(*(
+                _request(pool, account, car_ids, template, report) for template in model["requests"][page]
+            ))
+            page = _pick(role["transitions"][page])
+            if page == EXIT_STATE or time.monotonic() >= deadline:
+                return
+            await asyncio.sleep(random.uniform(*think_time))
+    finally:
+        report.active -= 1
+
+
+def _pick(weights):
+    return random.choices(list(weights), list(weights.values()))[0]
+
+
+async def run_traffic(model=None, rps=20.0, duration=60.0, think_time=(1.0, 3.0), base_url=None,
+                      connections=50):
+    """Replay ``model`` (default: :func:`build_model`) at ``rps`` requests per second."""
+    if rps <= 0:
+        raise ValueError("The target rate must be positive")
+    model = model or build_model()
+    base_url = base_url or config.SUPABASE_URL
+    anon_key = config.SUPABASE_ANON_KEY or stack.api_key("anon")
+    report = TrafficReport(base_url.rstrip("/"), rps, model)
+    async with ConnectionPool(base_url, size=connections, headers={"apikey": anon_key}) as pool:
+        try:
+            accounts, car_ids = await _prepare(pool, model, report)
+        except OSError as exc:
+            raise SetupError(f"Cannot reach {base_url}: {exc}") from exc
+        shares = {role: model["roles"][role]["share"] for role in accounts}
+        total = sum(shares.values())
+        per_session = sum(model["roles"][role]["requests_per_session"] * share / total
+                          for role, share in shares.items())
+        arrivals = rps / per_session
+        # Sessions take a while to reach the steady-state mix; measure after
+        # about one session length
+        report.warmup = sum(model["roles"][role]["pages_per_session"] * share / total
+                            for role, share in shares.items()) * sum(think_time) / 2
+
+        report.started = time.monotonic() + report.warmup
+        deadline = report.started + duration
+        sessions = set()
+        while True:
+            await asyncio.sleep(random.expovariate(arrivals))
+            if time.monotonic() >= deadline:
+                break
+            account = accounts[_pick(shares)]
+            task = asyncio.ensure_future(_session(pool, model, account, car_ids, think_time, deadline, report))
+            sessions.add(task)
+            task.add_done_callback(sessions.discard)
+        # Sessions stop at their next page once the deadline passed
+        await asyncio.gather(*sessions)
+        # Every counted request started before the deadline
+        report.finished = deadline
+    return report
@@ -0,0 +1,212 @@
+"""Web Vitals capture and per-page budgets for harness runs.
+
+An init script installed on every context registers PerformanceObservers
+for LCP, FCP, CLS, event timing (INP) and long tasks and reads TTFB from
+the navigation entry. Metrics are kept per *navigation*: a document load
+or a react-router route change (pushState/replaceState/popstate). The
+page pushes a snapshot to Python after every observer callback, so
+nothing is lost when the script closes its context.
+
+Budgets live in ``vitals_budgets.json``: a ``default`` entry plus entries
+keyed by route pattern (``/katalog``, ``/mobil/*``). A case whose pages
+exceed a budget fails even if its own assertions passed.
+"""
+import fnmatch
+import json
+from urllib.parse import urlsplit
+
+from . import config
+
+METRICS = ("ttfb", "fcp", "lcp", "cls", "inp", "long_tasks", "long_task_ms")
+
+INIT_SCRIPT = """
+(() => {
+  if (window.__harnessVitals) return;
+  const origin = performance.timeOrigin;
+  let seq = 0;
+  let current;
+
+  const start = (soft) => {
+    current = {
+      id: `${origin}:${seq++}`, url: location.href, soft,
+      started: performance.now(),
+      ttfb: null, fcp: null, lcp: null, cls: 0, inp: null,
+      long_tasks: 0, long_task_ms: 0,
+      _window: 0, _windowStart: 0, _last: 0,
+    };
+  };
+  const send = () => {
+    const { _window, _windowStart, _last, ...snapshot } = current;
+    try { window.__harnessReportVitals(snapshot); } catch (e) {}
+  };
+  const observe = (type, handle, extra = {}) => {
+    try {
+      new PerformanceObserver((list) => {
+        list.getEntries().forEach(handle);
+        send();
+      }).observe({ type, buffered: true, ...extra });
+    } catch (e) { /* entry type not supported */ }
+  };
+
+  start(false);
+  window.__harnessVitals = () => current;
+
+  const nav = performance.getEntriesByType('navigation')[0];
+  if (nav) current.ttfb = Math.max(nav.responseStart - (nav.activationStart || 0), 0);
+
+  observe('paint', (e) => {
+    if (e.name === 'first-contentful-paint' && !current.soft) current.fcp = e.startTime;
+  });
+  // LCP is only defined for hard navigations
+  observe('largest-contentful-paint', (e) => { if (!current.soft) current.lcp = e.startTime; });
+  observe('layout-shift', (e) => {
+    if (e.hadRecentInput) return;
+    // Session windows: gaps < 1s, windows < 5s; CLS is the largest window
+    const t = e.startTime;
+    if (current._window && t - current._last < 1000 && t - current._windowStart < 5000) {
+      current._window += e.value;
+    } else {
+      current._window = e.value;
+      current._windowStart = t;
+    }
+    current._last = t;
+    current.cls = Math.max(current.cls, current._window);
+  });
+  observe('event', (e) => {
+    if (!e.interactionId) return;
+    current.inp = Math.max(current.inp || 0, e.duration);
+  }, { durationThreshold: 16 });
+  observe('longtask', (e) => {
+    current.long_tasks += 1;
+    current.long_task_ms += e.duration;
+  });
+
+  // react-router navigations do not reload the document: start a new record
+  const routeChanged = () => {
+    if (location.href === current.url) return;
+    send();
+    start(true);
+    send();
+  };
+  for (const method of ['pushState', 'replaceState']) {
+    const original = history[method];
+    history[method] = function (...args) {
+      const result = original.apply(this, args);
+      routeChanged();
+      return result;
+    };
+  }
+  window.addEventListener('popstate', routeChanged);
+  send();
+})();
+"""
+
+
+def load_budgets(path=None):
+    path = path or config.VITALS_BUDGETS_PATH
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def budget_for(budgets, url):
+    """Merge the default budget with every route pattern matching ``url``."""
+    path = urlsplit(url).path or "/"
+    budget = dict(budgets.get("default", {}))
+    for pattern, limits in budgets.items():
+        if pattern != "default" and fnmatch.fnmatchcase(path, pattern):
+            budget.update(limits)
+    return budget
+
+
+def violations(navigations, budgets):
+    """Human-readable budget breaches across ``navigations``."""
+    breaches = []
+    for navigation in navigations:
+        budget = budget_for(budgets, navigation["url"])
+        for metric, limit in budget.items():
+            value = navigation.get(metric)
+            if value is not None and value > limit:
+                breaches.append(
+                    f"{urlsplit(navigation['url']).path or '/'} {metric.upper()} "
+                    f"{_format(metric, value)} > {_format(metric, limit)}"
+                )
+    return breaches
+
+
+def _format(metric, value):
+    if metric == "cls":
+        return f"{value:.3f}"
+    if metric == "long_tasks":
+        return str(int(value))
+    return f"{value:.0f}ms"
+
+
+def _navigation_order(navigation):
+    origin, seq = navigation["id"].rsplit(":", 1)
+    return float(origin), int(seq)
+
+
+class Collector:
+    """Latest snapshot per navigation for the contexts of one case."""
+
+    def __init__(self):
+        self._records = {}
+
+    def _report(self, source, snapshot):
+        self._records[snapshot["id"]] = snapshot
+
+    async def install(self, context):
+        await context.expose_binding("__harnessReportVitals", self._report)
+        await context.add_init_script(INIT_SCRIPT)
+
+    def navigations(self):
+        return sorted(self._records.values(), key=_navigation_order)
+
+
+class VitalsPlugin:
+    """Runner plugin: collect Web Vitals per case and enforce budgets."""
+
+    def __init__(self, budgets=None, enforce=True):
+        self.budgets = load_budgets() if budgets is None else budgets
+        self.enforce = enforce
+        self._collectors = {}
+
+    async def on_context(self, context, api):
+        collector = self._collectors.setdefault(id(api), Collector())
+        await collector.install(context)
+
+    async def after_case(self, api, result):
+        collector = self._collectors.pop(id(api), None)
+        if collector is None or result.skipped:
+            return
+        navigations = collector.navigations()
+        result.details["vitals"] = navigations
+        _export(result.id, navigations)
+        if not self.enforce or not result.passed:
+            return
+        breaches = violations(navigations, self.budgets)
+        if breaches:
+            result.passed = False
+            result.error = "Web Vitals budget exceeded: " + "; ".join(breaches)
+
+
+def _export(case_id, navigations):
+    directory = config.OUTPUT_DIR / "vitals"
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{case_id}.json"
+    path.write_text(json.dumps(navigations, indent=2), encoding="utf-8")
+    return path
+
+
+def format_vitals(results):
+    lines = []
+    for result in results:
+        for navigation in result.details.get("vitals", []):
+            values = "  ".join(
+                f"{metric}={_format(metric, navigation[metric])}"
+                for metric in METRICS
+                if navigation.get(metric) is not None
+            )
+            lines.append(f"  {result.id}  {urlsplit(navigation['url']).path or '/':<24} {values}")
+    return "\n".join(["Web Vitals per navigation:", *lines]) if lines else ""
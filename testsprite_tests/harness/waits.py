@@ -0,0 +1,162 @@
+"""Event-driven waits used by the TC scripts instead of fixed sleeps.
+
+The generated scripts slept ``page.wait_for_timeout(3000)`` before every
+click and fill. These helpers wait for what the sleep was standing in
+for -- the target element becoming actionable, in-flight Supabase calls
+draining and React finishing its DOM updates -- and return as soon as
+that has happened. Every wait is bounded by a hard timeout.
+"""
+import asyncio
+import re
+import time
+import weakref
+
+from playwright import async_api
+
+from . import config, memory, timing
+
+# Quiet period (ms) after the last DOM mutation / request before we move on
+DOM_QUIET_MS = 150
+NETWORK_IDLE_MS = 250
+
+_SUPABASE = re.compile(config.SUPABASE_URL_PATTERN)
+
+_SETTLE_SCRIPT = """
+({ quietMs, timeoutMs }) => new Promise((resolve) => {
+    let quiet;
+    const finish = (settled) => {
+        observer.disconnect();
+        clearTimeout(quiet);
+        clearTimeout(hard);
+        resolve(settled);
+    };
+    const observer = new MutationObserver(() => {
+        clearTimeout(quiet);
+        quiet = setTimeout(() => finish(true), quietMs);
+    });
+    observer.observe(document.documentElement || document, {
+        subtree: true, childList: true, attributes: true, characterData: true,
+    });
+    quiet = setTimeout(() => finish(true), quietMs);
+    const hard = setTimeout(() => finish(false), timeoutMs);
+})
+"""
+
+_trackers = weakref.WeakKeyDictionary()
+
+_SELECTOR = re.compile(r"selector='(.*)'>$")
+
+
+def describe(locator):
+    """Short label for ``locator``: its selector rather than the full repr."""
+    match = _SELECTOR.search(repr(locator))
+    return match.group(1) if match else str(locator)
+
+
+class _RequestTracker:
+    """Counts in-flight requests on a page that match the Supabase pattern."""
+
+    def __init__(self, page, pattern):
+        self.pattern = pattern
+        self.inflight = set()
+        # No traffic seen yet: an untouched page counts as idle straight away
+        self.last_activity = 0.0
+        self.idle = asyncio.Event()
+        self.idle.set()
+        page.on("request", self._started)
+        page.on("requestfinished", self._finished)
+        page.on("requestfailed", self._finished)
+
+    def _started(self, request):
+        if self.pattern.search(request.url):
+            self.inflight.add(request)
+            self.last_activity = time.monotonic()
+            self.idle.clear()
+
+    def _finished(self, request):
+        if request in self.inflight:
+            self.inflight.discard(request)
+            self.last_activity = time.monotonic()
+            if not self.inflight:
+                self.idle.set()
+
+
+def track(page, pattern=None):
+    """Start counting Supabase requests on ``page`` (idempotent)."""
+    tracker = _trackers.get(page)
+    if tracker is None:
+        tracker = _RequestTracker(page, re.compile(pattern) if pattern else _SUPABASE)
+        _trackers[page] = tracker
+    return tracker
+
+
+async def for_locator(locator, state="visible", timeout=None):
+    """Wait until ``locator`` reaches ``state``; raises on timeout."""
+    with timing.span("wait", f"{state}: {describe(locator)}"):
+        await locator.wait_for(state=state, timeout=timeout or config.WAIT_TIMEOUT)
+
+
+async def for_network_idle(page, idle_ms=NETWORK_IDLE_MS, timeout=None):
+    """Wait until no Supabase request has been in flight for ``idle_ms``.
+
+    Returns False if the hard timeout elapsed first.
+    """
+    with timing.span("wait", "network idle"):
+        return await _network_idle(track(page), idle_ms, timeout)
+
+
+async def _network_idle(tracker, idle_ms, timeout):
+    deadline = time.monotonic() + (timeout or config.WAIT_TIMEOUT) / 1000
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        if not tracker.idle.is_set():
+            try:
+                await asyncio.wait_for(tracker.idle.wait(), remaining)
+            except asyncio.TimeoutError:
+                return False
+            continue
+        quiet_for = time.monotonic() - tracker.last_activity
+        if quiet_for * 1000 >= idle_ms:
+            return True
+        await asyncio.sleep(min(idle_ms / 1000 - quiet_for, remaining))
+
+
+async def for_dom_settled(page, quiet_ms=DOM_QUIET_MS, timeout=None):
+    """Wait until the DOM has gone ``quiet_ms`` without mutations.
+
+    Returns False if the hard timeout elapsed first. A navigation while
+    waiting counts as settled: the next wait will observe the new page.
+    """
+    with timing.span("wait", "dom settle"):
+        try:
+            return await page.evaluate(
+                _SETTLE_SCRIPT,
+                {"quietMs": quiet_ms, "timeoutMs": timeout or config.WAIT_TIMEOUT},
+            )
+        except async_api.Error:
+            return True
+
+
+async def settle(page, timeout=None):
+    """Wait for Supabase traffic and DOM updates to quiesce (best effort)."""
+    timeout = timeout or config.WAIT_TIMEOUT
+    await for_network_idle(page, timeout=timeout)
+    await for_dom_settled(page, timeout=timeout)
+
+
+async def before_action(page, locator, timeout=None, label=None):
+    """Replacement for the fixed sleep before a click or fill.
+
+    Lets the page settle, then waits for ``locator`` to be visible. Only
+    the locator wait can fail; settling is bounded but never raises.
+    The action the caller performs next is timed as ``label`` (default:
+    the locator's selector) until its next harness call.
+    """
+    track(page)
+    await settle(page, timeout)
+    label = label or describe(locator)
+    await memory.sample_step(page, label)
+    await for_locator(locator, timeout=timeout)
+    timing.open_action(label)
@@ -0,0 +1,345 @@
+"""Per-navigation network waterfalls and round-trip findings.
+
+:class:`WaterfallPlugin` records every request the pages of a case make
+and files it under the navigation it belongs to: a document load or a
+react-router route change. Each request is grouped by the endpoint it
+hits: the table of a Supabase REST call (``GET cars``), an RPC, an auth
+or storage call, or an Express route with ids collapsed
+(``GET /api/cars/{id}``).
+
+Three patterns are flagged among the data requests (``fetch``/``xhr``)
+of each navigation:
+
+* serial chains: requests that each start within ``CHAIN_GAP_MS`` of
+  the previous one ending, so they ran one after another. The longest
+  chain and its cost are reported: one batched query or a
+  ``Promise.all`` would pay for the slowest request only;
+* N+1 fetches: ``N_PLUS_ONE`` or more different requests to the same
+  endpoint, typically one query per row of an earlier list;
+* duplicates: the same method, URL and body fetched more than once.
+
+Waterfalls are written to ``.harness/waterfall/<TC>.json`` and the text
+report lists the pages worth batching first. Nothing is failed.
+"""
+import asyncio
+import hashlib
+import json
+import re
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+from playwright import async_api
+
+from . import config
+from .tasks import spawn
+
+DATA_TYPES = ("fetch", "xhr")
+
+# A request starting this soon after another ended probably waited for it
+CHAIN_GAP_MS = 100
+MIN_CHAIN = 3
+N_PLUS_ONE = 5
+
+BAR_WIDTH = 40
+
+_SUPABASE = re.compile(config.SUPABASE_URL_PATTERN)
+_SERVICE = re.compile(r"^/(rest|auth|storage|functions)/v1/(.*)$")
+_ID = re.compile(r"^(\d+|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})$", re.I)
+
+
+def endpoint(method, url):
+    """Group key of a request: Supabase table/RPC/service or a path with ids collapsed."""
+    parts = urlsplit(url)
+    match = _SERVICE.match(parts.path)
+    if match and _SUPABASE.search(url):
+        service, rest = match.groups()
+        if service == "rest":
+            return f"{method} rpc {rest[4:]}" if rest.startswith("rpc/") else f"{method} {rest.split('/')[0]}"
+        if service == "storage":
+            # /storage/v1/object/public/<bucket>/...
+            segments = rest.split("/")
+            return f"{method} storage {segments[2] if len(segments) > 2 else rest}"
+        return f"{method} {service} {rest}"
+    path = "/".join("{id}" if _ID.match(segment) else segment for segment in parts.path.split("/"))
+    return f"{method} {parts.netloc}{path}"
+
+
+def _now_ms():
+    return time.time() * 1000
+
+
+class _Navigation:
+    def __init__(self, url, started, soft):
+        self.url = url
+        self.started = started
+        self.soft = soft
+        # A document load is committed once the main frame navigates
+        self.committed = soft
+        self.requests = []
+
+
+class _Recorder:
+    """Navigations and their requests for the pages of one case."""
+
+    def __init__(self):
+        self.navigations = []
+        self._current = {}  # page -> _Navigation
+        self._open = {}  # request -> (navigation, row)
+
+    def _page(self, request):
+        try:
+            return request.frame.page
+        except async_api.Error:
+            return None  # service worker requests have no frame
+
+    def _start(self, page, url, soft):
+        navigation = _Navigation(url, _now_ms(), soft)
+        self.navigations.append(navigation)
+        self._current[page] = navigation
+        return navigation
+
+    def navigated(self, page, frame):
+        if frame.parent_frame is not None:
+            return
+        navigation = self._current.get(page)
+        if navigation is not None and not navigation.committed:
+            navigation.committed = True
+            navigation.url = frame.url  # after redirects
+        elif navigation is None or navigation.url != frame.url:
+            self._start(page, frame.url, soft=True)
+
+    def request(self, request):
+        page = self._page(request)
+        if page is None:
+            return
+        if request.is_navigation_request() and request.frame.parent_frame is None:
+            navigation = self._start(page, request.url, soft=False)
+        else:
+            navigation = self._current.get(page) or self._start(page, page.url, soft=True)
+        row = {
+            "method": request.method,
+            "url": request.url,
+            "endpoint": endpoint(request.method, request.url),
+            "type": request.resource_type,
+            "start": _now_ms(),
+            "end": None,
+            "status": None,
+            "failure": None,
+            "body": hashlib.sha1(request.post_data_buffer or b"").hexdigest()[:12],
+        }
+        navigation.requests.append(row)
+        self._open[request] = (navigation, row)
+
+    async def finished(self, request, failure=None):
+        navigation, row = self._open.pop(request, (None, None))
+        if row is None:
+            return
+        row["end"] = _now_ms()
+        row["failure"] = failure
+        try:
+            timing = request.timing
+            if failure is None:
+                response = await request.response()
+                row["status"] = response.status if response else None
+        except async_api.Error:
+            timing = {}
+        # Browser timings are more precise than event delivery when available
+        if timing.get("startTime", -1) > 0 and timing.get("responseEnd", -1) >= 0:
+            row["start"] = timing["startTime"]
+            row["end"] = timing["startTime"] + timing["responseEnd"]
+        if row["type"] == "document" and not navigation.soft and row is navigation.requests[0]:
+            navigation.started = min(navigation.started, row["start"])
+
+    def close_open(self):
+        for navigation, row in self._open.values():
+            row["end"] = row["end"] or _now_ms()
+            row["failure"] = row["failure"] or "unfinished"
+        self._open.clear()
+
+
+# ------------------------------------------------------------------ analysis
+
+def _is_data(row):
+    return row["type"] in DATA_TYPES
+
+
+def serial_chain(rows, gap=CHAIN_GAP_MS):
+    """Longest run of requests where each started within ``gap`` ms after the previous ended."""
+    ordered = sorted((row for row in rows if row["end_ms"] is not None), key=lambda row: row["start_ms"])
+    best = [[row] for row in ordered]
+    for index, row in enumerate(ordered):
+        for previous in range(index):
+            before = ordered[previous]
+            if before["end_ms"] <= row["start_ms"] <= before["end_ms"] + gap \
+                    and len(best[previous]) + 1 > len(best[index]):
+                best[index] = best[previous] + [row]
+    return max(best, key=len, default=[])
+
+
+def findings(requests):
+    """Serial chain, N+1 and duplicate findings for the requests of one navigation."""
+    data = [row for row in requests if _is_data(row)]
+    found = {"chain": None, "n_plus_one": [], "duplicates": []}
+
+    chain = serial_chain(data)
+    if len(chain) >= MIN_CHAIN:
+        elapsed = chain[-1]["end_ms"] - chain[0]["start_ms"]
+        slowest = max(row["end_ms"] - row["start_ms"] for row in chain)
+        found["chain"] = {
+            "length": len(chain),
+            "elapsed_ms": round(elapsed, 1),
+            # Time saved if its requests ran in parallel
+            "saving_ms": round(max(0.0, elapsed - slowest), 1),
+            "endpoints": [row["endpoint"] for row in chain],
+        }
+
+    urls = defaultdict(set)
+    for row in data:
+        urls[row["endpoint"]].add(row["url"])
+    found["n_plus_one"] = [
+        {"endpoint": name, "requests": sum(row["endpoint"] == name for row in data), "distinct": len(distinct)}
+        for name, distinct in sorted(urls.items(), key=lambda item: -len(item[1]))
+        if len(distinct) >= N_PLUS_ONE
+    ]
+
+    repeats = Counter((row["method"], row["url"], row["body"]) for row in data)
+    found["duplicates"] = [
+        {"method": method, "url": url, "count": count}
+        for (method, url, _), count in repeats.most_common() if count > 1
+    ]
+    return found
+
+
+def flags(found):
+    """Human-readable lines for :func:`findings`."""
+    lines = []
+    chain = found["chain"]
+    if chain:
+        lines.append(f"serial chain of {chain['length']} requests over {chain['elapsed_ms']:.0f}ms "
+                     f"(~{chain['saving_ms']:.0f}ms if parallel): {' -> '.join(chain['endpoints'])}")
+    for row in found["n_plus_one"]:
+        lines.append(f"N+1: {row['endpoint']} {row['requests']}x ({row['distinct']} distinct URLs)")
+    for row in found["duplicates"]:
+        lines.append(f"duplicate: {row['method']} {_short(row['url'])} {row['count']}x")
+    return lines
+
+
+def _short(url, width=90):
+    parts = urlsplit(url)
+    text = parts.path + (f"?{parts.query}" if parts.query else "")
+    return text if len(text) <= width else text[:width - 3] + "..."
+
+
+def _export_navigation(navigation):
+    origin = navigation.started
+    requests = []
+    for row in navigation.requests:
+        requests.append({
+            **{key: row[key] for key in ("method", "url", "endpoint", "type", "status", "failure")},
+            "start_ms": round(max(0.0, row["start"] - origin), 1),
+            "end_ms": round(max(0.0, row["end"] - origin), 1) if row["end"] is not None else None,
+            "body": row["body"],
+        })
+    requests.sort(key=lambda row: row["start_ms"])
+    data = [row for row in requests if _is_data(row)]
+    by_endpoint = Counter(row["endpoint"] for row in data)
+    return {
+        "url": navigation.url,
+        "path": urlsplit(navigation.url).path or "/",
+        "soft": navigation.soft,
+        "requests": requests,
+        "data_requests": len(data),
+        "by_endpoint": dict(by_endpoint.most_common()),
+        "findings": findings(requests),
+    }
+
+
+# -------------------------------------------------------------------- plugin
+
+class WaterfallPlugin:
+    """Runner plugin recording a request waterfall per navigation."""
+
+    def __init__(self):
+        self._recorders = {}
+        self._pending = set()
+
+    async def on_context(self, context, api):
+        recorder = self._recorders.setdefault(id(api), _Recorder())
+
+        def watch(page):
+            page.on("framenavigated", lambda frame: recorder.navigated(page, frame))
+
+        for page in context.pages:
+            watch(page)
+        context.on("page", watch)
+        context.on("request", recorder.request)
+        context.on("requestfinished", lambda request: spawn(recorder.finished(request), self._pending))
+        context.on("requestfailed",
+                   lambda request: spawn(recorder.finished(request, request.failure), self._pending))
+
+    async def after_case(self, api, result):
+        recorder = self._recorders.pop(id(api), None)
+        if recorder is None or result.skipped:
+            return
+        # Let requestfinished handlers still in flight fill in their timings
+        await asyncio.gather(*list(self._pending), return_exceptions=True)
+        recorder.close_open()
+        navigations = [_export_navigation(navigation) for navigation in recorder.navigations
+                       if navigation.requests]
+        result.details["waterfall"] = navigations
+        _export(result.id, navigations)
+
+
+def _export(case_id, navigations):
+    directory = config.OUTPUT_DIR / "waterfall"
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{case_id}.json"
+    path.write_text(json.dumps(navigations, indent=2), encoding="utf-8")
+    return path
+
+
+# -------------------------------------------------------------------- report
+
+def format_waterfall_chart(navigation, width=BAR_WIDTH):
+    """Text waterfall of the data requests of one exported navigation."""
+    rows = [row for row in navigation["requests"] if _is_data(row) and row["end_ms"] is not None]
+    if not rows:
+        return ""
+    span = max(row["end_ms"] for row in rows) or 1
+    lines = []
+    for row in rows:
+        first = int(width * row["start_ms"] / span)
+        last = max(first + 1, round(width * row["end_ms"] / span))
+        bar = " " * first + "#" * (last - first)
+        status = row["status"] if row["failure"] is None else "failed"
+        lines.append(f"    {row['start_ms']:>7.0f}ms |{bar:<{width}}| {row['end_ms'] - row['start_ms']:>6.0f}ms  "
+                     f"{row['endpoint']} [{status}]")
+    return "\n".join(lines)
+
+
+def _cost(navigation):
+    found = navigation["findings"]
+    wasted = sum(row["requests"] - 1 for row in found["n_plus_one"])
+    wasted += sum(row["count"] - 1 for row in found["duplicates"])
+    return (found["chain"]["saving_ms"] if found["chain"] else 0.0), wasted
+
+
+def format_waterfall(results):
+    pages = []
+    for result in results:
+        for navigation in result.details.get("waterfall", []):
+            if flags(navigation["findings"]):
+                pages.append((result.id, navigation))
+    if not pages:
+        return ""
+    # Largest serial cost first, then most avoidable round trips
+    pages.sort(key=lambda item: _cost(item[1]), reverse=True)
+    lines = ["Pages to batch (serial chains, N+1 and duplicate fetches):"]
+    for case_id, navigation in pages:
+        saving, wasted = _cost(navigation)
+        lines.append(f"  {case_id} {navigation['path']}  {navigation['data_requests']} data requests, "
+                     f"~{saving:.0f}ms serial, {wasted} avoidable round trips")
+        lines += [f"    - {flag}" for flag in flags(navigation["findings"])]
+        lines.append(format_waterfall_chart(navigation))
+    return "\n".join(lines)
@@ -0,0 +1,164 @@
+"""Minimal asyncio WebSocket client (RFC 6455).
+
+Just enough for the chat benchmark: the opening handshake, masked text
+frames out, text/binary messages in (fragments reassembled), automatic
+pong replies and the closing handshake. Like :mod:`harness.httpclient`
+it avoids a dependency the harness would only need for one mode.
+"""
+import asyncio
+import base64
+import hashlib
+import os
+import ssl
+import struct
+from urllib.parse import urlsplit
+
+_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+_CONTINUATION, _TEXT, _BINARY, _CLOSE, _PING, _PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+
+
+class WebSocketError(RuntimeError):
+    pass
+
+
+class ConnectionClosed(WebSocketError):
+    def __init__(self, code=1006, reason=""):
+        super().__init__(f"WebSocket closed ({code}{': ' + reason if reason else ''})")
+        self.code = code
+        self.reason = reason
+
+
+def _mask(payload, key):
+    if not payload:
+        return payload
+    repeated = (key * (len(payload) // 4 + 1))[:len(payload)]
+    masked = int.from_bytes(payload, "big") ^ int.from_bytes(repeated, "big")
+    return masked.to_bytes(len(payload), "big")
+
+
+class WebSocket:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.closed = None  # ConnectionClosed once either side closed
+        self._send_lock = asyncio.Lock()
+
+    async def _write_frame(self, opcode, payload):
+        head = bytes([0x80 | opcode])
+        length = len(payload)
+        if length < 126:
+            head += bytes([0x80 | length])
+        elif length < 1 << 16:
+            head += bytes([0x80 | 126]) + struct.pack("!H", length)
+        else:
+            head += bytes([0x80 | 127]) + struct.pack("!Q", length)
+        key = os.urandom(4)
+        async with self._send_lock:
+            self.writer.write(head + key + _mask(payload, key))
+            await self.writer.drain()
+
+    async def send(self, message):
+        if self.closed:
+            raise self.closed
+        if isinstance(message, str):
+            await self._write_frame(_TEXT, message.encode("utf-8"))
+        else:
+            await self._write_frame(_BINARY, bytes(message))
+
+    async def _read_frame(self):
+        first, second = await self.reader.readexactly(2)
+        length = second & 0x7F
+        if length == 126:
+            length, = struct.unpack("!H", await self.reader.readexactly(2))
+        elif length == 127:
+            length, = struct.unpack("!Q", await self.reader.readexactly(8))
+        key = await self.reader.readexactly(4) if second & 0x80 else None
+        payload = await self.reader.readexactly(length)
+        return bool(first & 0x80), first & 0x0F, _mask(payload, key) if key else payload
+
+    async def recv(self):
+        """Next text (``str``) or binary (``bytes``) message; raises :class:`ConnectionClosed`."""
+        if self.closed:
+            raise self.closed
+        opcode, parts = None, []
+        while True:
+            try:
+                final, frame_opcode, payload = await self._read_frame()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                self.closed = ConnectionClosed()
+                raise self.closed from None
+            if frame_opcode == _PING:
+                await self._write_frame(_PONG, payload)
+                continue
+            if frame_opcode == _PONG:
+                continue
+            if frame_opcode == _CLOSE:
+                code = struct.unpack("!H", payload[:2])[0] if len(payload) >= 2 else 1005
+                self.closed = ConnectionClosed(code, payload[2:].decode("utf-8", "replace"))
+                try:
+                    await self._write_frame(_CLOSE, payload[:2])
+                except ConnectionError:
+                    pass
+                self.writer.close()
+                raise self.closed
+            if frame_opcode != _CONTINUATION:
+                opcode = frame_opcode
+            parts.append(payload)
+            if final:
+                message = b"".join(parts)
+                return message.decode("utf-8") if opcode == _TEXT else message
+
+    async def close(self, code=1000):
+        if self.closed is None:
+            self.closed = ConnectionClosed(code)
+            try:
+                await self._write_frame(_CLOSE, struct.pack("!H", code))
+            except ConnectionError:
+                pass
+        self.writer.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+async def connect(url, headers=None, timeout=10.0):
+    """Open a WebSocket to a ``ws://`` or ``wss://`` ``url``."""
+    parts = urlsplit(url)
+    secure = parts.scheme == "wss"
+    host = parts.hostname or "localhost"
+    port = parts.port or (443 if secure else 80)
+    target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    key = base64.b64encode(os.urandom(16)).decode("ascii")
+    head = {
+        "Host": parts.netloc or host,
+        "Upgrade": "websocket",
+        "Connection": "Upgrade",
+        "Sec-WebSocket-Key": key,
+        "Sec-WebSocket-Version": "13",
+        "User-Agent": "testsprite-harness",
+        **(headers or {}),
+    }
+    context = ssl.create_default_context() if secure else None
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port, ssl=context), timeout)
+    try:
+        request = [f"GET {target} HTTP/1.1"] + [f"{name}: {value}" for name, value in head.items()]
+        writer.write(("\r\n".join(request) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+        response = (await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout)).decode("latin-1")
+    except BaseException:
+        writer.close()
+        raise
+    status_line, *lines = response.split("\r\n")
+    received = {}
+    for line in lines:
+        name, _, value = line.partition(":")
+        received[name.strip().lower()] = value.strip()
+    expected = base64.b64encode(hashlib.sha1((key + _GUID).encode("ascii")).digest()).decode("ascii")
+    if status_line.split(" ")[1:2] != ["101"] or received.get("sec-websocket-accept") != expected:
+        writer.close()
+        raise WebSocketError(f"Handshake with {parts.netloc}{parts.path} failed: {status_line}")
+    return WebSocket(reader, writer)
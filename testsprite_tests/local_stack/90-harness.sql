@@ -0,0 +1,76 @@
+-- Applied after backend/migrations and any --schema dumps.
+
+-- AuthContext loads the profile with users.auth_user_id = <auth user id>.
+-- Without a dump of the hosted schema, serve it from the migration's "Users".
+DO $$
+BEGIN
+  IF to_regclass('public.users') IS NULL THEN
+    CREATE VIEW public.users AS
+      SELECT id, id AS auth_user_id, username, email, "fullName" AS full_name,
+             "phoneNumber" AS phone_number, address, role, "profilePicture" AS profile_picture,
+             "isVerified" AS is_verified, "isActive" AS is_active,
+             CASE WHEN "isActive" THEN 'active' ELSE 'suspended' END AS account_status,
+             "lastLogin" AS last_login, "createdAt" AS created_at, "updatedAt" AS updated_at
+      FROM "Users";
+    GRANT ALL ON public.users TO anon, authenticated, service_role;
+  END IF;
+END $$;
+
+-- Accounts behind the auth stub: the migration's "Users" rows (bcrypt passwords)
+CREATE SCHEMA IF NOT EXISTS harness;
+GRANT USAGE ON SCHEMA harness TO service_role;
+
+CREATE OR REPLACE FUNCTION harness.account(u "Users") RETURNS json LANGUAGE sql STABLE AS $$
+  SELECT json_build_object('id', u.id, 'email', u.email, 'username', u.username, 'role', u.role,
+                           'full_name', u."fullName", 'created_at', u."createdAt",
+                           'last_login', u."lastLogin")
+$$;
+
+CREATE OR REPLACE FUNCTION harness.sign_in(identifier text, secret text) RETURNS json
+LANGUAGE plpgsql SECURITY DEFINER AS $$
+DECLARE
+  found "Users";
+BEGIN
+  SELECT * INTO found FROM "Users"
+  WHERE (email = identifier OR username = identifier) AND "isActive" AND password = crypt(secret, password)
+  LIMIT 1;
+  IF found.id IS NULL THEN
+    RETURN NULL;
+  END IF;
+  UPDATE "Users" SET "lastLogin" = now() WHERE id = found.id;
+  RETURN harness.account(found);
+END $$;
+
+CREATE OR REPLACE FUNCTION harness.sign_up(email text, secret text, metadata json DEFAULT '{}') RETURNS json
+LANGUAGE plpgsql SECURITY DEFINER AS $$
+DECLARE
+  created "Users";
+BEGIN
+  INSERT INTO "Users" (username, email, password, role, "fullName", "phoneNumber")
+  VALUES (coalesce(metadata ->> 'username', split_part(email, '@', 1)), email, crypt(secret, gen_salt('bf', 8)),
+          CASE WHEN metadata ->> 'role' = 'seller' THEN 'seller' ELSE 'buyer' END,
+          metadata ->> 'full_name', metadata ->> 'phone_number')
+  RETURNING * INTO created;
+  RETURN harness.account(created);
+EXCEPTION WHEN unique_violation THEN
+  RETURN NULL;
+END $$;
+
+CREATE OR REPLACE FUNCTION harness.get_user(id uuid) RETURNS json LANGUAGE sql STABLE SECURITY DEFINER AS $$
+  SELECT harness.account(u) FROM "Users" u WHERE u.id = get_user.id
+$$;
+
+-- Test accounts from the harness session roles; a no-op when they exist
+CREATE OR REPLACE FUNCTION harness.ensure_account(identifier text, secret text, account_role text) RETURNS void
+LANGUAGE sql SECURITY DEFINER AS $$
+  INSERT INTO "Users" (username, email, password, role, "fullName", "isVerified")
+  VALUES (split_part(identifier, '@', 1),
+          CASE WHEN identifier LIKE '%@%' THEN identifier ELSE identifier || '@local.test' END,
+          crypt(secret, gen_salt('bf', 8)), account_role, initcap(account_role) || ' (local)', true)
+  ON CONFLICT DO NOTHING
+$$;
+
+GRANT EXECUTE ON ALL FUNCTIONS IN SCHEMA harness TO service_role;
+REVOKE EXECUTE ON ALL FUNCTIONS IN SCHEMA harness FROM PUBLIC;
+
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,39 @@
+import numpy as np
+
+from harness import emi
+
+
+def _row(inputs):
+    return dict(zip(emi.OUTPUTS, emi.oracle(np.array([inputs], dtype=float))[0].tolist()))
+
+
+def test_oracle_matches_the_tc009_form():
+    row = _row(emi.TC009_CASE)
+    assert row["cicilanPerBulan"] == emi.TC009_INSTALLMENT
+    assert row["totalBayar"] == 241_182_112
+    assert row["totalBunga"] == 41_182_112   # "Rp 41.182.112" in the TC009 plan
+    assert row["biayaTambahan"] == 0
+    assert row["bulan"] == 48
+    assert row["sisaAkhir"] == 0
+    # The schedule rounds every month, so it may drift by a rupiah from the totals
+    assert abs(row["totalPokok"] - 200_000_000) <= 1
+    assert abs(row["totalBungaJadwal"] - row["totalBunga"]) <= 1
+
+
+def test_oracle_fees():
+    price, down_payment, tenor, rate = emi.TC009_CASE[:4]
+    row = _row((price, down_payment, tenor, rate, 1, 500_000, 1.5))
+    assert row["biayaTambahan"] == emi.INSURANCE_FEE + 500_000 + 0.015 * price
+    assert row["cicilanPerBulan"] == emi.TC009_INSTALLMENT
+
+
+def test_batch_rows_match_single_rows():
+    inputs = emi.generate(20, seed=3)
+    batch = emi.oracle(inputs)
+    assert batch[0][0] == emi.TC009_INSTALLMENT
+    for index in (1, 7, 20):
+        assert batch[index].tolist() == emi.oracle(inputs[index:index + 1])[0].tolist()
+
+
+def test_js_round_rounds_halves_up():
+    assert emi.js_round(np.array([0.5, 1.5, 2.5, -0.5, -1.5])).tolist() == [1, 2, 3, 0, -1]
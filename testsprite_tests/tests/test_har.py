@@ -0,0 +1,58 @@
+import json
+
+from harness.har import HarIndex, case_files
+
+
+def _entry(url, body, method="GET"):
+    return {"request": {"method": method, "url": url}, "response": {"status": 200, "content": {"text": body}}}
+
+
+def _body(entry):
+    return entry["response"]["content"]["text"]
+
+
+def test_lookup_replays_repeated_requests_in_recorded_order():
+    index = HarIndex()
+    for body in ("first", "second"):
+        index.add(_entry("https://x.supabase.co/rest/v1/cars?id=eq.1", body))
+
+    url = "https://x.supabase.co/rest/v1/cars?id=eq.1"
+    assert [_body(index.lookup("get", url)) for _ in range(3)] == ["first", "second", "second"]
+    assert index.hits == 3
+
+
+def test_lookup_falls_back_to_the_path_without_query():
+    index = HarIndex()
+    index.add(_entry("https://x.supabase.co/rest/v1/cars?created_at=gte.1700000000", "recorded"))
+
+    entry = index.lookup("GET", "https://x.supabase.co/rest/v1/cars?created_at=gte.1800000000")
+    assert _body(entry) == "recorded"
+    assert index.lookup("POST", "https://x.supabase.co/rest/v1/cars") is None
+
+
+def test_entry_served_by_exact_url_is_not_replayed_by_path():
+    index = HarIndex()
+    index.add(_entry("https://x.supabase.co/rest/v1/cars?page=1", "page 1"))
+    index.add(_entry("https://x.supabase.co/rest/v1/cars?page=2", "page 2"))
+
+    assert _body(index.lookup("GET", "https://x.supabase.co/rest/v1/cars?page=1")) == "page 1"
+    # A query string that was never recorded gets the next unused entry of the path
+    assert _body(index.lookup("GET", "https://x.supabase.co/rest/v1/cars?page=3")) == "page 2"
+    assert len(index) == 2
+
+
+def test_load_reads_every_file(tmp_path):
+    for name, body in (("TC005.har", "a"), ("TC005-2.har", "b")):
+        log = {"log": {"entries": [_entry(f"https://x.supabase.co/rest/v1/{body}", body)]}}
+        (tmp_path / name).write_text(json.dumps(log), encoding="utf-8")
+
+    index = HarIndex.load(case_files(tmp_path, "TC005"))
+    assert len(index) == 2
+    assert _body(index.lookup("GET", "https://x.supabase.co/rest/v1/b")) == "b"
+
+
+def test_case_files_orders_contexts_numerically(tmp_path):
+    for name in ("TC005-10.har", "TC005-2.har", "TC005.har", "TC005-x.har", "TC0051.har"):
+        (tmp_path / name).write_text("{}", encoding="utf-8")
+
+    assert [path.name for path in case_files(tmp_path, "TC005")] == ["TC005.har", "TC005-2.har", "TC005-10.har"]
@@ -0,0 +1,25 @@
+from harness.history import MIN_DELTA_MS, THRESHOLD, _is_regression
+
+
+def _check(value, baseline):
+    return _is_regression(value, baseline, THRESHOLD, MIN_DELTA_MS)
+
+
+def test_needs_enough_baseline_samples():
+    assert not _check(5000, [1000, 1000])
+
+
+def test_small_changes_are_ignored():
+    # Within 20% of the median, and under the absolute floor on a fast step
+    assert not _check(1150, [1000, 1000, 1000])
+    assert not _check(140, [100, 100, 100])
+
+
+def test_stable_baseline_flags_a_clear_slowdown():
+    assert _check(1300, [1000, 1000, 1000])
+
+
+def test_noisy_baseline_needs_an_outlier():
+    baseline = [1000, 1400, 800, 1300, 900]
+    assert not _check(1300, baseline)
+    assert _check(4000, baseline)
@@ -0,0 +1,60 @@
+from harness.impact import SourceMap, _decode_vlq, repo_path, select
+
+
+def test_decode_vlq():
+    assert _decode_vlq("AAAA") == [0, 0, 0, 0]
+    assert _decode_vlq("AAgBC") == [0, 0, 16, 1]
+    assert _decode_vlq("D") == [-1]
+    assert _decode_vlq("2H") == [123]
+
+
+def test_source_map_lookup_is_relative_across_segments_and_lines():
+    source_map = SourceMap({
+        "sourceRoot": "webpack://mobilindo-frontend/",
+        "sources": ["./src/pages/Katalog.tsx", "./src/lib/supabase.ts"],
+        # line 0: column 0 -> source 0, column 5 -> source 1; line 1: column 0 -> still source 1
+        "mappings": "AAAA,KCAA;AAAA",
+    })
+    assert source_map.source_at(0, 3) == "webpack://mobilindo-frontend/./src/pages/Katalog.tsx"
+    assert source_map.source_at(0, 7).endswith("supabase.ts")
+    assert source_map.source_at(1, 0).endswith("supabase.ts")
+    assert source_map.source_at(9, 0) is None
+
+
+def test_repo_path():
+    assert repo_path("webpack://mobilindo-frontend/./src/pages/Katalog.tsx?abc") == "frontend/src/pages/Katalog.tsx"
+    assert repo_path("webpack://mobilindo-frontend/./node_modules/react/index.js") is None
+
+
+IMPACT_MAP = {
+    "cases": {
+        "TC005": {"files": ["frontend/src/pages/Katalog.tsx"], "routes": []},
+        "TC009": {"files": ["frontend/src/pages/Simulasi.tsx"], "routes": []},
+        "TC010": {"files": ["frontend/src/pages/Pembelian.tsx"], "routes": ["/api/transactions"]},
+    }
+}
+CASES = ["TC005", "TC009", "TC010", "TC011"]
+
+
+def test_select_maps_changed_files_to_cases():
+    selected, unmapped = select(["frontend/src/pages/Katalog.tsx", "README.md"], CASES, IMPACT_MAP)
+    # TC011 was never profiled, so it always runs
+    assert selected == {"TC005": ["frontend/src/pages/Katalog.tsx"], "TC011": ["not in impact map"]}
+    assert unmapped == ["README.md"]
+
+
+def test_select_global_backend_and_script_changes():
+    selected, _ = select(["backend/src/models/Car.js"], CASES, IMPACT_MAP)
+    assert set(selected) == {"TC010", "TC011"}
+
+    selected, _ = select(["testsprite_tests/TC009_Credit_Simulation_with_EMI_Calculation.py"], CASES, IMPACT_MAP)
+    assert set(selected) == {"TC009", "TC011"}
+
+    selected, _ = select(["frontend/src/App.tsx"], CASES, IMPACT_MAP)
+    assert set(selected) == set(CASES)
+
+
+def test_select_without_a_map_runs_everything():
+    selected, unmapped = select(["frontend/src/pages/Katalog.tsx"], CASES, {})
+    assert selected == {case_id: ["no impact map"] for case_id in CASES}
+    assert unmapped == []
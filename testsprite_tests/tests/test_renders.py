@@ -0,0 +1,45 @@
+from harness.renders import TOP, busiest_step, summarize
+
+
+def _commit(t, components, duration=2.0):
+    return {"t": t, "path": "/katalog", "duration": duration, "components": components}
+
+
+STARTS = [(1000.0, "click Katalog"), (2000.0, "fill search")]
+
+
+def test_commits_are_split_by_the_step_they_follow():
+    commits = [
+        _commit(500.0, {"App": [1, 3.0, 0, 0.0]}, duration=4.0),
+        _commit(1500.0, {"CarCard": [12, 6.0, 12, 6.0]}),
+        _commit(2100.0, {"CarCard": [12, 6.0, 12, 6.0], "SearchBox": [1, 0.5, 1, 0.5]}),
+        _commit(2500.0, {"CarCard": [12, 6.0, 12, 6.0]}),
+    ]
+    summary = summarize(commits, STARTS)
+    assert summary["commits"] == 4
+    assert summary["timed"]
+    assert [(step["step"], step["commits"], step["ms"]) for step in summary["steps"]] == [
+        ("load", 1, 4.0), ("click Katalog", 1, 2.0), ("fill search", 2, 4.0),
+    ]
+    assert summary["steps"][2]["updates"] == 25
+    # Mount-only components are not offenders
+    assert [row["component"] for row in summary["top"]] == ["CarCard", "SearchBox"]
+    assert summary["top"][0] == {"component": "CarCard", "renders": 36, "ms": 18.0, "updates": 36, "update_ms": 18.0}
+    assert busiest_step(summary)["step"] == "fill search"
+
+
+def test_steps_without_commits_are_left_out():
+    summary = summarize([_commit(2200.0, {"Chat": [1, 1.0, 1, 1.0]}, duration=None)], STARTS)
+    assert [step["step"] for step in summary["steps"]] == ["fill search"]
+    assert not summary["timed"]
+
+
+def test_top_is_capped_and_ordered_by_update_time():
+    components = {f"Row{index}": [1, 1.0, 1, float(index)] for index in range(TOP + 3)}
+    top = summarize([_commit(0.0, components)], [])["top"]
+    assert len(top) == TOP
+    assert top[0]["component"] == f"Row{TOP + 2}"
+
+
+def test_no_commits():
+    assert summarize([], STARTS) == {"commits": 0, "timed": False, "top": [], "steps": []}
@@ -0,0 +1,66 @@
+import asyncio
+
+from harness.runner import SkipCase, run_case
+
+
+class _Lease:
+    released = False
+
+    async def release(self):
+        self.released = True
+
+
+class _Pool:
+    def __init__(self):
+        self.leases = []
+
+    def lease(self, case):
+        self.leases.append(_Lease())
+        return self.leases[-1]
+
+
+class _Case:
+    id = "TC001"
+    name = "TC001_Case"
+
+    def __init__(self, error=None):
+        self.error = error
+
+    async def execute(self, api):
+        if self.error:
+            raise self.error
+
+
+class _Plugin:
+    def __init__(self, error=None):
+        self.error = error
+        self.seen = []
+
+    async def after_case(self, api, result):
+        self.seen.append(result.id)
+        if self.error:
+            raise self.error
+
+
+def _run(case, plugins=()):
+    pool = _Pool()
+    result = asyncio.run(run_case(pool, case, trace=False, plugins=plugins))
+    assert pool.leases[0].released
+    return result
+
+
+def test_outcomes():
+    assert _run(_Case()).status == "PASS"
+    failed = _run(_Case(AssertionError("price not shown")))
+    assert (failed.status, failed.error) == ("FAIL", "AssertionError: price not shown")
+    skipped = _run(_Case(SkipCase("no credentials")))
+    assert (skipped.status, skipped.error, skipped.ok) == ("SKIP", "no credentials", True)
+
+
+def test_a_raising_after_case_hook_fails_only_its_case():
+    broken, after = _Plugin(KeyError("sizes")), _Plugin()
+    result = _run(_Case(), plugins=[broken, after])
+    assert result.status == "FAIL"
+    assert result.error == "_Plugin.after_case: KeyError: 'sizes'"
+    # Later hooks still see the result
+    assert after.seen == ["TC001"]
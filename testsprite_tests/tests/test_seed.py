@@ -0,0 +1,60 @@
+import datetime
+
+import pytest
+
+from harness.seed import TABLES, Generator, Scale
+
+ANCHOR = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+
+# Foreign key column -> referenced table
+FOREIGN_KEYS = {
+    "sellerId": "Users", "buyerId": "Users", "userId": "Users", "senderId": "Users", "receiverId": "Users",
+    "carId": "Cars", "transactionId": "Transactions",
+}
+
+
+@pytest.fixture(scope="module")
+def tables():
+    generator = Generator(Scale(cars=400), seed=7, anchor=ANCHOR)
+    # rows() must run in TABLES order: transactions and reviews follow the cars' sales
+    return {table: [dict(zip(columns, row)) for row in generator.rows(table)]
+            for table, columns in TABLES.items()}
+
+
+def test_every_table_has_rows_with_unique_ids(tables):
+    for table, rows in tables.items():
+        assert rows, table
+        assert len({row["id"] for row in rows}) == len(rows), table
+
+
+def test_foreign_keys_reference_generated_rows(tables):
+    ids = {table: {row["id"] for row in rows} for table, rows in tables.items()}
+    for table, rows in tables.items():
+        for column in set(TABLES[table]) & set(FOREIGN_KEYS):
+            dangling = [row[column] for row in rows if row[column] not in ids[FOREIGN_KEYS[column]]]
+            assert not dangling, f"{table}.{column}: {dangling[:3]}"
+
+
+def test_references_respect_roles_and_sales(tables):
+    role = {row["id"]: row["role"] for row in tables["Users"]}
+    cars = {row["id"]: row for row in tables["Cars"]}
+    assert {role[car["sellerId"]] for car in cars.values()} == {"seller"}
+    for transaction in tables["Transactions"]:
+        car = cars[transaction["carId"]]
+        assert car["status"] in ("sold", "pending")
+        assert transaction["sellerId"] == car["sellerId"]
+        assert role[transaction["buyerId"]] == "buyer"
+    transactions = {row["id"]: row for row in tables["Transactions"]}
+    for review in tables["Reviews"]:
+        transaction = transactions[review["transactionId"]]
+        assert transaction["status"] == "completed"
+        assert (review["userId"], review["carId"]) == (transaction["buyerId"], transaction["carId"])
+    pairs = [(row["userId"], row["carId"]) for row in tables["Wishlists"]]
+    assert len(set(pairs)) == len(pairs)
+
+
+def test_same_seed_same_rows(tables):
+    again = Generator(Scale(cars=400), seed=7, anchor=ANCHOR)
+    assert [dict(zip(TABLES["Users"], row)) for row in again.rows("Users")] == tables["Users"]
+    other = Generator(Scale(cars=400), seed=8, anchor=ANCHOR)
+    assert next(other.rows("Cars"))[0] != tables["Cars"][0]["id"]
@@ -0,0 +1,31 @@
+from types import SimpleNamespace
+
+from harness.shard import SECONDS_PER_ACTION, plan_shards
+
+
+def _case(case_id, actions=0):
+    return SimpleNamespace(id=case_id, steps=[({}, [object()] * actions)])
+
+
+def _ids(plan):
+    return [[case.id for case in cases] for _, cases in plan]
+
+
+def test_balances_by_recorded_duration():
+    cases = [_case(f"TC00{number}") for number in range(1, 6)]
+    history = {"TC001": 40.0, "TC002": 30.0, "TC003": 20.0, "TC004": 20.0, "TC005": 10.0}
+
+    plan = plan_shards(cases, 2, history)
+    assert _ids(plan) == [["TC001", "TC004"], ["TC002", "TC003", "TC005"]]
+    assert [estimated for estimated, _ in plan] == [60.0, 60.0]
+
+
+def test_unrecorded_cases_are_estimated_from_their_actions():
+    plan = plan_shards([_case("TC001", actions=3), _case("TC002")], 2, {})
+    assert [estimated for estimated, _ in plan] == [3 * SECONDS_PER_ACTION, SECONDS_PER_ACTION]
+
+
+def test_never_returns_empty_shards():
+    plan = plan_shards([_case("TC001"), _case("TC002")], 8, {"TC001": 5.0, "TC002": 5.0})
+    assert _ids(plan) == [["TC001"], ["TC002"]]
+    assert plan_shards([], 3, {}) == []
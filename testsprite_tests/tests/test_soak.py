@@ -0,0 +1,56 @@
+import pytest
+
+from harness.plan import load_plans
+from harness.soak import MIN_WINDOW, SoakReport, _exclude_writers, drift, parse_duration
+
+
+@pytest.mark.parametrize("text, seconds", [("90", 90), ("45s", 45), ("45m", 2700), ("4h", 14400), (" 1.5H ", 5400)])
+def test_parse_duration(text, seconds):
+    assert parse_duration(text) == seconds
+
+
+@pytest.mark.parametrize("text", ["", "4d", "h", "-5m", "1h30m"])
+def test_parse_duration_rejects(text):
+    with pytest.raises(ValueError):
+        parse_duration(text)
+
+
+def test_drift_compares_first_and_last_window_after_warmup():
+    # The cold first round is ignored; windows are MIN_WINDOW rounds here
+    values = [500] + [100, 110, 90] + [120] * 3 + [150, 160, 140]
+    result = drift(values, threshold=0.2, floor=10)
+    assert result == {"first": 100, "last": 150, "change": 50, "ratio": 0.5, "drifted": True}
+
+
+def test_drift_needs_both_relative_and_absolute_growth():
+    values = [0] + [100] * MIN_WINDOW + [130] * MIN_WINDOW
+    assert drift(values, threshold=0.2, floor=10)["drifted"]
+    assert not drift(values, threshold=0.2, floor=50)["drifted"]
+    assert not drift(values, threshold=0.5, floor=10)["drifted"]
+
+
+def test_drift_needs_two_windows():
+    assert drift([1] * (2 * MIN_WINDOW), threshold=0.2, floor=0) is None
+
+
+def _state(tmp_path, ref):
+    path = tmp_path / "buyer.json"
+    path.write_text('{"origins": [{"origin": "http://localhost:3000", "localStorage": '
+                    f'[{{"name": "sb-{ref}-auth-token", "value": "{{}}"}}]}}]}}', encoding="utf-8")
+    return {"storage_state": str(path)}
+
+
+def test_journeys_that_post_data_only_run_on_the_local_stack(tmp_path):
+    plans = load_plans(["TC005", "TC018"])
+    report = SoakReport(plans, 0.2, 0.5)
+    assert [plan.id for plan in _exclude_writers(plans, _state(tmp_path, "localhost"), report)] == ["TC005", "TC018"]
+    assert [plan.id for plan in _exclude_writers(plans, _state(tmp_path, "abcd"), report)] == ["TC005"]
+    assert "'abcd'" in report.excluded["TC018"]
+
+
+def test_each_round_tags_the_message_it_checks():
+    plan, = load_plans(["TC018"])
+    ops = [(action.verb, dict(action.options)) for _, actions in plan.steps_for("#3") for action in actions]
+    message = "Apakah Toyota Avanza ini masih tersedia? #3"
+    assert ("fill", {"value": message, "unique": True}) in ops
+    assert ("expect", {"text": message}) in ops
@@ -0,0 +1,26 @@
+import pytest
+
+from harness.stats import percentile, summarize
+
+
+def test_percentile_interpolates_between_ranks():
+    values = [40, 10, 30, 20]
+    assert percentile(values, 0) == 10
+    assert percentile(values, 50) == pytest.approx(25)
+    assert percentile(values, 95) == pytest.approx(38.5)
+    assert percentile(values, 100) == 40
+
+
+def test_percentile_edge_cases():
+    assert percentile([], 50) is None
+    assert percentile([7], 99) == 7
+
+
+def test_summarize():
+    summary = summarize([float(ms) for ms in range(1, 101)])
+    assert summary["count"] == 100
+    assert summary["mean"] == pytest.approx(50.5)
+    assert summary["p50"] == pytest.approx(50.5)
+    assert summary["p99"] == pytest.approx(99.01)
+    assert summary["max"] == 100
+    assert summarize([]) == {"count": 0}
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from harness.traffic import EXIT, EXIT_STATE, PAGES, build_model, expected_visits, parse_shares, tables
+
+
+def test_expected_visits_follows_the_chain():
+    role = {"entry": {"/katalog": 1.0},
+            "transitions": {"/katalog": {EXIT_STATE: 0.5, "/mobil": 0.5}, "/mobil": {EXIT_STATE: 1.0}}}
+    assert expected_visits(role) == {"/katalog": 1.0, "/mobil": 0.5}
+
+
+def test_expected_visits_sums_loops():
+    role = {"entry": {"/chat": 1.0}, "transitions": {"/chat": {EXIT_STATE: 0.25, "/chat": 0.75}}}
+    assert expected_visits(role)["/chat"] == pytest.approx(4.0)
+
+
+def test_build_model_from_the_prd():
+    model = build_model()
+    assert set(model["roles"]) == {"buyer", "seller", "admin", "owner"}
+    assert set(model["requests"]) <= set(PAGES)
+    for role in model["roles"].values():
+        assert sum(role["entry"].values()) == pytest.approx(1, abs=1e-3)
+        for page, moves in role["transitions"].items():
+            assert page in model["requests"]
+            assert sum(moves.values()) == pytest.approx(1, abs=1e-3)
+            assert moves[EXIT_STATE] == EXIT
+        # Every page exits with the same probability, so sessions are geometric
+        assert role["pages_per_session"] == pytest.approx(1 / EXIT, abs=0.01)
+        assert role["requests_per_session"] > role["pages_per_session"]
+    assert "cars" in tables(model)
+
+
+def test_build_model_shares_and_unknown_flows(tmp_path):
+    assert list(build_model(shares={"buyer": 1, "seller": 0})["roles"]) == ["buyer"]
+
+    prd = tmp_path / "prd.json"
+    prd.write_text(json.dumps({"user_flow_summary": ["Teleport: buyer beams a car home"]}), encoding="utf-8")
+    with pytest.raises(ValueError, match="Teleport"):
+        build_model(prd)
+
+
+def test_parse_shares():
+    assert parse_shares("buyer=90, seller=10,admin") == {"buyer": 90.0, "seller": 10.0, "admin": 1.0}
+    with pytest.raises(ValueError):
+        parse_shares("dealer=5")
+    with pytest.raises(ValueError):
+        parse_shares("buyer=0")
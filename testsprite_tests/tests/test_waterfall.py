@@ -0,0 +1,53 @@
+from harness.waterfall import endpoint, findings, flags
+
+SUPABASE = "https://abcd.supabase.co"
+
+
+def test_endpoint_groups_supabase_calls():
+    assert endpoint("GET", f"{SUPABASE}/rest/v1/cars?select=*&id=eq.5") == "GET cars"
+    assert endpoint("POST", f"{SUPABASE}/rest/v1/rpc/search_cars") == "POST rpc search_cars"
+    assert endpoint("GET", f"{SUPABASE}/storage/v1/object/public/car-images/1/0.jpg") == "GET storage car-images"
+    assert endpoint("POST", f"{SUPABASE}/auth/v1/token?grant_type=password") == "POST auth token"
+
+
+def test_endpoint_collapses_ids_elsewhere():
+    assert endpoint("GET", "http://localhost:5000/api/cars/42/images") == "GET localhost:5000/api/cars/{id}/images"
+    uuid = "0000002a-0001-4000-8000-000000000007"
+    assert endpoint("DELETE", f"http://localhost:5000/api/wishlist/{uuid}") == "DELETE localhost:5000/api/wishlist/{id}"
+
+
+def _row(url, start, end, kind="fetch", method="GET", body=None):
+    return {"method": method, "url": url, "endpoint": endpoint(method, url), "type": kind,
+            "start_ms": start, "end_ms": end, "body": body}
+
+
+def test_findings_serial_chain():
+    requests = [
+        _row(f"{SUPABASE}/auth/v1/user", 0, 100),
+        _row(f"{SUPABASE}/rest/v1/users?id=eq.1", 120, 200),
+        _row(f"{SUPABASE}/rest/v1/cars?seller_id=eq.1", 250, 400),
+        # Starts too late after the previous one ended to extend the chain
+        _row(f"{SUPABASE}/rest/v1/wishlists?user_id=eq.1", 900, 950),
+        # Documents and images are not data requests
+        _row(f"{SUPABASE}/storage/v1/object/public/car-images/1/0.jpg", 400, 420, kind="image"),
+    ]
+    chain = findings(requests)["chain"]
+    assert chain == {"length": 3, "elapsed_ms": 400, "saving_ms": 250,
+                     "endpoints": ["GET auth user", "GET users", "GET cars"]}
+
+
+def test_findings_n_plus_one_and_duplicates():
+    requests = [_row(f"{SUPABASE}/rest/v1/car_images?car_id=eq.{car}", car, car + 50) for car in range(6)]
+    requests += [_row(f"{SUPABASE}/rest/v1/car_brands?select=*", 10, 40)] * 2
+    found = findings(requests)
+    assert found["chain"] is None
+    assert found["n_plus_one"] == [{"endpoint": "GET car_images", "requests": 6, "distinct": 6}]
+    assert found["duplicates"] == [{"method": "GET", "url": f"{SUPABASE}/rest/v1/car_brands?select=*", "count": 2}]
+    assert flags(found)[0] == "N+1: GET car_images 6x (6 distinct URLs)"
+
+
+def test_same_url_with_different_bodies_is_not_a_duplicate():
+    url = f"{SUPABASE}/rest/v1/rpc/search_cars"
+    requests = [_row(url, 0, 10, method="POST", body='{"q":"avanza"}'),
+                _row(url, 20, 30, method="POST", body='{"q":"brio"}')]
+    assert findings(requests)["duplicates"] == []